@@ -0,0 +1,27 @@
+"""scheduler runs
+
+Revision ID: 1c7e4a9b2f58
+Revises: 8e1f5b3d7a62
+Create Date: 2026-10-19 10:14:32.507118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "1c7e4a9b2f58"
+down_revision = "8e1f5b3d7a62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "scheduler_runs",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("scheduler_runs")
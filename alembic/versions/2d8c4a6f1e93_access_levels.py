@@ -0,0 +1,77 @@
+"""access levels
+
+Revision ID: 2d8c4a6f1e93
+Revises: 6b2e9f4c8d15
+Create Date: 2026-10-18 23:02:51.664013
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "2d8c4a6f1e93"
+down_revision = "6b2e9f4c8d15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "access_levels",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("roles", postgresql.ARRAY(sa.String(length=32)), nullable=True),
+        sa.Column("department_ids", postgresql.ARRAY(sa.Integer()), nullable=True),
+    )
+    op.execute(
+        """
+        INSERT INTO access_levels (name, roles, department_ids) VALUES
+            ('All', NULL, NULL),
+            ('Admins Only', ARRAY['ADMIN'], NULL)
+        """
+    )
+    # прочие уровни, уже встречающиеся у документов, — до настройки только для админов
+    op.execute(
+        """
+        INSERT INTO access_levels (name, roles)
+        SELECT DISTINCT access_level, ARRAY['ADMIN'] FROM documents
+        ON CONFLICT DO NOTHING
+        """
+    )
+    # любое изменение уровней увеличивает версию "access": AccessPolicy в каждом
+    # воркере перечитает таблицу не позже чем через catalog_version_check_seconds
+    op.execute(
+        """
+        CREATE FUNCTION bump_access_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO cache_versions (name, version) VALUES ('access', 1)
+            ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1;
+            RETURN NULL;
+        END $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER access_levels_bump_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON access_levels
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_access_version()
+        """
+    )
+    op.create_foreign_key(
+        "documents_access_level_fkey", "documents", "access_levels", ["access_level"], ["name"], onupdate="CASCADE"
+    )
+
+    op.add_column(
+        "courses", sa.Column("access_level", sa.String(length=64), server_default="All", nullable=False)
+    )
+    op.create_foreign_key(
+        "courses_access_level_fkey", "courses", "access_levels", ["access_level"], ["name"], onupdate="CASCADE"
+    )
+
+
+def downgrade():
+    op.drop_constraint("courses_access_level_fkey", "courses", type_="foreignkey")
+    op.drop_column("courses", "access_level")
+    op.drop_constraint("documents_access_level_fkey", "documents", type_="foreignkey")
+    op.drop_table("access_levels")
+    op.execute("DROP FUNCTION bump_access_version()")
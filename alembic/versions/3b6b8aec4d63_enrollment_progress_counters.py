@@ -0,0 +1,73 @@
+"""enrollment progress counters
+
+Revision ID: 3b6b8aec4d63
+Revises: af865e6dab10
+Create Date: 2026-10-18 11:03:27.914552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3b6b8aec4d63"
+down_revision = "af865e6dab10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # модель LessonCompletion давно есть, а миграции для таблицы не было
+    if not sa.inspect(op.get_bind()).has_table("lesson_completions"):
+        op.create_table(
+            "lesson_completions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("lesson_id", sa.Integer(), sa.ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("completed_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.UniqueConstraint("user_id", "lesson_id", name="uq_user_lesson_completion"),
+        )
+        op.create_index("ix_lesson_completions_user_id", "lesson_completions", ["user_id"])
+        op.create_index("ix_lesson_completions_lesson_id", "lesson_completions", ["lesson_id"])
+
+    op.add_column("enrollments", sa.Column("lessons_total", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("enrollments", sa.Column("lessons_completed", sa.Integer(), nullable=False, server_default="0"))
+
+    # досмотренные видео раньше считались пройденными уроками в /courses/my_full
+    op.execute(
+        """
+        INSERT INTO lesson_completions (user_id, lesson_id, completed_at)
+        SELECT user_id, lesson_id, updated_at FROM video_progress WHERE watched_percent >= 100
+        ON CONFLICT ON CONSTRAINT uq_user_lesson_completion DO NOTHING
+        """
+    )
+
+    op.execute(
+        """
+        UPDATE enrollments e SET
+            lessons_total = (SELECT count(*) FROM lessons l WHERE l.course_id = e.course_id),
+            lessons_completed = (
+                SELECT count(*) FROM lesson_completions lc
+                JOIN lessons l ON l.id = lc.lesson_id
+                WHERE lc.user_id = e.user_id AND l.course_id = e.course_id
+            )
+        """
+    )
+    op.execute(
+        """
+        UPDATE enrollments SET
+            progress_percent = CASE WHEN lessons_total > 0
+                THEN least(100, lessons_completed * 100 / lessons_total) ELSE 0 END,
+            status = CASE
+                WHEN lessons_total > 0 AND lessons_completed >= lessons_total THEN 'COMPLETED'
+                WHEN lessons_completed > 0 AND status = 'ASSIGNED' THEN 'IN_PROGRESS'
+                ELSE status END,
+            completed_at = CASE
+                WHEN lessons_total > 0 AND lessons_completed >= lessons_total THEN coalesce(completed_at, now())
+                ELSE completed_at END
+        """
+    )
+
+
+def downgrade():
+    op.drop_column("enrollments", "lessons_completed")
+    op.drop_column("enrollments", "lessons_total")
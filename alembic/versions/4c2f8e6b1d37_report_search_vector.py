@@ -0,0 +1,40 @@
+"""report search vector
+
+Revision ID: 4c2f8e6b1d37
+Revises: e7a1c9f04b2d
+Create Date: 2026-10-18 20:02:13.884520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "4c2f8e6b1d37"
+down_revision = "e7a1c9f04b2d"
+branch_labels = None
+depends_on = None
+
+# копия app.models.core.REPORT_SEARCH_VECTOR на момент миграции
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', text_blockers), 'A')"
+    " || setweight(to_tsvector('english', text_blockers), 'A')"
+    " || setweight(to_tsvector('russian', text_done || ' ' || text_plan), 'B')"
+    " || setweight(to_tsvector('english', text_done || ' ' || text_plan), 'B')"
+)
+
+
+def upgrade():
+    # генерируемая колонка: ADD COLUMN перезаписывает таблицу один раз
+    op.add_column(
+        "daily_reports",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)),
+    )
+    op.create_index(
+        "ix_daily_reports_search_vector", "daily_reports", ["search_vector"], postgresql_using="gin"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_daily_reports_search_vector", table_name="daily_reports")
+    op.drop_column("daily_reports", "search_vector")
@@ -0,0 +1,28 @@
+"""cache versions
+
+Revision ID: 4e8f02ae395c
+Revises: 3b6b8aec4d63
+Create Date: 2026-10-18 11:48:09.207716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "4e8f02ae395c"
+down_revision = "3b6b8aec4d63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="1"),
+    )
+    op.execute("INSERT INTO cache_versions (name, version) VALUES ('catalog', 1)")
+
+
+def downgrade():
+    op.drop_table("cache_versions")
@@ -0,0 +1,23 @@
+"""lesson media path
+
+Revision ID: 5d0e8b3f6a21
+Revises: c71d2a9e5b10
+Create Date: 2026-10-18 17:41:12.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5d0e8b3f6a21"
+down_revision = "c71d2a9e5b10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("lessons", sa.Column("media_path", sa.String(length=500), nullable=True))
+
+
+def downgrade():
+    op.drop_column("lessons", "media_path")
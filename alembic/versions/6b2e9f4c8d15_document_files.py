@@ -0,0 +1,39 @@
+"""document files
+
+Revision ID: 6b2e9f4c8d15
+Revises: a9d3f1b6c470
+Create Date: 2026-10-18 22:14:37.208841
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "6b2e9f4c8d15"
+down_revision = "a9d3f1b6c470"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "document_files",
+        sa.Column("hash", sa.LargeBinary(), primary_key=True),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("content_type", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.add_column("documents", sa.Column("file_hash", sa.LargeBinary(), nullable=True))
+    op.add_column("documents", sa.Column("file_name", sa.String(length=255), nullable=True))
+    op.create_foreign_key(
+        "documents_file_hash_fkey", "documents", "document_files", ["file_hash"], ["hash"]
+    )
+    op.create_index("ix_documents_file_hash", "documents", ["file_hash"])
+
+
+def downgrade():
+    op.drop_index("ix_documents_file_hash", table_name="documents")
+    op.drop_constraint("documents_file_hash_fkey", "documents", type_="foreignkey")
+    op.drop_column("documents", "file_name")
+    op.drop_column("documents", "file_hash")
+    op.drop_table("document_files")
@@ -0,0 +1,36 @@
+"""streak leaderboard
+
+Revision ID: 7f3a9c5e2b84
+Revises: d5b7e2f19a60
+Create Date: 2026-10-18 21:08:35.602117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "7f3a9c5e2b84"
+down_revision = "d5b7e2f19a60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "streak_leaderboard",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("scope", sa.String(length=16), nullable=False),
+        sa.Column("department_id", sa.Integer(), nullable=True),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("full_name", sa.String(length=255), nullable=False),
+        sa.Column("current_streak", sa.Integer(), nullable=False),
+        sa.Column("max_streak", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_streak_leaderboard_scope_rank", "streak_leaderboard", ["scope", "department_id", "rank"])
+
+
+def downgrade():
+    op.drop_index("ix_streak_leaderboard_scope_rank", table_name="streak_leaderboard")
+    op.drop_table("streak_leaderboard")
@@ -0,0 +1,61 @@
+"""watched bitmap
+
+Revision ID: 8a4f1c2d7e93
+Revises: 5d0e8b3f6a21
+Create Date: 2026-10-18 18:12:04.661390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "8a4f1c2d7e93"
+down_revision = "5d0e8b3f6a21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("lessons", sa.Column("duration_sec", sa.Integer(), nullable=True))
+    op.add_column("video_progress", sa.Column("watched_bitmap", sa.LargeBinary(), nullable=True))
+    op.add_column("video_progress", sa.Column("duration_sec", sa.Integer(), nullable=True))
+
+    # побайтовый OR карт разной длины (короткая дополняется нулями)
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bytea_or(a bytea, b bytea) RETURNS bytea
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT CASE
+                WHEN a IS NULL OR length(a) = 0 THEN b
+                WHEN b IS NULL OR length(b) = 0 THEN a
+                ELSE (
+                    SELECT decode(string_agg(lpad(to_hex(
+                               CASE WHEN i < length(a) THEN get_byte(a, i) ELSE 0 END
+                             | CASE WHEN i < length(b) THEN get_byte(b, i) ELSE 0 END
+                           ), 2, '0'), '' ORDER BY i), 'hex')
+                    FROM generate_series(0, greatest(length(a), length(b)) - 1) AS i
+                )
+            END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION watched_bitmap_percent(bitmap bytea, duration_sec integer, seconds_per_bit integer)
+        RETURNS integer
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT CASE
+                WHEN bitmap IS NULL OR coalesce(duration_sec, 0) <= 0 THEN NULL
+                ELSE least(100, bit_count(bitmap) * 100 / ((duration_sec + seconds_per_bit - 1) / seconds_per_bit))::integer
+            END
+        $$
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP FUNCTION IF EXISTS watched_bitmap_percent(bytea, integer, integer)")
+    op.execute("DROP FUNCTION IF EXISTS bytea_or(bytea, bytea)")
+    op.drop_column("video_progress", "duration_sec")
+    op.drop_column("video_progress", "watched_bitmap")
+    op.drop_column("lessons", "duration_sec")
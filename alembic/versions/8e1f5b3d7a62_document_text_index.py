@@ -0,0 +1,49 @@
+"""document text index
+
+Revision ID: 8e1f5b3d7a62
+Revises: 2d8c4a6f1e93
+Create Date: 2026-10-18 23:47:20.915402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "8e1f5b3d7a62"
+down_revision = "2d8c4a6f1e93"
+branch_labels = None
+depends_on = None
+
+# копия app.models.core.DOCUMENT_CHUNK_VECTOR на момент миграции
+SEARCH_VECTOR = "to_tsvector('russian', content) || to_tsvector('english', content)"
+
+
+def upgrade():
+    # уже загруженные файлы попадают в очередь (indexed_at IS NULL)
+    op.add_column("document_files", sa.Column("indexed_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("document_files", sa.Column("index_error", sa.String(length=500), nullable=True))
+    op.create_index(
+        "ix_document_files_pending", "document_files", ["created_at"], postgresql_where=sa.text("indexed_at IS NULL")
+    )
+
+    op.create_table(
+        "document_chunks",
+        sa.Column(
+            "file_hash", sa.LargeBinary(), sa.ForeignKey("document_files.hash", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("chunk_no", sa.Integer(), primary_key=True),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)),
+    )
+    op.create_index(
+        "ix_document_chunks_search_vector", "document_chunks", ["search_vector"], postgresql_using="gin"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_document_chunks_search_vector", table_name="document_chunks")
+    op.drop_table("document_chunks")
+    op.drop_index("ix_document_files_pending", table_name="document_files")
+    op.drop_column("document_files", "index_error")
+    op.drop_column("document_files", "indexed_at")
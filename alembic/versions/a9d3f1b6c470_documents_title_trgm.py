@@ -0,0 +1,32 @@
+"""documents title trgm
+
+Revision ID: a9d3f1b6c470
+Revises: 7f3a9c5e2b84
+Create Date: 2026-10-18 21:31:09.447251
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a9d3f1b6c470"
+down_revision = "7f3a9c5e2b84"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pg_trgm входит в contrib (есть в образе postgres:16)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_documents_title_trgm",
+        "documents",
+        ["title"],
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+
+def downgrade():
+    # расширение не удаляем: им могут пользоваться другие объекты БД
+    op.drop_index("ix_documents_title_trgm", table_name="documents")
@@ -0,0 +1,27 @@
+"""mentor inbox index
+
+Revision ID: b3e9d4a7c152
+Revises: 8a4f1c2d7e93
+Create Date: 2026-10-18 19:05:41.218034
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "b3e9d4a7c152"
+down_revision = "8a4f1c2d7e93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_daily_reports_user_status_id",
+        "daily_reports",
+        ["user_id", "status", sa.text("id DESC")],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_daily_reports_user_status_id", table_name="daily_reports")
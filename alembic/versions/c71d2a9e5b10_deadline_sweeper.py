@@ -0,0 +1,43 @@
+"""deadline sweeper
+
+Revision ID: c71d2a9e5b10
+Revises: 4e8f02ae395c
+Create Date: 2026-10-18 17:05:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "c71d2a9e5b10"
+down_revision = "4e8f02ae395c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("enrollments", sa.Column("overdue_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_enrollments_status_deadline", "enrollments", ["status", "deadline_at"])
+
+    op.create_table(
+        "deadline_digests",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("digest_date", sa.Date(), nullable=False),
+        sa.Column("overdue_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("due_soon_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("items", postgresql.JSONB(), nullable=False, server_default="[]"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("user_id", "digest_date", name="uq_deadline_digest_user_date"),
+    )
+    op.create_index("ix_deadline_digests_user_id", "deadline_digests", ["user_id"])
+    op.create_index("ix_deadline_digests_digest_date", "deadline_digests", ["digest_date"])
+
+
+def downgrade():
+    op.drop_index("ix_deadline_digests_digest_date", table_name="deadline_digests")
+    op.drop_index("ix_deadline_digests_user_id", table_name="deadline_digests")
+    op.drop_table("deadline_digests")
+    op.drop_index("ix_enrollments_status_deadline", table_name="enrollments")
+    op.drop_column("enrollments", "overdue_at")
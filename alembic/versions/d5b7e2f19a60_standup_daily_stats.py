@@ -0,0 +1,92 @@
+"""standup daily stats
+
+Revision ID: d5b7e2f19a60
+Revises: 4c2f8e6b1d37
+Create Date: 2026-10-18 20:37:52.140775
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d5b7e2f19a60"
+down_revision = "4c2f8e6b1d37"
+branch_labels = None
+depends_on = None
+
+# копия app.services.standup_stats.NO_BLOCKERS на момент миграции
+NO_BLOCKERS = ("", "-", "—", "нет", "нету", "нет блокеров", "отсутствуют", "none", "no", "n/a", "nope")
+
+
+def upgrade():
+    op.create_table(
+        "standup_daily_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("reports_created", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("with_blockers", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("resubmitted", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("decisions_accepted", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("decisions_returned", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("decisions_timed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("decision_seconds", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("status_pending", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("status_accepted", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("status_revision", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint(
+            "department_id", "day", name="uq_standup_stats_department_day", postgresql_nulls_not_distinct=True
+        ),
+    )
+    op.create_index("ix_standup_daily_stats_day", "standup_daily_stats", ["day"])
+
+    # заполнение по истории: отчёты (создание, блокеры, текущий статус) + ревизии
+    # (повторные PENDING — пересдачи, остальные — решения; ожидание — от предыдущей ревизии)
+    no_blockers = ", ".join("'" + v.replace("'", "''") + "'" for v in NO_BLOCKERS)
+    op.execute(
+        f"""
+        INSERT INTO standup_daily_stats (
+            department_id, day, reports_created, with_blockers, resubmitted,
+            decisions_accepted, decisions_returned, decisions_timed, decision_seconds,
+            status_pending, status_accepted, status_revision
+        )
+        SELECT department_id, day, sum(created), sum(blockers), sum(resubmitted),
+               sum(accepted), sum(returned), sum(timed), sum(seconds),
+               sum(pending), sum(st_accepted), sum(st_revision)
+        FROM (
+            SELECT u.department_id, (r.created_at AT TIME ZONE 'UTC')::date AS day,
+                   1 AS created,
+                   (rtrim(lower(btrim(r.text_blockers)), '.!') NOT IN ({no_blockers}))::int AS blockers,
+                   0 AS resubmitted, 0 AS accepted, 0 AS returned, 0 AS timed, 0::bigint AS seconds,
+                   (r.status = 'PENDING')::int AS pending,
+                   (r.status = 'ACCEPTED')::int AS st_accepted,
+                   (r.status = 'REVISION')::int AS st_revision
+            FROM daily_reports r JOIN users u ON u.id = r.user_id
+            UNION ALL
+            SELECT u.department_id, (v.created_at AT TIME ZONE 'UTC')::date,
+                   0, 0,
+                   (v.status = 'PENDING' AND v.prev_status IS NOT NULL)::int,
+                   (v.status = 'ACCEPTED')::int,
+                   (v.status = 'REVISION')::int,
+                   (v.status <> 'PENDING' AND v.prev_status = 'PENDING')::int,
+                   CASE WHEN v.status <> 'PENDING' AND v.prev_status = 'PENDING'
+                        THEN greatest(0, extract(epoch FROM v.created_at - v.prev_at))::bigint ELSE 0 END,
+                   0, 0, 0
+            FROM (
+                SELECT report_id, status, created_at,
+                       lag(status) OVER w AS prev_status,
+                       lag(created_at) OVER w AS prev_at
+                FROM daily_report_revisions
+                WINDOW w AS (PARTITION BY report_id ORDER BY id)
+            ) v
+            JOIN daily_reports r ON r.id = v.report_id
+            JOIN users u ON u.id = r.user_id
+        ) events
+        GROUP BY department_id, day
+        """
+    )
+
+
+def downgrade():
+    op.drop_index("ix_standup_daily_stats_day", table_name="standup_daily_stats")
+    op.drop_table("standup_daily_stats")
@@ -0,0 +1,98 @@
+"""report bodies
+
+Revision ID: e7a1c9f04b2d
+Revises: b3e9d4a7c152
+Create Date: 2026-10-18 19:41:27.503916
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e7a1c9f04b2d"
+down_revision = "b3e9d4a7c152"
+branch_labels = None
+depends_on = None
+
+log = logging.getLogger("alembic.runtime.migration")
+
+# та же формула, что app.services.report_bodies.body_hash
+BODY_HASH = """
+    sha256(
+        convert_to(text_done, 'UTF8') || '\\x00'::bytea
+        || convert_to(text_plan, 'UTF8') || '\\x00'::bytea
+        || convert_to(text_blockers, 'UTF8')
+    )
+"""
+
+BODY_SIZE = "pg_column_size(text_done) + pg_column_size(text_plan) + pg_column_size(text_blockers)"
+
+
+def upgrade():
+    conn = op.get_bind()
+    revisions, before = conn.execute(
+        sa.text(f"SELECT count(*), coalesce(sum({BODY_SIZE}), 0) FROM daily_report_revisions")
+    ).one()
+
+    op.create_table(
+        "report_bodies",
+        sa.Column("hash", sa.LargeBinary(), primary_key=True),
+        sa.Column("text_done", sa.Text(), nullable=False),
+        sa.Column("text_plan", sa.Text(), nullable=False),
+        sa.Column("text_blockers", sa.Text(), nullable=False),
+    )
+    op.add_column("daily_report_revisions", sa.Column("body_hash", sa.LargeBinary(), nullable=True))
+
+    # сжатие: одно тело на уникальное содержимое, ревизии ссылаются на него
+    op.execute(
+        f"""
+        INSERT INTO report_bodies (hash, text_done, text_plan, text_blockers)
+        SELECT DISTINCT ON (h) h, text_done, text_plan, text_blockers
+        FROM (SELECT {BODY_HASH} AS h, text_done, text_plan, text_blockers FROM daily_report_revisions) r
+        ORDER BY h
+        """
+    )
+    op.execute(f"UPDATE daily_report_revisions SET body_hash = {BODY_HASH}")
+
+    op.alter_column("daily_report_revisions", "body_hash", nullable=False)
+    op.create_foreign_key(
+        "daily_report_revisions_body_hash_fkey", "daily_report_revisions", "report_bodies", ["body_hash"], ["hash"]
+    )
+    op.drop_column("daily_report_revisions", "text_done")
+    op.drop_column("daily_report_revisions", "text_plan")
+    op.drop_column("daily_report_revisions", "text_blockers")
+
+    bodies, after = conn.execute(
+        sa.text(f"SELECT count(*), coalesce(sum({BODY_SIZE} + pg_column_size(hash)), 0) FROM report_bodies")
+    ).one()
+    # + ссылка из каждой ревизии (32 байта хэша + заголовок varlena)
+    after += conn.execute(
+        sa.text("SELECT coalesce(sum(pg_column_size(body_hash)), 0) FROM daily_report_revisions")
+    ).scalar_one()
+    log.info(
+        "report bodies: %d revisions -> %d unique bodies, text %d -> %d bytes (saved %d bytes); "
+        "run VACUUM FULL daily_report_revisions to return the space to the OS",
+        revisions, bodies, before, after, before - after,
+    )
+
+
+def downgrade():
+    op.add_column("daily_report_revisions", sa.Column("text_done", sa.Text(), nullable=True))
+    op.add_column("daily_report_revisions", sa.Column("text_plan", sa.Text(), nullable=True))
+    op.add_column("daily_report_revisions", sa.Column("text_blockers", sa.Text(), nullable=True))
+    op.execute(
+        """
+        UPDATE daily_report_revisions r
+        SET text_done = b.text_done, text_plan = b.text_plan, text_blockers = b.text_blockers
+        FROM report_bodies b
+        WHERE b.hash = r.body_hash
+        """
+    )
+    for column in ("text_done", "text_plan", "text_blockers"):
+        op.alter_column("daily_report_revisions", column, nullable=False)
+
+    op.drop_constraint("daily_report_revisions_body_hash_fkey", "daily_report_revisions", type_="foreignkey")
+    op.drop_column("daily_report_revisions", "body_hash")
+    op.drop_table("report_bodies")
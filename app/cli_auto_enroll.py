@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from app.db import async_session
+from app.services.auto_enroll import reconcile_mandatory
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Назначить недостающие обязательные курсы")
+    parser.add_argument("--user-id", type=int, default=None, help="только для этого пользователя")
+    parser.add_argument("--course-id", type=int, default=None, help="только для этого курса")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    async with async_session() as session:
+        created = await reconcile_mandatory(session, user_id=args.user_id, course_id=args.course_id)
+        await session.commit()
+    print(f"Created enrollments: {created} ({time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -16,3 +16,13 @@ class Base(DeclarativeBase):
 async def get_session() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+async def begin_snapshot(session: AsyncSession) -> None:
+    """
+    Открыть read-only транзакцию REPEATABLE READ: все SELECT'ы обработчика
+    видят один согласованный снимок. Вызывать до первого запроса в сессии.
+    """
+    await session.connection(
+        execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+    )
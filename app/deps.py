@@ -4,33 +4,39 @@ from datetime import datetime, timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_session
+from app.db import async_session
 from app.models.core import User
 from app.security.jwt import decode_token
+from app.services.principal_cache import Principal, principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: AsyncSession = Depends(get_session),
-) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
     try:
         payload = decode_token(token)
         user_id = int(payload["sub"])
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = (await session.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
-    if not user or not user.is_active:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        # отдельная короткая сессия: транзакция обработчика начинается «с чистого листа»
+        async with async_session() as session:
+            user = (await session.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User disabled or not found")
+        principal = Principal.from_user(user)
+        principal_cache.put(principal)
+
+    if not principal.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User disabled or not found")
-    return user
+    return principal
 
 
 def require_roles(*roles: str):
-    async def _guard(user: User = Depends(get_current_user)) -> User:
+    async def _guard(user: Principal = Depends(get_current_user)) -> Principal:
         if user.role not in roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
         return user
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -5,11 +7,41 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
 from app.routers import auth, users, courses, standups, documents, departments
-from app.routers import my_courses
+from app.routers import my_courses, metrics, deadlines, media, leaderboard, events as events_router
 from app.settings import settings
+from app.pagination import NEXT_CURSOR_HEADER
+from app.security.passwords import password_service
+from app.services.deadlines import sweep_deadlines
+from app.services.document_index import document_indexer, index_documents
+from app.services.events import events
+from app.services.progress_buffer import progress_buffer
+from app.services.scheduler import scheduler
+from app.services.streaks import leaderboard_refresh, nightly_streaks
 from app.routers import auth, users, courses, standups, documents
 
-app = FastAPI(title="Internal LMS API", version="0.1.0")
+
+scheduler.add("deadline_sweep", settings.deadline_sweep_interval_seconds, sweep_deadlines)
+scheduler.add("streak_leaderboard", settings.streak_leaderboard_refresh_seconds, leaderboard_refresh)
+scheduler.add("streak_reset", settings.streak_reset_interval_seconds, nightly_streaks)
+scheduler.add("document_text", settings.document_text_interval_seconds, index_documents)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    progress_buffer.start()
+    if settings.scheduler_enabled:
+        scheduler.start()
+    if settings.events_enabled:
+        events.start()
+    yield
+    await events.stop()
+    await scheduler.stop()
+    await progress_buffer.stop()
+    password_service.shutdown()
+    document_indexer.shutdown()
+
+
+app = FastAPI(title="Internal LMS API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +49,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # ✅ фронт
@@ -36,6 +69,11 @@ app.include_router(courses.router, prefix="/courses", tags=["courses"])
 app.include_router(standups.router, prefix="/standups", tags=["standups"])
 app.include_router(documents.router, prefix="/documents", tags=["documents"])
 app.include_router(my_courses.router, prefix="/my-courses", tags=["my-courses"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+app.include_router(deadlines.router, prefix="/deadlines", tags=["deadlines"])
+app.include_router(media.router, prefix="/media", tags=["media"])
+app.include_router(events_router.router, prefix="/events", tags=["events"])
+app.include_router(leaderboard.router, prefix="/leaderboard", tags=["leaderboard"])
 
 @app.get("/health")
 async def health():
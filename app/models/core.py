@@ -1,12 +1,24 @@
 from __future__ import annotations
 
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Boolean, UniqueConstraint, Text, func
+from sqlalchemy import String, Integer, BigInteger, Date, DateTime, ForeignKey, Boolean, UniqueConstraint, Index, LargeBinary, Text, func, text, Computed
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import UniqueConstraint, ForeignKey
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from app.db import Base
 from app.models.enums import Role, EnrollmentStatus, ReportStatus
 
+class ReportBody(Base):
+    """Тексты отчёта, общие для ревизий с одинаковым содержимым (ключ — sha256)."""
+    __tablename__ = "report_bodies"
+
+    hash: Mapped[bytes] = mapped_column(LargeBinary, primary_key=True)
+
+    text_done: Mapped[str] = mapped_column(Text, nullable=False)
+    text_plan: Mapped[str] = mapped_column(Text, nullable=False)
+    text_blockers: Mapped[str] = mapped_column(Text, nullable=False)
+
+
 class DailyReportRevision(Base):
     __tablename__ = "daily_report_revisions"
 
@@ -15,9 +27,7 @@ class DailyReportRevision(Base):
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
-    text_done: Mapped[str] = mapped_column(Text, nullable=False)
-    text_plan: Mapped[str] = mapped_column(Text, nullable=False)
-    text_blockers: Mapped[str] = mapped_column(Text, nullable=False)
+    body_hash: Mapped[bytes] = mapped_column(ForeignKey("report_bodies.hash"), nullable=False)
 
     status: Mapped[str] = mapped_column(Text, nullable=False)
     mentor_comment: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -52,6 +62,21 @@ class User(Base):
     locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # все токены одной цепочки ротации (один логин) имеют общий family_id
+    family_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    # храним только sha256 от токена
+    token_hash: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 class Streak(Base):
     __tablename__ = "streaks"
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
@@ -60,6 +85,40 @@ class Streak(Base):
     last_streak_date: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
+class StreakLeaderboard(Base):
+    """
+    Готовый топ по сериям входов (services/streaks.py): scope 'global' или
+    'department' + department_id. Пересобирается задачей планировщика,
+    чтение лидерборда не трогает streaks.
+    """
+    __tablename__ = "streak_leaderboard"
+    __table_args__ = (Index("ix_streak_leaderboard_scope_rank", "scope", "department_id", "rank"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    scope: Mapped[str] = mapped_column(String(16), nullable=False)
+    department_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    full_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    current_streak: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_streak: Mapped[int] = mapped_column(Integer, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class AccessLevel(Base):
+    """
+    Уровень доступа документов и курсов: каким ролям и отделам он открыт
+    (NULL — без ограничения). ADMIN видит всё независимо от уровней;
+    разбор на WHERE — services/access.py.
+    """
+    __tablename__ = "access_levels"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    roles: Mapped[list[str] | None] = mapped_column(ARRAY(String(32)), nullable=True)
+    department_ids: Mapped[list[int] | None] = mapped_column(ARRAY(Integer), nullable=True)
+
+
 class Course(Base):
     __tablename__ = "courses"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -70,6 +129,10 @@ class Course(Base):
 
     # NEW: доступен всем (самозапись)
     is_public: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # кому открыта самозапись (публичные курсы); назначенные видны всегда
+    access_level: Mapped[str] = mapped_column(
+        ForeignKey("access_levels.name", onupdate="CASCADE"), nullable=False, default="All", server_default="All"
+    )
 
 
 
@@ -80,6 +143,10 @@ class Lesson(Base):
     order: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     title: Mapped[str] = mapped_column(String(255), nullable=False, default="Lesson")
     video_url: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    # файл в локальном хранилище (относительно settings.media_root), см. routers/media.py
+    media_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # длительность видео: по ней считается watched_percent из битовой карты
+    duration_sec: Mapped[int | None] = mapped_column(Integer, nullable=True)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     __table_args__ = (UniqueConstraint("course_id", "order", name="uq_lessons_course_order"),)
@@ -94,10 +161,19 @@ class Enrollment(Base):
     status: Mapped[str] = mapped_column(String(32), nullable=False, default=EnrollmentStatus.ASSIGNED.value)
     progress_percent: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
+    # материализованный прогресс (см. services/enrollments.py)
+    lessons_total: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    lessons_completed: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     deadline_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # проставляет планировщик (services/deadlines.py), когда дедлайн пропущен
+    overdue_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
-    __table_args__ = (UniqueConstraint("user_id", "course_id", name="uq_enrollments_user_course"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_enrollments_user_course"),
+        Index("ix_enrollments_status_deadline", "status", "deadline_at"),
+    )
 
 
 class VideoProgress(Base):
@@ -111,9 +187,23 @@ class VideoProgress(Base):
     watched_percent: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
+    # просмотренные отрезки: бит на progress_bitmap_seconds_per_bit секунд (services/watch_bitmap.py)
+    watched_bitmap: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    # длительность, относительно которой считается watched_percent
+    duration_sec: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
     __table_args__ = (UniqueConstraint("user_id", "lesson_id", name="uq_video_user_lesson"),)
 
 
+# блокеры важнее (вес A), сделанное и план — B; русская и английская морфология
+REPORT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', text_blockers), 'A')"
+    " || setweight(to_tsvector('english', text_blockers), 'A')"
+    " || setweight(to_tsvector('russian', text_done || ' ' || text_plan), 'B')"
+    " || setweight(to_tsvector('english', text_done || ' ' || text_plan), 'B')"
+)
+
+
 class DailyReport(Base):
     __tablename__ = "daily_reports"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -129,14 +219,80 @@ class DailyReport(Base):
     status: Mapped[str] = mapped_column(String(32), nullable=False, default=ReportStatus.PENDING.value)
     mentor_comment: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # полнотекстовый поиск (services/report_search.py): Postgres пересчитывает
+    # колонку сам при каждом INSERT/UPDATE текстов
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(REPORT_SEARCH_VECTOR, persisted=True), deferred=True
+    )
+
+    # входящие ментора: отчёты людей отдела по статусам, новые сверху
+    __table_args__ = (
+        Index("ix_daily_reports_user_status_id", "user_id", "status", text("id DESC")),
+        Index("ix_daily_reports_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+class DocumentFile(Base):
+    """
+    Загруженный файл документа; лежит в хранилище под именем sha256 содержимого
+    (services/document_files.py), одинаковые файлы хранятся один раз.
+    """
+    __tablename__ = "document_files"
+
+    hash: Mapped[bytes] = mapped_column(LargeBinary, primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content_type: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # извлечение текста (services/document_index.py): NULL — файл в очереди
+    indexed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    index_error: Mapped[str | None] = mapped_column(String(500), nullable=True)
+
+    __table_args__ = (
+        Index("ix_document_files_pending", "created_at", postgresql_where=text("indexed_at IS NULL")),
+    )
+
+
+DOCUMENT_CHUNK_VECTOR = "to_tsvector('russian', content) || to_tsvector('english', content)"
+
+
+class DocumentChunk(Base):
+    """Кусок извлечённого текста файла; индексируется по содержимому файла, а не по документу."""
+    __tablename__ = "document_chunks"
+
+    file_hash: Mapped[bytes] = mapped_column(
+        ForeignKey("document_files.hash", ondelete="CASCADE"), primary_key=True
+    )
+    chunk_no: Mapped[int] = mapped_column(Integer, primary_key=True)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(DOCUMENT_CHUNK_VECTOR, persisted=True), deferred=True
+    )
+
+    __table_args__ = (
+        Index("ix_document_chunks_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 
 class Document(Base):
     __tablename__ = "documents"
+    # поиск по названию (ILIKE и similarity) — триграммный GIN-индекс, расширение pg_trgm
+    __table_args__ = (
+        Index(
+            "ix_documents_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+        ),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     file_url: Mapped[str] = mapped_column(String(1000), nullable=False)
     category: Mapped[str] = mapped_column(String(64), nullable=False, default="HR")
-    access_level: Mapped[str] = mapped_column(String(64), nullable=False, default="All")
+    access_level: Mapped[str] = mapped_column(
+        ForeignKey("access_levels.name", onupdate="CASCADE"), nullable=False, default="All"
+    )
+    # загруженный файл (PUT /documents/{id}/file); без него file_url — внешняя ссылка
+    file_hash: Mapped[bytes | None] = mapped_column(ForeignKey("document_files.hash"), nullable=True, index=True)
+    file_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
 class LessonCompletion(Base):
     __tablename__ = "lesson_completions"
@@ -147,7 +303,74 @@ class LessonCompletion(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     lesson_id: Mapped[int] = mapped_column(ForeignKey("lessons.id", ondelete="CASCADE"), index=True)
-    completed_at: Mapped[datetime] = mapped_column(default=lambda: datetime.now(timezone.utc))
+    completed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now()
+    )
 
     user = relationship("User")
-    lesson = relationship("Lesson")
\ No newline at end of file
+    lesson = relationship("Lesson")
+
+
+class CacheVersion(Base):
+    """Глобальные версии для инвалидации in-process кэшей во всех воркерах."""
+    __tablename__ = "cache_versions"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
+
+
+class SchedulerRun(Base):
+    """Время последнего запуска периодической задачи (services/scheduler.py), общее для всех воркеров."""
+    __tablename__ = "scheduler_runs"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class DeadlineDigest(Base):
+    """Сводка по дедлайнам пользователя за день (просроченные и скоро истекающие курсы)."""
+    __tablename__ = "deadline_digests"
+    __table_args__ = (UniqueConstraint("user_id", "digest_date", name="uq_deadline_digest_user_date"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    digest_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+
+    overdue_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    due_soon_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # [{"course_id", "deadline_at", "overdue"}]
+    items: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class StandupDailyStat(Base):
+    """
+    Сводка стендапов по отделу за день; ведётся инкрементально в транзакциях
+    create_report / update_report / mentor_decision (services/standup_stats.py).
+    События (создано, пересдано, решения) — по дню события; with_blockers
+    и status_* — по текущему состоянию отчётов, созданных в этот день.
+    """
+    __tablename__ = "standup_daily_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "department_id", "day", name="uq_standup_stats_department_day", postgresql_nulls_not_distinct=True
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    department_id: Mapped[int | None] = mapped_column(ForeignKey("departments.id", ondelete="CASCADE"), nullable=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+
+    reports_created: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    with_blockers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    resubmitted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    decisions_accepted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    decisions_returned: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # решения по отчётам на проверке: их число и суммарное время ожидания
+    decisions_timed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    decision_seconds: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    status_pending: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    status_accepted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    status_revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
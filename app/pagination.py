@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+# курсор следующей страницы отдаём заголовком, тело ответа остаётся списком
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True, slots=True)
+class PageParams:
+    cursor: str | None
+    limit: int
+
+
+def page_params(
+    cursor: str | None = Query(default=None, description="Непрозрачный курсор из заголовка X-Next-Cursor"),
+    limit: int = Query(default=DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+) -> PageParams:
+    return PageParams(cursor=cursor, limit=limit)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _cursor_value(col, value):
+    """Значение из курсора -> тип ключевой колонки; чужой тип — 400, а не DataError из драйвера."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        py_type = col.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if py_type in (datetime, date):
+            return py_type.fromisoformat(value)
+        if py_type is int and isinstance(value, float) and not value.is_integer():
+            raise ValueError(value)
+        return py_type(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(stmt, page: PageParams, *keys: tuple[Any, bool]):
+    """
+    Keyset-пагинация: keys — пары (колонка/выражение, desc). Последний ключ
+    должен быть уникальным (обычно id). Берём limit + 1 строку, чтобы понять,
+    есть ли следующая страница (см. finish_page).
+    """
+    if page.cursor:
+        values = [_cursor_value(col, v) for (col, _), v in zip(keys, decode_cursor(page.cursor, len(keys)))]
+        after = []
+        for i, (col, desc) in enumerate(keys):
+            eq = [k == v for (k, _), v in zip(keys[:i], values[:i])]
+            after.append(and_(*eq, col < values[i] if desc else col > values[i]))
+        stmt = stmt.where(or_(*after))
+
+    return stmt.order_by(*[col.desc() if desc else col.asc() for col, desc in keys]).limit(page.limit + 1)
+
+
+def finish_page(rows: Sequence, page: PageParams, response: Response, key: Callable[[Any], Sequence[Any]]) -> list:
+    """Обрезает лишнюю строку и выставляет курсор следующей страницы."""
+    rows = list(rows)
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+    return rows
+
@@ -7,12 +7,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_session
-from app.models.core import User
-from app.schemas.auth import LoginIn, TokenOut
-from app.security.passwords import verify_password
+from app.models.core import RefreshToken, User
+from app.schemas.auth import LoginIn, RefreshIn, TokenOut
+from app.security.passwords import verify_password_async
 from app.security.jwt import create_access_token
 from app.settings import settings
 from app.services.streaks import update_streak
+from app.services.refresh_tokens import hash_token, issue_refresh_token, revoke_family, rotate_refresh_token
 
 router = APIRouter()
 
@@ -28,7 +29,7 @@ async def login(data: LoginIn, session: AsyncSession = Depends(get_session)) ->
     if user.locked_until and user.locked_until > now:
         raise HTTPException(status_code=429, detail="Вход временно заблокирован. Попробуйте позже.")
 
-    ok = verify_password(data.password, user.password_hash)
+    ok = await verify_password_async(data.password, user.password_hash)
 
     if not ok:
         user.failed_login_count += 1
@@ -45,7 +46,31 @@ async def login(data: LoginIn, session: AsyncSession = Depends(get_session)) ->
 
     await update_streak(session, user.id, now=now)
 
+    refresh_token = issue_refresh_token(session, user.id)
+
     await session.commit()
 
     token = create_access_token(sub=str(user.id))
-    return TokenOut(access_token=token)
+    return TokenOut(access_token=token, refresh_token=refresh_token)
+
+
+@router.post("/refresh", response_model=TokenOut)
+async def refresh(data: RefreshIn, session: AsyncSession = Depends(get_session)) -> TokenOut:
+    user_id, refresh_token = await rotate_refresh_token(session, data.refresh_token)
+    await session.commit()
+
+    token = create_access_token(sub=str(user_id))
+    return TokenOut(access_token=token, refresh_token=refresh_token)
+
+
+@router.post("/logout")
+async def logout(data: RefreshIn, session: AsyncSession = Depends(get_session)):
+    family_id = (
+        await session.execute(
+            select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_token(data.refresh_token))
+        )
+    ).scalar_one_or_none()
+    if family_id:
+        await revoke_family(session, family_id)
+        await session.commit()
+    return {"ok": True}
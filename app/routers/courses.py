@@ -2,28 +2,109 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, or_
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import and_, func, select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.db import get_session
+from app.db import async_session, begin_snapshot, get_session
 from app.deps import get_current_user, require_roles
+from app.pagination import PageParams, finish_page, keyset, page_params
 
-from app.models.core import Course, Enrollment, Lesson, VideoProgress, User
+from app.models.core import AccessLevel, Course, Enrollment, Lesson, LessonCompletion, VideoProgress, User
 from app.models.enums import Role, EnrollmentStatus
 
-from app.schemas.courses import CourseOut, EnrollmentOut, VideoProgressIn, CourseCatalogOut
+from app.schemas.courses import (
+    AutoEnrollOut,
+    BulkAssignIn,
+    BulkAssignOut,
+    CourseCatalogOut,
+    CourseOut,
+    CourseUpdate,
+    EnrollmentOut,
+    JobOut,
+    LessonOut,
+    LessonUpdate,
+    VideoProgressIn,
+    VideoProgressOut,
+)
+from app.services.progress_buffer import progress_buffer
+from app.services.watch_bitmap import bitmap_or, bitmap_percent, segments_to_bitmap
+from app.services.enrollments import enroll_count, lessons_completed_expr, lessons_total_expr
+from app.services.jobs import Job, jobs
+from app.services.auto_enroll import reconcile_mandatory
+from app.services.access import access_policy, course_visible, visible_courses
+from app.services.catalog_cache import bump_catalog_version
+from app.services.course_bundles import course_bundles
+from app.settings import settings
 
 router = APIRouter()
 
 
+def _updates(payload, *required: str) -> dict:
+    """Присланные поля PATCH: null очищает поле, а у обязательных полей (required) — 422."""
+    data = payload.model_dump(exclude_unset=True)
+    nulls = [f for f in required if f in data and data[f] is None]
+    if nulls:
+        raise HTTPException(status_code=422, detail=f"{', '.join(nulls)} cannot be null")
+    return data
 
 
 @router.get("", response_model=list[CourseOut])
-async def list_courses(session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    # MVP: показываем все курсы; дальше добавим доступ по отделам/назначениям.
-    rows = (await session.execute(select(Course).order_by(Course.id.desc()))).scalars().all()
-    return list(rows)
+async def list_courses(
+    response: Response,
+    is_public: bool | None = None,
+    is_mandatory: bool | None = None,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    stmt = select(Course).where(await visible_courses(session, user))
+    if is_public is not None:
+        stmt = stmt.where(Course.is_public.is_(is_public))
+    if is_mandatory is not None:
+        stmt = stmt.where(Course.is_mandatory.is_(is_mandatory))
+
+    rows = (await session.execute(keyset(stmt, page, (Course.id, True)))).scalars().all()
+    return finish_page(rows, page, response, lambda c: [c.id])
+
+
+@router.patch("/{course_id}", response_model=CourseOut)
+async def update_course(
+    course_id: int,
+    payload: CourseUpdate,
+    session: AsyncSession = Depends(get_session),
+    _=Depends(require_roles(Role.ADMIN.value)),
+):
+    course = (await session.execute(select(Course).where(Course.id == course_id))).scalar_one_or_none()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    if payload.access_level is not None and await session.get(AccessLevel, payload.access_level) is None:
+        raise HTTPException(status_code=422, detail="Unknown access level")
+
+    data = _updates(payload, "title", "is_mandatory", "deadline_days", "is_public", "access_level")
+    became_mandatory = payload.is_mandatory and not course.is_mandatory
+    for field, value in data.items():
+        setattr(course, field, value)
+    await session.flush()
+
+    if became_mandatory:
+        await reconcile_mandatory(session, course_id=course.id)
+    await bump_catalog_version(session)
+    await session.commit()
+    await session.refresh(course)
+    return course
+
+
+@router.post("/mandatory/reconcile", response_model=AutoEnrollOut)
+async def reconcile_mandatory_courses(
+    session: AsyncSession = Depends(get_session),
+    _=Depends(require_roles(Role.ADMIN.value)),
+):
+    created = await reconcile_mandatory(session)
+    await session.commit()
+    return AutoEnrollOut(created=created)
 
 
 @router.get("/my", response_model=list[EnrollmentOut])
@@ -33,103 +114,147 @@ async def my_enrollments(session: AsyncSession = Depends(get_session), user=Depe
     
 @router.get("/my_full")
 async def my_courses_full(session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    enrolls = (
+    # только чтение: прогресс и статус курса уже посчитаны при записи (services/enrollments.py)
+    await begin_snapshot(session)
+
+    rows = (
         await session.execute(
-            select(Enrollment).where(Enrollment.user_id == user.id)
+            select(
+                Course.id,
+                Course.title,
+                Course.description,
+                Course.is_mandatory,
+                Enrollment.status,
+                Enrollment.progress_percent,
+                Enrollment.deadline_at,
+            )
+            .select_from(Enrollment)
+            .join(Course, Course.id == Enrollment.course_id)
+            .where(Enrollment.user_id == user.id)
+            .order_by(Enrollment.id.asc())
         )
-    ).scalars().all()
+    ).all()
 
-    if not enrolls:
+    if not rows:
         return []
 
-    course_ids = [e.course_id for e in enrolls]
-
-    courses = (
-        await session.execute(
-            select(Course).where(Course.id.in_(course_ids))
-        )
-    ).scalars().all()
-    course_map = {c.id: c for c in courses}
+    course_ids = [r.id for r in rows]
 
+    # уроки (без content) + прогресс видео + отметка о прохождении одним запросом
     lessons = (
         await session.execute(
-            select(Lesson)
+            select(
+                Lesson.id,
+                Lesson.course_id,
+                Lesson.order,
+                Lesson.title,
+                Lesson.video_url,
+                VideoProgress.position_sec,
+                VideoProgress.watched_percent,
+                LessonCompletion.id.is_not(None).label("is_completed"),
+            )
+            .outerjoin(
+                VideoProgress,
+                (VideoProgress.lesson_id == Lesson.id) & (VideoProgress.user_id == user.id),
+            )
+            .outerjoin(
+                LessonCompletion,
+                (LessonCompletion.lesson_id == Lesson.id) & (LessonCompletion.user_id == user.id),
+            )
             .where(Lesson.course_id.in_(course_ids))
             .order_by(Lesson.course_id.asc(), Lesson.order.asc())
         )
-    ).scalars().all()
+    ).all()
 
-    # прогресс видео для пользователя
-    vp_rows = (
-        await session.execute(
-            select(VideoProgress).where(VideoProgress.user_id == user.id)
-        )
-    ).scalars().all()
-    vp_map = {vp.lesson_id: vp for vp in vp_rows}
+    # heartbeat'ы, ещё не сброшенные в БД, свежее строк из video_progress
+    pending = progress_buffer.overlay(user.id)
 
     # группируем уроки по курсу
     by_course = {}
     for l in lessons:
-        by_course.setdefault(l.course_id, []).append(l)
-
-    result = []
-    for e in enrolls:
-        c = course_map.get(e.course_id)
-        if not c:
-            continue
-
-        ls_list = by_course.get(c.id, [])
-        lessons_out = []
-
-        completed_cnt = 0
-        for l in ls_list:
-            vp = vp_map.get(l.id)
-            watched = int(vp.watched_percent) if vp else 0
-            pos = int(vp.position_sec) if vp else 0
-            is_completed = watched >= 100
-            if is_completed:
-                completed_cnt += 1
-
-            lessons_out.append({
-                "id": l.id,
-                "order": l.order,
-                "title": l.title,
-                "video_url": l.video_url,
-                "watched_percent": watched,
-                "position_sec": pos,
-                "is_completed": is_completed,
-            })
-
-        total = len(ls_list)
-        progress = int((completed_cnt / total) * 100) if total else 0
-
-        # синхронизируем enrollment.progress_percent
-        if e.progress_percent != progress:
-            e.progress_percent = progress
-
-            if progress >= 100:
-                e.status = EnrollmentStatus.COMPLETED.value
-            elif progress > 0 and e.status == EnrollmentStatus.ASSIGNED.value:
-                e.status = EnrollmentStatus.IN_PROGRESS.value
-
-        result.append({
-            "id": c.id,
-            "title": c.title,
-            "description": c.description,
-            "is_mandatory": c.is_mandatory,
-            "status": e.status,
-            "progress_percent": e.progress_percent,
-            "deadline_at": e.deadline_at,
-            "lessons": lessons_out,
+        pos, watched = l.position_sec, l.watched_percent
+        vp = pending.get(l.id)
+        if vp is not None:
+            pos = vp.position_sec
+            if vp.watched_percent is not None:
+                watched = vp.watched_percent
+        watched = int(watched or 0)
+
+        by_course.setdefault(l.course_id, []).append({
+            "id": l.id,
+            "order": l.order,
+            "title": l.title,
+            "video_url": l.video_url,
+            "watched_percent": watched,
+            "position_sec": int(pos or 0),
+            "is_completed": l.is_completed or watched >= 100,
         })
 
-    await session.commit()
-    return result
+    return [
+        {
+            "id": r.id,
+            "title": r.title,
+            "description": r.description,
+            "is_mandatory": r.is_mandatory,
+            "status": r.status,
+            "progress_percent": r.progress_percent,
+            "deadline_at": r.deadline_at,
+            "lessons": by_course.get(r.id, []),
+        }
+        for r in rows
+    ]
+
+# содержимое зависит только от курса, но отдаётся после авторизации: только приватный кэш
+# браузера, и каждый раз с ревалидацией по ETag
+_BUNDLE_CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _conditional_json(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": _BUNDLE_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.get("/{course_id}/lessons")
-async def list_lessons(course_id: int, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    lessons = (await session.execute(select(Lesson).where(Lesson.course_id == course_id).order_by(Lesson.order))).scalars().all()
-    return [{"id": l.id, "order": l.order, "title": l.title, "video_url": l.video_url} for l in lessons]
+async def list_lessons(
+    course_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    # кэш байтов общий для всех, поэтому доступ проверяется до него, по каждому запросу
+    if not await course_visible(session, user, course_id):
+        raise HTTPException(status_code=404, detail="Course not found")
+    bundle = await course_bundles.get(session, course_id)
+    if bundle is None:
+        # курс удалили между проверкой и чтением
+        return _conditional_json(request, b"[]", '"empty"')
+    return _conditional_json(request, bundle.lessons, bundle.lessons_etag)
+
+
+@router.get("/{course_id}/bundle")
+async def course_bundle(
+    course_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """Курс и упорядоченные уроки одним ответом; повторные открытия — из кэша или 304."""
+    if not await course_visible(session, user, course_id):
+        raise HTTPException(status_code=404, detail="Course not found")
+    bundle = await course_bundles.get(session, course_id)
+    if bundle is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return _conditional_json(request, bundle.bundle, bundle.bundle_etag)
 
 from sqlalchemy import select, or_
 
@@ -155,7 +280,8 @@ async def start_course(
             await session.commit()
         return {"ok": True, "already_enrolled": True}
 
-    if not course.is_public:
+    levels = await access_policy.allowed(session, user)
+    if not course.is_public or (levels is not None and course.access_level not in levels):
         raise HTTPException(status_code=403, detail="Course is not available without assignment")
 
     deadline_at = None
@@ -168,69 +294,126 @@ async def start_course(
         status=EnrollmentStatus.IN_PROGRESS.value,
         progress_percent=0,
         deadline_at=deadline_at,
+        lessons_total=lessons_total_expr(course_id),
+        lessons_completed=lessons_completed_expr(user.id, course_id),
     ))
     await session.commit()
     return {"ok": True, "already_enrolled": False}
 
 @router.get("/catalog", response_model=list[CourseCatalogOut])
 async def catalog(
+    response: Response,
+    is_public: bool | None = None,
+    status: EnrollmentStatus | None = None,
+    page: PageParams = Depends(page_params),
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
 ):
-    enrolls = (
-        await session.execute(select(Enrollment).where(Enrollment.user_id == user.id))
-    ).scalars().all()
-    enr_map = {e.course_id: e for e in enrolls}
-
-    # админ видит всё, остальные: public + назначенные
-    if user.role == Role.ADMIN.value:
-        courses = (await session.execute(select(Course).order_by(Course.id.desc()))).scalars().all()
-    else:
-        assigned_ids = list(enr_map.keys())
-        cond = Course.is_public.is_(True)
-        if assigned_ids:
-            cond = or_(Course.is_public.is_(True), Course.id.in_(assigned_ids))
-        courses = (await session.execute(select(Course).where(cond).order_by(Course.id.desc()))).scalars().all()
-
-    out = []
-    for c in courses:
-        e = enr_map.get(c.id)
-        out.append({
-            "id": c.id,
-            "title": c.title,
-            "description": c.description,
-            "is_mandatory": c.is_mandatory,
-            "deadline_days": c.deadline_days,
-            "is_public": c.is_public,
-            "enrolled": e is not None,
-            "status": e.status if e else None,
-            "progress_percent": e.progress_percent if e else None,
-            "deadline_at": e.deadline_at if e else None,
-        })
-    return out
+    # видимость (назначенные + публичные с открытым уровнем доступа) — условием в том же запросе
+    enr = aliased(Enrollment)
+    stmt = (
+        select(
+            Course.id,
+            Course.title,
+            Course.description,
+            Course.is_mandatory,
+            Course.deadline_days,
+            Course.is_public,
+            Course.access_level,
+            enr.id.is_not(None).label("enrolled"),
+            enr.status,
+            enr.progress_percent,
+            enr.deadline_at,
+        )
+        .outerjoin(enr, and_(enr.course_id == Course.id, enr.user_id == user.id))
+        .where(await visible_courses(session, user))
+    )
+    if is_public is not None:
+        stmt = stmt.where(Course.is_public.is_(is_public))
+    if status is not None:
+        stmt = stmt.where(enr.status == status.value)
 
+    rows = (await session.execute(keyset(stmt, page, (Course.id, True)))).all()
+    return finish_page(rows, page, response, lambda c: [c.id])
 
-@router.put("/lessons/{lesson_id}/progress")
-async def save_progress(
+
+@router.get("/lessons/{lesson_id}/progress", response_model=VideoProgressOut)
+async def get_progress(
     lesson_id: int,
-    payload: VideoProgressIn,
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
 ):
-    # MVP-валидация против "читерства" углубим позже (нужны длительности видео/сессии)
-    vp = (await session.execute(
-        select(VideoProgress).where(VideoProgress.user_id == user.id, VideoProgress.lesson_id == lesson_id)
-    )).scalar_one_or_none()
+    pending = progress_buffer.get(user.id, lesson_id)
+    if pending is not None and pending.watched_percent is not None and pending.bitmap is None:
+        return VideoProgressOut(lesson_id=lesson_id, position_sec=pending.position_sec, watched_percent=pending.watched_percent)
+
+    row = (await session.execute(
+        select(
+            VideoProgress.position_sec,
+            VideoProgress.watched_percent,
+            VideoProgress.watched_bitmap,
+            Lesson.duration_sec,
+        )
+        .select_from(Lesson)
+        .outerjoin(
+            VideoProgress,
+            (VideoProgress.lesson_id == Lesson.id) & (VideoProgress.user_id == user.id),
+        )
+        .where(Lesson.id == lesson_id)
+    )).one_or_none()
+    if pending is None:
+        if row is None or row.position_sec is None:
+            return VideoProgressOut(lesson_id=lesson_id, position_sec=0, watched_percent=0)
+        return VideoProgressOut(lesson_id=lesson_id, position_sec=row.position_sec, watched_percent=row.watched_percent)
+
+    # несброшенные отрезки поверх сохранённой карты — как это сделает flush
+    duration = row.duration_sec if row else None
+    watched = bitmap_percent(bitmap_or(row.watched_bitmap if row else None, pending.bitmap), duration)
+    if watched is None:
+        watched = pending.watched_percent
+    if watched is None:
+        watched = (row.watched_percent if row else None) or 0
+    return VideoProgressOut(lesson_id=lesson_id, position_sec=pending.position_sec, watched_percent=watched)
+
+
+@router.patch("/lessons/{lesson_id}", response_model=LessonOut)
+async def update_lesson(
+    lesson_id: int,
+    payload: LessonUpdate,
+    session: AsyncSession = Depends(get_session),
+    _=Depends(require_roles(Role.ADMIN.value)),
+):
+    lesson = await session.get(Lesson, lesson_id)
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Lesson not found")
 
-    if not vp:
-        vp = VideoProgress(user_id=user.id, lesson_id=lesson_id)
-        session.add(vp)
+    for field, value in _updates(payload, "title").items():
+        setattr(lesson, field, value)
+    await bump_catalog_version(session)
+    await session.commit()
+    await session.refresh(lesson)
+    return lesson
 
-    vp.position_sec = payload.position_sec
-    vp.watched_percent = payload.watched_percent
 
-    await session.commit()
+@router.put("/lessons/{lesson_id}/progress")
+async def save_progress(
+    lesson_id: int,
+    payload: VideoProgressIn,
+    user=Depends(get_current_user),
+):
+    # запись в БД — пачкой из буфера (см. services/progress_buffer.py);
+    # отрезки сразу сворачиваются в битовую карту и OR'ятся с несброшенной,
+    # процент по ней считается относительно Lesson.duration_sec при сбросе
+    progress_buffer.put(
+        user.id,
+        lesson_id,
+        payload.position_sec,
+        payload.watched_percent,
+        bitmap=segments_to_bitmap(payload.segments),
+    )
     return {"ok": True}
+
+
 @router.post("/assign")
 async def assign_course(
     payload: dict,
@@ -266,7 +449,93 @@ async def assign_course(
         status=EnrollmentStatus.ASSIGNED.value,
         progress_percent=0,
         deadline_at=deadline_at,
+        lessons_total=lessons_total_expr(course_id),
+        lessons_completed=lessons_completed_expr(user_id, course_id),
     )
     session.add(enr)
     await session.commit()
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
+
+
+def _bulk_pairs(payload: BulkAssignIn):
+    """(user_id, course_id, deadline_days) для всех пользователей под фильтры."""
+    stmt = (
+        select(User.id.label("user_id"), Course.id.label("course_id"), Course.deadline_days)
+        .join(Course, Course.id == payload.course_id)
+    )
+    if payload.user_ids:
+        stmt = stmt.where(User.id.in_(payload.user_ids))
+    if payload.department_ids:
+        stmt = stmt.where(User.department_id.in_(payload.department_ids))
+    if payload.roles:
+        stmt = stmt.where(User.role.in_([r.value for r in payload.roles]))
+    if payload.only_active:
+        stmt = stmt.where(User.is_active.is_(True))
+    return stmt
+
+
+async def _bulk_assign_job(job: Job, payload: BulkAssignIn, targeted: int) -> dict:
+    # пачками по id пользователя: короткие транзакции вместо одной огромной
+    created = 0
+    processed = 0
+    last_id = 0
+    job.progress = {"targeted": targeted, "processed": 0, "created": 0}
+    while True:
+        async with async_session() as session:
+            chunk = (
+                _bulk_pairs(payload)
+                .where(User.id > last_id)
+                .order_by(User.id)
+                .limit(settings.bulk_assign_batch_size)
+                .subquery()
+            )
+            bounds = (await session.execute(select(func.count(), func.max(chunk.c.user_id)))).one()
+            if not bounds[0]:
+                break
+            created += await enroll_count(
+                session, _bulk_pairs(payload).where(User.id > last_id, User.id <= bounds[1])
+            )
+            await session.commit()
+
+        last_id = bounds[1]
+        processed += bounds[0]
+        job.progress.update(processed=processed, created=created)
+
+    return {"targeted": processed, "created": created, "skipped": processed - created}
+
+
+@router.post("/assign/bulk", response_model=BulkAssignOut)
+async def assign_course_bulk(
+    payload: BulkAssignIn,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    _=Depends(require_roles(Role.ADMIN.value)),
+):
+    if not (payload.user_ids or payload.department_ids or payload.roles):
+        raise HTTPException(status_code=400, detail="Specify user_ids, department_ids or roles")
+
+    exists = (await session.execute(select(Course.id).where(Course.id == payload.course_id))).scalar_one_or_none()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    targeted = (
+        await session.execute(select(func.count()).select_from(_bulk_pairs(payload).subquery()))
+    ).scalar_one()
+
+    if targeted > settings.bulk_assign_sync_limit:
+        job = jobs.start("bulk_assign", lambda job: _bulk_assign_job(job, payload, targeted))
+        response.status_code = 202
+        return BulkAssignOut(targeted=targeted, created=0, skipped=0, job_id=job.id)
+
+    # один INSERT ... SELECT ... ON CONFLICT DO NOTHING на всех
+    created = await enroll_count(session, _bulk_pairs(payload))
+    await session.commit()
+    return BulkAssignOut(targeted=targeted, created=created, skipped=targeted - created)
+
+
+@router.get("/assign/jobs/{job_id}", response_model=JobOut)
+async def assign_job_status(job_id: str, _=Depends(require_roles(Role.ADMIN.value))):
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_session
+from app.deps import get_current_user, require_roles
+from app.pagination import PageParams, finish_page, keyset, page_params
+from app.models.core import DeadlineDigest, User
+from app.models.enums import Role
+from app.schemas.deadlines import DeadlineDigestOut
+from app.services.scheduler import scheduler
+
+router = APIRouter()
+
+_COLUMNS = (
+    DeadlineDigest.id,
+    DeadlineDigest.user_id,
+    User.full_name,
+    User.email,
+    User.department_id,
+    DeadlineDigest.digest_date,
+    DeadlineDigest.overdue_count,
+    DeadlineDigest.due_soon_count,
+    DeadlineDigest.items,
+    DeadlineDigest.updated_at,
+)
+
+
+@router.get(
+    "/digests",
+    response_model=list[DeadlineDigestOut],
+    dependencies=[Depends(require_roles(Role.LD_MANAGER.value, Role.TEAM_LEAD.value, Role.ADMIN.value))],
+)
+async def list_digests(
+    response: Response,
+    digest_date: date | None = None,
+    department_id: int | None = None,
+    overdue_only: bool = False,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_session),
+):
+    # сводки готовит планировщик (services/deadlines.py); здесь только чтение
+    day = digest_date or datetime.now(timezone.utc).date()
+    stmt = (
+        select(*_COLUMNS)
+        .join(User, User.id == DeadlineDigest.user_id)
+        .where(DeadlineDigest.digest_date == day)
+    )
+    if department_id is not None:
+        stmt = stmt.where(User.department_id == department_id)
+    if overdue_only:
+        stmt = stmt.where(DeadlineDigest.overdue_count > 0)
+
+    # сначала те, у кого больше всего просрочек
+    rows = (
+        await session.execute(keyset(stmt, page, (DeadlineDigest.overdue_count, True), (DeadlineDigest.id, True)))
+    ).all()
+    return finish_page(rows, page, response, lambda r: [r.overdue_count, r.id])
+
+
+@router.get("/me", response_model=DeadlineDigestOut | None)
+async def my_digest(session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
+    # только сегодняшняя: когда сроков не осталось, планировщик её удаляет, а старые уже неактуальны
+    today = datetime.now(timezone.utc).date()
+    return (
+        await session.execute(
+            select(*_COLUMNS)
+            .join(User, User.id == DeadlineDigest.user_id)
+            .where(DeadlineDigest.user_id == user.id, DeadlineDigest.digest_date == today)
+        )
+    ).one_or_none()
+
+
+@router.post("/sweep", dependencies=[Depends(require_roles(Role.ADMIN.value))])
+async def run_sweep():
+    result = await scheduler.run_once("deadline_sweep")
+    if result is None:
+        raise HTTPException(status_code=409, detail="Sweep is already running or failed, see /metrics")
+    return result
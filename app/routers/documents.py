@@ -1,22 +1,217 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from pathlib import PurePosixPath
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_session
-from app.deps import get_current_user
-from app.models.core import Document
-from app.schemas.documents import DocumentOut
+from app.deps import get_current_user, require_roles
+from app.pagination import PageParams, finish_page, keyset, page_params
+from app.models.core import AccessLevel, Document, DocumentFile
+from app.models.enums import Role
+from app.schemas.documents import DocumentOut, DocumentSearchOut, DocumentTextHit
+from app.schemas.media import MediaUrlOut
+from app.security.jwt import create_document_token, decode_token
+from app.services.access import access_policy
+from app.services.document_files import blob_path, document_storage
+from app.services.document_index import requeue, search_document_text
+from app.services.document_search import search_documents
+from app.services.media import ranged_file_response
+from app.settings import settings
 
 router = APIRouter()
 
+# тип файла заявляет загрузивший; в браузере (inline, с нашего origin'а) открываются
+# только типы, в которых не может быть скриптов, остальное — скачиванием
+_INLINE_TYPES = frozenset({"application/pdf", "image/png", "image/jpeg", "image/gif", "image/webp", "text/plain"})
+
+
+@router.get("/search", response_model=DocumentSearchOut)
+async def search(
+    response: Response,
+    q: str = Query(min_length=1, max_length=200),
+    category: str | None = None,
+    access_level: str | None = None,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """Поиск по названию: по релевантности, с фасетами; курсор — в X-Next-Cursor."""
+    visible = await access_policy.where(session, user, Document.access_level)
+    items, facets = await search_documents(session, q.strip(), page, category, access_level, visible)
+    items = finish_page(items, page, response, lambda r: [r.score, r.id])
+    return DocumentSearchOut(items=items, facets=facets)
+
+
+@router.get("/fulltext", response_model=list[DocumentTextHit])
+async def fulltext(
+    q: str = Query(min_length=2, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """Поиск по тексту загруженных файлов (извлекается в фоне, services/document_index.py)."""
+    visible = await access_policy.where(session, user, Document.access_level)
+    return await search_document_text(session, q.strip(), visible, limit)
+
 
 @router.get("", response_model=list[DocumentOut])
-async def list_documents(q: str | None = None, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    stmt = select(Document).order_by(Document.id.desc())
+async def list_documents(
+    response: Response,
+    q: str | None = None,
+    category: str | None = None,
+    access_level: str | None = None,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    stmt = select(Document).where(await access_policy.where(session, user, Document.access_level))
     if q:
         stmt = stmt.where(Document.title.ilike(f"%{q}%"))
-    rows = (await session.execute(stmt)).scalars().all()
-    # MVP: access_level проверим позже (All/Admins Only + отделы)
-    return list(rows)
+    if category:
+        stmt = stmt.where(Document.category == category)
+    if access_level:
+        stmt = stmt.where(Document.access_level == access_level)
+    rows = (await session.execute(keyset(stmt, page, (Document.id, True)))).scalars().all()
+    return finish_page(rows, page, response, lambda d: [d.id])
+
+
+def _file_name(name: str) -> str:
+    # только имя, без пути (C:\docs\a.pdf, ../a.pdf)
+    name = PurePosixPath(name.replace("\\", "/")).name.strip()
+    if not name:
+        raise HTTPException(status_code=422, detail="Invalid filename")
+    return name
+
+
+async def _store_body(request: Request, session: AsyncSession):
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > settings.document_max_upload_bytes:
+        raise HTTPException(status_code=413, detail="File too large")
+    content_type = request.headers.get("content-type") or "application/octet-stream"
+    return await document_storage.save(session, request.stream(), content_type[:255])
+
+
+@router.post("/upload", response_model=DocumentOut, status_code=201)
+async def upload_document(
+    request: Request,
+    title: str = Query(min_length=1, max_length=255),
+    filename: str = Query(min_length=1, max_length=255),
+    category: str = Query("HR", max_length=64),
+    access_level: str = Query("All", max_length=64),
+    session: AsyncSession = Depends(get_session),
+    _=Depends(require_roles(Role.ADMIN.value)),
+):
+    """Новый документ с файлом: тело запроса — сам файл (не multipart), пишется на диск потоком."""
+    name = _file_name(filename)
+    if await session.get(AccessLevel, access_level) is None:
+        raise HTTPException(status_code=422, detail="Unknown access level")
+    stored = await _store_body(request, session)
+    doc = Document(
+        title=title, file_url="", category=category, access_level=access_level, file_hash=stored.hash, file_name=name
+    )
+    session.add(doc)
+    await session.flush()
+    doc.file_url = f"/documents/{doc.id}/file"
+    await session.commit()
+    return doc
+
+
+@router.put("/{document_id}/file", response_model=DocumentOut)
+async def replace_document_file(
+    document_id: int,
+    request: Request,
+    filename: str = Query(min_length=1, max_length=255),
+    session: AsyncSession = Depends(get_session),
+    _=Depends(require_roles(Role.ADMIN.value)),
+):
+    """Заменить файл документа (тело запроса — файл); прежний удаляется, если больше нигде не нужен."""
+    doc = (
+        await session.execute(select(Document).where(Document.id == document_id).with_for_update())
+    ).scalar_one_or_none()
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    name = _file_name(filename)
+    stored = await _store_body(request, session)
+    old_hash = doc.file_hash
+    doc.file_hash = stored.hash
+    doc.file_name = name
+    doc.file_url = f"/documents/{doc.id}/file"
+    await session.flush()
+    released = old_hash != stored.hash and await document_storage.release(session, old_hash)
+    await session.commit()
+    if released:
+        await document_storage.remove_blob(old_hash)
+    return doc
+
+
+@router.get("/{document_id}/file/url", response_model=MediaUrlOut)
+async def document_file_url(
+    document_id: int,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """Подписанная ссылка на файл документа: для <a href>, куда нельзя передать Authorization."""
+    row = (
+        await session.execute(
+            select(Document.file_hash, Document.file_name, DocumentFile.content_type)
+            .join(DocumentFile, DocumentFile.hash == Document.file_hash)
+            .where(Document.id == document_id, await access_policy.where(session, user, Document.access_level))
+        )
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Document file not found")
+
+    token = create_document_token(
+        user_id=user.id,
+        document_id=document_id,
+        file_hash=row.file_hash.hex(),
+        name=row.file_name or f"document-{document_id}",
+        content_type=row.content_type,
+    )
+    return MediaUrlOut(
+        url=f"/documents/{document_id}/file?token={quote(token)}",
+        expires_in=settings.media_token_minutes * 60,
+    )
+
+
+@router.api_route("/{document_id}/file", methods=["GET", "HEAD"])
+async def document_file(document_id: int, token: str, request: Request):
+    """Отдача файла без обращений к БД: Range, ETag = sha256 содержимого, sendfile."""
+    try:
+        payload = decode_token(token)
+        digest = bytes.fromhex(payload["hash"])
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid document token")
+    if payload.get("typ") != "document" or payload.get("doc") != document_id:
+        raise HTTPException(status_code=401, detail="Invalid document token")
+
+    inline = payload["ctype"].split(";", 1)[0].strip().lower() in _INLINE_TYPES
+    return await ranged_file_response(
+        request,
+        blob_path(digest),
+        headers={
+            "Cache-Control": "private, max-age=3600",
+            "Content-Disposition": f"{'inline' if inline else 'attachment'}; filename*=UTF-8''{quote(payload['name'])}",
+            "X-Content-Type-Options": "nosniff",
+        },
+        etag=f'"{payload["hash"]}"',
+        media_type=payload["ctype"],
+    )
+
+
+@router.post("/{document_id}/reindex", status_code=202)
+async def reindex_document(
+    document_id: int,
+    session: AsyncSession = Depends(get_session),
+    _=Depends(require_roles(Role.ADMIN.value)),
+):
+    """Заново извлечь текст файла документа (например, после ошибки разбора)."""
+    if not await requeue(session, document_id):
+        raise HTTPException(status_code=404, detail="Document file not found")
+    await session.commit()
+    return {"ok": True}
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.deps import get_current_user
+from app.services.events import events
+from app.settings import settings
+
+router = APIRouter()
+
+
+@router.get("/stream")
+async def stream(user=Depends(get_current_user)):
+    """
+    Server-Sent Events: report.created / report.updated / report.decided
+    по своим отчётам, для менторов — ещё и по отчётам отдела.
+    data — JSON {type, report_id, user_id, department_id, status, day_number}.
+    """
+    sub = events.subscribe(user)
+    if sub is None:
+        raise HTTPException(status_code=503, detail="Too many event streams")
+
+    async def body():
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), settings.events_keepalive_seconds)
+                except TimeoutError:
+                    # комментарий не даёт прокси закрыть простаивающее соединение
+                    yield b": keepalive\n\n"
+                    continue
+                yield frame
+        finally:
+            events.unsubscribe(sub)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
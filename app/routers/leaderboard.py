@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_session
+from app.deps import get_current_user, require_roles
+from app.models.core import StreakLeaderboard
+from app.models.enums import Role
+from app.schemas.leaderboard import LeaderboardOut
+from app.services.scheduler import scheduler
+from app.services.streaks import DEPARTMENT, GLOBAL
+
+router = APIRouter()
+
+
+@router.get("", response_model=LeaderboardOut)
+async def leaderboard(
+    scope: Literal["global", "department"] = GLOBAL,
+    department_id: int | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    Топ по сериям входов из streak_leaderboard (пересобирается планировщиком
+    раз в streak_leaderboard_refresh_seconds). scope=department — отдел
+    department_id или, по умолчанию, свой.
+    """
+    stmt = select(StreakLeaderboard).where(StreakLeaderboard.scope == scope)
+    if scope == DEPARTMENT:
+        department_id = department_id if department_id is not None else user.department_id
+        if department_id is None:
+            return LeaderboardOut(scope=scope, items=[])
+        stmt = stmt.where(StreakLeaderboard.department_id == department_id)
+    else:
+        department_id = None
+
+    rows = (
+        await session.execute(stmt.order_by(StreakLeaderboard.rank, StreakLeaderboard.user_id).limit(limit))
+    ).scalars().all()
+    return LeaderboardOut(
+        scope=scope,
+        department_id=department_id,
+        refreshed_at=rows[0].refreshed_at if rows else None,
+        items=rows,
+    )
+
+
+@router.post("/refresh", dependencies=[Depends(require_roles(Role.ADMIN.value))])
+async def run_refresh():
+    result = await scheduler.run_once("streak_leaderboard")
+    if result is None:
+        raise HTTPException(status_code=409, detail="Refresh is already running or failed, see /metrics")
+    return result
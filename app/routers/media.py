@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_session
+from app.deps import get_current_user
+from app.models.core import Enrollment, Lesson
+from app.models.enums import Role
+from app.schemas.media import MediaUrlOut
+from app.security.jwt import create_media_token, decode_token
+from app.services.media import ranged_file_response, resolve_media_path
+from app.settings import settings
+
+router = APIRouter()
+
+# роли, которым видео доступны без записи на курс
+_STAFF = (Role.ADMIN.value, Role.LD_MANAGER.value)
+
+
+@router.get("/lessons/{lesson_id}/url", response_model=MediaUrlOut)
+async def lesson_media_url(
+    lesson_id: int,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    Подписанная ссылка на видео урока. Проверка записи на курс делается здесь,
+    один раз; сами Range-запросы плеера идут без обращений к БД.
+    """
+    lesson = (
+        await session.execute(select(Lesson.media_path, Lesson.course_id).where(Lesson.id == lesson_id))
+    ).one_or_none()
+    if lesson is None or not lesson.media_path:
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    if user.role not in _STAFF:
+        enrolled = (
+            await session.execute(
+                select(Enrollment.id).where(Enrollment.user_id == user.id, Enrollment.course_id == lesson.course_id)
+            )
+        ).scalar_one_or_none()
+        if enrolled is None:
+            raise HTTPException(status_code=403, detail="Not enrolled in this course")
+
+    token = create_media_token(user_id=user.id, lesson_id=lesson_id, path=lesson.media_path)
+    return MediaUrlOut(
+        url=f"/media/lessons/{lesson_id}?token={quote(token)}",
+        expires_in=settings.media_token_minutes * 60,
+    )
+
+
+@router.api_route("/lessons/{lesson_id}", methods=["GET", "HEAD"])
+async def lesson_media(lesson_id: int, token: str, request: Request):
+    try:
+        payload = decode_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid media token")
+    if payload.get("typ") != "media" or payload.get("lesson") != lesson_id:
+        raise HTTPException(status_code=401, detail="Invalid media token")
+
+    path = resolve_media_path(payload["path"])
+    return await ranged_file_response(request, path, headers={"Cache-Control": "private, max-age=3600"})
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+
+from app.deps import require_roles
+from app.models.enums import Role
+from app.security.passwords import password_service
+from app.services.access import access_policy
+from app.services.course_bundles import course_bundles
+from app.services.document_files import document_storage
+from app.services.document_index import document_indexer
+from app.services.events import events
+from app.services.principal_cache import principal_cache
+from app.services.progress_buffer import progress_buffer
+from app.services.scheduler import scheduler
+
+router = APIRouter()
+
+
+@router.get("", dependencies=[Depends(require_roles(Role.ADMIN.value))])
+async def metrics():
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_service": password_service.stats(),
+        "progress_buffer": progress_buffer.stats(),
+        "course_bundles": course_bundles.stats(),
+        "scheduler": scheduler.stats(),
+        "events": events.stats(),
+        "document_storage": document_storage.stats(),
+        "document_indexer": document_indexer.stats(),
+        "access_policy": access_policy.stats(),
+    }
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_session
+from app.db import begin_snapshot, get_session
 from app.deps import require_roles
 from app.models.core import Course, Lesson, Enrollment, LessonCompletion
 from app.models.enums import Role, EnrollmentStatus
 from app.schemas.my_courses import MyCourseOut, LessonOut, CompleteLessonIn
+from app.services.enrollments import mark_lessons_completed, unmark_lesson_completed
 
 router = APIRouter()
 
@@ -15,92 +16,71 @@ async def my_courses(
     session: AsyncSession = Depends(get_session),
     me=Depends(require_roles(Role.ADMIN.value, Role.MENTOR.value, Role.EMPLOYEE.value, Role.TEAM_LEAD.value, Role.LD_MANAGER.value)),
 ):
-    # enrollments пользователя
-    enrolls = (
+    # только чтение: прогресс и статус уже посчитаны при записи (services/enrollments.py)
+    await begin_snapshot(session)
+
+    rows = (
         await session.execute(
-            select(Enrollment).where(Enrollment.user_id == me.id)
+            select(
+                Course.id,
+                Course.title,
+                Course.description,
+                Course.is_mandatory,
+                Enrollment.status,
+                Enrollment.progress_percent,
+                Enrollment.deadline_at,
+            )
+            .select_from(Enrollment)
+            .join(Course, Course.id == Enrollment.course_id)
+            .where(Enrollment.user_id == me.id)
+            .order_by(Enrollment.id.asc())
         )
-    ).scalars().all()
+    ).all()
 
-    if not enrolls:
+    if not rows:
         return []
 
-    course_ids = [e.course_id for e in enrolls]
-
-    courses = (
-        await session.execute(
-            select(Course).where(Course.id.in_(course_ids))
-        )
-    ).scalars().all()
-    course_map = {c.id: c for c in courses}
-    enroll_map = {e.course_id: e for e in enrolls}
+    course_ids = [r.id for r in rows]
 
+    # уроки (только нужные колонки, без content) + отметка о прохождении одним запросом
     lessons = (
         await session.execute(
-            select(Lesson).where(Lesson.course_id.in_(course_ids)).order_by(Lesson.course_id.asc(), Lesson.order.asc())
-        )
-    ).scalars().all()
-
-    # completions
-    comp_rows = (
-        await session.execute(
-            select(LessonCompletion.lesson_id).where(LessonCompletion.user_id == me.id)
+            select(
+                Lesson.id,
+                Lesson.course_id,
+                Lesson.order,
+                Lesson.title,
+                LessonCompletion.id.is_not(None).label("is_completed"),
+            )
+            .outerjoin(
+                LessonCompletion,
+                (LessonCompletion.lesson_id == Lesson.id) & (LessonCompletion.user_id == me.id),
+            )
+            .where(Lesson.course_id.in_(course_ids))
+            .order_by(Lesson.course_id.asc(), Lesson.order.asc())
         )
-    ).scalars().all()
-    completed_set = set(comp_rows)
+    ).all()
 
     # группируем уроки по курсу
     by_course = {}
     for ls in lessons:
-        by_course.setdefault(ls.course_id, []).append(ls)
-
-    out: list[MyCourseOut] = []
-
-    for cid in course_ids:
-        c = course_map.get(cid)
-        e = enroll_map.get(cid)
-        if not c or not e:
-            continue
-
-        ls_list = by_course.get(cid, [])
-        total = len(ls_list)
-        done = sum(1 for l in ls_list if l.id in completed_set)
-        progress = int((done / total) * 100) if total else 0
-
-        # обновим статус по прогрессу (по ТЗ: завершено = read-only)
-        if progress >= 100:
-            e.status = EnrollmentStatus.COMPLETED.value
-            e.progress_percent = 100
-        elif progress > 0 and e.status == EnrollmentStatus.ASSIGNED.value:
-            e.status = EnrollmentStatus.IN_PROGRESS.value
-            e.progress_percent = progress
-        else:
-            e.progress_percent = progress
-
-        await session.commit()
-
-        out.append(
-            MyCourseOut(
-                course_id=c.id,
-                title=c.title,
-                description=c.description,
-                is_mandatory=c.is_mandatory,
-                status=e.status,
-                progress_percent=e.progress_percent,
-                deadline_at=e.deadline_at,
-                lessons=[
-                    LessonOut(
-                        id=l.id,
-                        order=l.order,
-                        title=l.title,
-                        is_completed=(l.id in completed_set),
-                    )
-                    for l in ls_list
-                ],
-            )
+        by_course.setdefault(ls.course_id, []).append(
+            LessonOut(id=ls.id, order=ls.order, title=ls.title, is_completed=ls.is_completed)
         )
 
-    return out
+    return [
+        MyCourseOut(
+            course_id=r.id,
+            title=r.title,
+            description=r.description,
+            is_mandatory=r.is_mandatory,
+            status=r.status,
+            progress_percent=r.progress_percent,
+            deadline_at=r.deadline_at,
+            lessons=by_course.get(r.id, []),
+        )
+        for r in rows
+    ]
 
 
 @router.post("/complete_lesson")
@@ -131,13 +111,14 @@ async def complete_lesson(
         )
     ).scalar_one_or_none()
 
+    # вместе с отметкой обновляются счётчики прогресса на enrollment
     if payload.completed:
         if not existing:
-            session.add(LessonCompletion(user_id=me.id, lesson_id=lesson.id))
+            await mark_lessons_completed(session, [(me.id, lesson.id)])
             await session.commit()
     else:
         if existing:
-            await session.delete(existing)
+            await unmark_lesson_completed(session, me.id, lesson.id)
             await session.commit()
 
     return {"ok": True}
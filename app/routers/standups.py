@@ -1,17 +1,98 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.core import DailyReportRevision
 from app.db import get_session
 from app.deps import get_current_user, require_roles
-from app.models.core import DailyReport, User
+from app.pagination import PageParams, finish_page, keyset, page_params
+from app.services.events import events
+from app.services.mentor_decisions import apply_decisions
+from app.services.report_bodies import add_revision
+from app.services.report_search import search_reports
+from app.services.standup_stats import load_stats, record_created, record_decision, record_resubmitted
+from app.models.core import DailyReport, ReportBody, User
 from app.models.enums import Role, ReportStatus
-from app.schemas.standups import ReportCreate, ReportUpdate, ReportOut, MentorDecisionIn
+from app.schemas.standups import (
+    BulkDecisionIn,
+    BulkDecisionOut,
+    ReportCreate,
+    ReportUpdate,
+    ReportOut,
+    ReportSummaryOut,
+    MentorDecisionIn,
+    MentorInboxOut,
+    ReportSearchHit,
+    StandupStatsOut,
+    RevisionOut,
+    RevisionSummaryOut,
+)
 
 router = APIRouter()
 
+# списки читают только нужные колонки: тексты отчётов — самые тяжёлые поля,
+# в режиме view=summary они не выбираются из БД вовсе
+View = Literal["full", "summary"]
+
+_REPORT_BODY = (DailyReport.text_done, DailyReport.text_plan, DailyReport.text_blockers)
+_REPORT_SUMMARY = (
+    DailyReport.id,
+    DailyReport.user_id,
+    DailyReport.day_number,
+    DailyReport.status,
+    DailyReport.mentor_comment,
+    DailyReport.created_at,
+)
+# тексты ревизий — в report_bodies (общие для одинакового содержимого), см. _revisions()
+_REVISION_BODY = (ReportBody.text_done, ReportBody.text_plan, ReportBody.text_blockers)
+_REVISION_SUMMARY = (
+    DailyReportRevision.id,
+    DailyReportRevision.created_at,
+    DailyReportRevision.status,
+    DailyReportRevision.mentor_comment,
+)
+
+
+def _columns(summary: tuple, body: tuple, view: View) -> tuple:
+    return summary if view == "summary" else summary + body
+
+
+# очередь ментора: ждущие проверки, затем на доработке, затем принятые
+_STATUS_RANK = case(
+    {ReportStatus.PENDING.value: 0, ReportStatus.REVISION.value: 1},
+    value=DailyReport.status,
+    else_=2,
+)
+
+
+def _revisions(view: View):
+    stmt = select(*_columns(_REVISION_SUMMARY, _REVISION_BODY, view))
+    if view == "full":
+        stmt = stmt.join(ReportBody, ReportBody.hash == DailyReportRevision.body_hash)
+    return stmt
+
+
+async def _notify(session: AsyncSession, event_type: str, report: DailyReport, department_id: int | None) -> None:
+    # pg_notify транзакционный: событие уйдёт подписчикам вместе с commit
+    await events.publish(
+        session,
+        event_type,
+        report_id=report.id,
+        user_id=report.user_id,
+        department_id=department_id,
+        status=report.status,
+        day_number=report.day_number,
+    )
+
+
+def _can_read_report(report_user_id: int, user) -> bool:
+    # сотрудник видит только своё, ментор/тимлид/админ — можно расширить потом
+    return report_user_id == user.id or user.role in [Role.MENTOR.value, Role.TEAM_LEAD.value, Role.ADMIN.value]
+
 
 @router.post("", response_model=ReportOut)
 async def create_report(payload: ReportCreate, session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
@@ -33,14 +114,9 @@ async def create_report(payload: ReportCreate, session: AsyncSession = Depends(g
     session.add(r)
     await session.flush()  # получаем r.id без commit
 
-    session.add(DailyReportRevision(
-        report_id=r.id,
-        text_done=r.text_done,
-        text_plan=r.text_plan,
-        text_blockers=r.text_blockers,
-        status=r.status,
-        mentor_comment=r.mentor_comment,
-    ))
+    await add_revision(session, r)
+    await record_created(session, r, user.department_id)
+    await _notify(session, "report.created", r, user.department_id)
 
     await session.commit()
     await session.refresh(r)
@@ -48,65 +124,196 @@ async def create_report(payload: ReportCreate, session: AsyncSession = Depends(g
 
 
 
-@router.get("/my", response_model=list[ReportOut])
-async def my_reports(session: AsyncSession = Depends(get_session), user=Depends(get_current_user)):
-    rows = (await session.execute(select(DailyReport).where(DailyReport.user_id == user.id).order_by(DailyReport.id.desc()))).scalars().all()
+@router.get("/my", response_model=list[ReportOut] | list[ReportSummaryOut])
+async def my_reports(
+    view: View = "full",
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    rows = (
+        await session.execute(
+            select(*_columns(_REPORT_SUMMARY, _REPORT_BODY, view))
+            .where(DailyReport.user_id == user.id)
+            .order_by(DailyReport.id.desc())
+        )
+    ).all()
     return list(rows)
 
+def _mentor_scope(stmt, me, user_id: int | None, statuses: list[ReportStatus] | None):
+    # люди отдела (кроме самого ментора) — join'ом в том же запросе;
+    # условия user_id/status ложатся на индекс ix_daily_reports_user_status_id
+    stmt = stmt.join(User, User.id == DailyReport.user_id).where(
+        User.department_id == me.department_id, User.id != me.id
+    )
+    if user_id is not None:
+        stmt = stmt.where(DailyReport.user_id == user_id)
+    if statuses:
+        stmt = stmt.where(DailyReport.status.in_([s.value for s in statuses]))
+    return stmt
+
+
+async def _mentor_page(
+    session: AsyncSession,
+    response: Response,
+    me,
+    columns: tuple,
+    user_id: int | None,
+    statuses: list[ReportStatus] | None,
+    page: PageParams,
+) -> list[dict]:
+    stmt = _mentor_scope(
+        select(*columns, User.full_name, User.email, _STATUS_RANK.label("status_rank")),
+        me,
+        user_id,
+        statuses,
+    )
+    rows = (await session.execute(keyset(stmt, page, (_STATUS_RANK, False), (DailyReport.id, True)))).all()
+    rows = finish_page(rows, page, response, lambda r: [r.status_rank, r.id])
+
+    out = []
+    for r in rows:
+        item = dict(r._mapping)
+        item.pop("status_rank")
+        item["user_full_name"] = item.pop("full_name")
+        item["user_email"] = item.pop("email")
+        out.append(item)
+    return out
+
+
 @router.get(
     "/mentor",
     dependencies=[Depends(require_roles(Role.MENTOR.value, Role.TEAM_LEAD.value, Role.ADMIN.value))],
 )
 async def mentor_reports(
+    response: Response,
+    status: list[ReportStatus] | None = Query(default=None),
+    user_id: int | None = None,
+    view: View = "full",
+    page: PageParams = Depends(page_params),
     session: AsyncSession = Depends(get_session),
     me=Depends(get_current_user),
 ):
     """
     MVP: ментор видит отчёты пользователей из своего отдела.
+    Сначала ждущие проверки, внутри статуса — новые сверху.
     """
     if me.department_id is None:
         return []
 
-    # берём людей отдела (кроме самого ментора)
-    user_rows = (
-        await session.execute(
-            select(User.id, User.full_name, User.email)
-            .where(User.department_id == me.department_id)
-            .where(User.id != me.id)
-        )
-    ).all()
-    user_map = {u.id: {"full_name": u.full_name, "email": u.email} for u in user_rows}
+    # возвращаем расширенный объект, не response_model, чтобы не ломать текущие схемы
+    columns = _columns(_REPORT_SUMMARY, _REPORT_BODY, view)
+    return await _mentor_page(session, response, me, columns, user_id, status, page)
+
 
-    if not user_map:
+@router.get(
+    "/mentor/inbox",
+    response_model=MentorInboxOut,
+    dependencies=[Depends(require_roles(Role.MENTOR.value, Role.TEAM_LEAD.value, Role.ADMIN.value))],
+)
+async def mentor_inbox(
+    response: Response,
+    status: list[ReportStatus] | None = Query(default=None),
+    user_id: int | None = None,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_session),
+    me=Depends(get_current_user),
+):
+    """
+    Входящие ментора: страница отчётов без текстов (тексты — GET /standups/{id})
+    и счётчики по статусам одним агрегатом (без фильтра по статусу).
+    """
+    if me.department_id is None:
+        return MentorInboxOut(counts={s.value: 0 for s in ReportStatus}, items=[])
+
+    counts = _mentor_scope(
+        select(*[func.count().filter(DailyReport.status == s.value).label(s.value) for s in ReportStatus])
+        .select_from(DailyReport),
+        me,
+        user_id,
+        None,
+    )
+    counts = (await session.execute(counts)).one()._asdict()
+
+    items = await _mentor_page(session, response, me, _REPORT_SUMMARY, user_id, status, page)
+    return MentorInboxOut(counts=counts, items=items)
+
+
+@router.get(
+    "/search",
+    response_model=list[ReportSearchHit],
+    dependencies=[Depends(require_roles(Role.MENTOR.value, Role.TEAM_LEAD.value, Role.ADMIN.value))],
+)
+async def search(
+    q: str = Query(min_length=2, max_length=200),
+    status: list[ReportStatus] | None = Query(default=None),
+    user_id: int | None = None,
+    department_id: int | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+    me=Depends(get_current_user),
+):
+    """
+    Поиск по текстам отчётов отдела (как во входящих ментора); админ может
+    указать другой отдел. Лучшие limit совпадений по релевантности,
+    snippet — HTML с <mark> вокруг найденных слов.
+    """
+    if department_id is not None and me.role == Role.ADMIN.value:
+        return await search_reports(
+            session, q, department_id, user_id=user_id, statuses=[s.value for s in status or []], limit=limit
+        )
+    if me.department_id is None:
         return []
+    return await search_reports(
+        session,
+        q,
+        me.department_id,
+        exclude_user_id=me.id,
+        user_id=user_id,
+        statuses=[s.value for s in status or []],
+        limit=limit,
+    )
 
-    reports = (
-        await session.execute(
-            select(DailyReport)
-            .where(DailyReport.user_id.in_(list(user_map.keys())))
-            .order_by(DailyReport.id.desc())
+
+@router.get(
+    "/stats",
+    response_model=StandupStatsOut,
+    dependencies=[
+        Depends(
+            require_roles(Role.MENTOR.value, Role.TEAM_LEAD.value, Role.LD_MANAGER.value, Role.ADMIN.value)
         )
-    ).scalars().all()
+    ],
+)
+async def stats(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    department_id: int | None = None,
+    session: AsyncSession = Depends(get_session),
+    me=Depends(get_current_user),
+):
+    """
+    Сводка стендапов по дням из standup_daily_stats (сырые отчёты не читаются).
+    Ментор и тимлид видят свой отдел; L&D и админ — указанный или все отделы.
+    Период по умолчанию — последние 30 дней, не больше 366.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to or (date_to - date_from).days >= 366:
+        raise HTTPException(status_code=400, detail="Invalid period")
+
+    if me.role in (Role.LD_MANAGER.value, Role.ADMIN.value):
+        departments = None if department_id is None else [department_id]
+    elif me.department_id is None:
+        # ментор или тимлид без отдела: своих отчётов в сводке нет
+        departments = []
+    else:
+        departments = [me.department_id]
 
-    # возвращаем расширенный объект, не response_model, чтобы не ломать текущие схемы
-    out = []
-    for r in reports:
-        u = user_map.get(r.user_id, {"full_name": "Unknown", "email": ""})
-        out.append({
-            "id": r.id,
-            "user_id": r.user_id,
-            "user_full_name": u["full_name"],
-            "user_email": u["email"],
-            "day_number": r.day_number,
-            "text_done": r.text_done,
-            "text_plan": r.text_plan,
-            "text_blockers": r.text_blockers,
-            "status": r.status,
-            "mentor_comment": r.mentor_comment,
-        })
-    return out
-@router.get("/{report_id}/history")
-async def report_history(
+    rows, totals = await load_stats(session, date_from, date_to, departments)
+    return StandupStatsOut(date_from=date_from, date_to=date_to, rows=rows, totals=totals)
+
+
+@router.get("/{report_id}", response_model=ReportOut)
+async def get_report(
     report_id: int,
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
@@ -114,28 +321,59 @@ async def report_history(
     report = (await session.execute(select(DailyReport).where(DailyReport.id == report_id))).scalar_one_or_none()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
+    if not _can_read_report(report.user_id, user):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return report
 
-    # сотрудник видит только своё, ментор/тимлид/админ — можно расширить потом
-    if report.user_id != user.id and user.role not in [Role.MENTOR.value, Role.TEAM_LEAD.value, Role.ADMIN.value]:
+
+async def _check_report_access(session: AsyncSession, report_id: int, user) -> None:
+    owner_id = (
+        await session.execute(select(DailyReport.user_id).where(DailyReport.id == report_id))
+    ).scalar_one_or_none()
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if not _can_read_report(owner_id, user):
         raise HTTPException(status_code=403, detail="Forbidden")
 
+
+@router.get("/{report_id}/history", response_model=list[RevisionOut] | list[RevisionSummaryOut])
+async def report_history(
+    report_id: int,
+    view: View = "full",
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    await _check_report_access(session, report_id, user)
+
     rows = (
         await session.execute(
-            select(DailyReportRevision)
+            _revisions(view)
             .where(DailyReportRevision.report_id == report_id)
             .order_by(DailyReportRevision.id.desc())
         )
-    ).scalars().all()
-
-    return [{
-        "id": r.id,
-        "created_at": r.created_at,
-        "status": r.status,
-        "mentor_comment": r.mentor_comment,
-        "text_done": r.text_done,
-        "text_plan": r.text_plan,
-        "text_blockers": r.text_blockers,
-    } for r in rows]
+    ).all()
+    return list(rows)
+
+
+@router.get("/{report_id}/history/{revision_id}", response_model=RevisionOut)
+async def report_revision(
+    report_id: int,
+    revision_id: int,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    await _check_report_access(session, report_id, user)
+
+    rev = (
+        await session.execute(
+            _revisions("full").where(
+                DailyReportRevision.id == revision_id, DailyReportRevision.report_id == report_id
+            )
+        )
+    ).one_or_none()
+    if not rev:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    return rev
 @router.put("/{report_id}", response_model=ReportOut)
 async def update_report(
     report_id: int,
@@ -143,7 +381,10 @@ async def update_report(
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
 ):
-    report = (await session.execute(select(DailyReport).where(DailyReport.id == report_id))).scalar_one_or_none()
+    # FOR UPDATE: старый статус нужен для сводки (standup_stats), параллельные правки — по очереди
+    report = (
+        await session.execute(select(DailyReport).where(DailyReport.id == report_id).with_for_update())
+    ).scalar_one_or_none()
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
@@ -161,6 +402,7 @@ async def update_report(
         raise HTTPException(status_code=400, detail="Пустой отчет отправить нельзя")
 
     # обновляем отчёт: заново на проверку
+    old_status, old_blockers = report.status, report.text_blockers
     report.text_done = text_done
     report.text_plan = text_plan
     report.text_blockers = text_blockers
@@ -168,14 +410,9 @@ async def update_report(
     report.mentor_comment = None
 
     # сохраняем ревизию после изменения
-    session.add(DailyReportRevision(
-        report_id=report.id,
-        text_done=report.text_done,
-        text_plan=report.text_plan,
-        text_blockers=report.text_blockers,
-        status=report.status,
-        mentor_comment=report.mentor_comment,
-    ))
+    await add_revision(session, report)
+    await record_resubmitted(session, report, user.department_id, old_status, old_blockers)
+    await _notify(session, "report.updated", report, user.department_id)
 
     await session.commit()
     await session.refresh(report)
@@ -183,6 +420,21 @@ async def update_report(
 
 
 
+@router.post(
+    "/mentor_decisions",
+    response_model=BulkDecisionOut,
+    dependencies=[Depends(require_roles(Role.MENTOR.value, Role.TEAM_LEAD.value, Role.ADMIN.value))],
+)
+async def mentor_decisions(payload: BulkDecisionIn, session: AsyncSession = Depends(get_session)):
+    """
+    Решения по многим отчётам одной транзакцией. Неверные элементы (нет отчёта,
+    дубль, REVISION без комментария) не мешают остальным — см. results.
+    """
+    results = await apply_decisions(session, payload.items)
+    await session.commit()
+    return BulkDecisionOut(applied=sum(r["ok"] for r in results), results=results)
+
+
 @router.post(
     "/{report_id}/mentor_decision",
     response_model=ReportOut,
@@ -194,13 +446,14 @@ async def mentor_decision(
     session: AsyncSession = Depends(get_session),
 ):
     report = (await session.execute(
-        select(DailyReport).where(DailyReport.id == report_id)
+        select(DailyReport).where(DailyReport.id == report_id).with_for_update()
     )).scalar_one_or_none()
 
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
     # применяем решение ментора
+    old_status = report.status
     if payload.action == ReportStatus.REVISION.value:
         if not payload.mentor_comment or not payload.mentor_comment.strip():
             raise HTTPException(status_code=400, detail="Комментарий обязателен при возврате на доработку")
@@ -210,16 +463,13 @@ async def mentor_decision(
         report.status = ReportStatus.ACCEPTED.value
         report.mentor_comment = payload.mentor_comment.strip() if payload.mentor_comment else None
 
-    # сохраняем снимок (ревизию)
-    rev = DailyReportRevision(
-        report_id=report.id,
-        text_done=report.text_done,
-        text_plan=report.text_plan,
-        text_blockers=report.text_blockers,
-        status=report.status,
-        mentor_comment=report.mentor_comment,
-    )
-    session.add(rev)
+    # сохраняем снимок (ревизию); тексты не менялись — тело общее с прошлой ревизией
+    await add_revision(session, report)
+    department_id = (
+        await session.execute(select(User.department_id).where(User.id == report.user_id))
+    ).scalar_one()
+    await record_decision(session, report, department_id, old_status)
+    await _notify(session, "report.decided", report, department_id)
 
     await session.commit()
     await session.refresh(report)
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_session
 from app.deps import require_roles
+from app.pagination import PageParams, finish_page, keyset, page_params
 from app.models.core import User, Department
 from app.schemas.users import UserCreate, UserOut
 from app.schemas.admin import UserUpdate, ResetPasswordIn
-from app.security.passwords import hash_password
+from app.security.passwords import hash_password_async
 from app.models.enums import Role
+from app.services.auto_enroll import reconcile_mandatory
+from app.services.principal_cache import principal_cache
+from app.services.refresh_tokens import revoke_user_tokens
 
 router = APIRouter()
 
@@ -31,19 +35,37 @@ async def create_user(payload: UserCreate, session: AsyncSession = Depends(get_s
         full_name=payload.full_name,
         role=payload.role.value,
         department_id=payload.department_id,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
         is_active=True,
     )
     session.add(u)
+    await session.flush()
+    # обязательные курсы новому сотруднику — в той же транзакции
+    await reconcile_mandatory(session, user_id=u.id)
     await session.commit()
     await session.refresh(u)
     return u
 
 
 @router.get("", response_model=list[UserOut], dependencies=[Depends(require_roles(Role.ADMIN.value))])
-async def list_users(session: AsyncSession = Depends(get_session)) -> list[UserOut]:
-    rows = (await session.execute(select(User).order_by(User.id.asc()))).scalars().all()
-    return list(rows)
+async def list_users(
+    response: Response,
+    role: Role | None = None,
+    department_id: int | None = None,
+    is_active: bool | None = None,
+    page: PageParams = Depends(page_params),
+    session: AsyncSession = Depends(get_session),
+) -> list[UserOut]:
+    stmt = select(User)
+    if role is not None:
+        stmt = stmt.where(User.role == role.value)
+    if department_id is not None:
+        stmt = stmt.where(User.department_id == department_id)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active.is_(is_active))
+
+    rows = (await session.execute(keyset(stmt, page, (User.id, False)))).scalars().all()
+    return finish_page(rows, page, response, lambda u: [u.id])
 
 
 @router.patch("/{user_id}", response_model=UserOut, dependencies=[Depends(require_roles(Role.ADMIN.value))])
@@ -66,8 +88,11 @@ async def update_user(user_id: int, payload: UserUpdate, session: AsyncSession =
 
     if payload.is_active is not None:
         u.is_active = bool(payload.is_active)
+        if not u.is_active:
+            await revoke_user_tokens(session, u.id)
 
     await session.commit()
+    principal_cache.invalidate(u.id)
     await session.refresh(u)
     return u
 
@@ -77,8 +102,10 @@ async def reset_password(user_id: int, payload: ResetPasswordIn, session: AsyncS
     u = (await session.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
-    u.password_hash = hash_password(payload.new_password)
+    u.password_hash = await hash_password_async(payload.new_password)
+    await revoke_user_tokens(session, u.id)
     await session.commit()
+    principal_cache.invalidate(u.id)
     return {"ok": True}
 
 
@@ -1,6 +1,10 @@
+from typing import Annotated
+
 from pydantic import BaseModel, Field
 from datetime import datetime
 
+from app.models.enums import Role
+
 
 class CourseOut(BaseModel):
     id: int
@@ -9,6 +13,36 @@ class CourseOut(BaseModel):
     is_mandatory: bool
     deadline_days: int
     is_public: bool  # NEW
+    access_level: str
+    class Config:
+        from_attributes = True
+
+
+class CourseUpdate(BaseModel):
+    title: str | None = None
+    description: str | None = None
+    is_mandatory: bool | None = None
+    deadline_days: int | None = Field(default=None, ge=0)
+    is_public: bool | None = None
+    access_level: str | None = Field(default=None, max_length=64)
+
+
+class LessonUpdate(BaseModel):
+    title: str | None = Field(default=None, min_length=1, max_length=255)
+    video_url: str | None = Field(default=None, max_length=1000)
+    # длительность видео: только относительно неё считается watched_percent
+    duration_sec: int | None = Field(default=None, gt=0)
+    content: str | None = None
+
+
+class LessonOut(BaseModel):
+    id: int
+    course_id: int
+    order: int
+    title: str
+    video_url: str | None
+    duration_sec: int | None
+
     class Config:
         from_attributes = True
 
@@ -20,6 +54,7 @@ class CourseCatalogOut(BaseModel):
     is_mandatory: bool
     deadline_days: int
     is_public: bool
+    access_level: str
 
     enrolled: bool
     status: str | None
@@ -41,4 +76,50 @@ class EnrollmentOut(BaseModel):
 
 class VideoProgressIn(BaseModel):
     position_sec: int = Field(ge=0)
-    watched_percent: int = Field(ge=0, le=100)
+    # старые клиенты присылают процент сами: он только для отображения (не выше 99);
+    # засчитывает урок процент, который сервер считает по segments и Lesson.duration_sec
+    watched_percent: int | None = Field(default=None, ge=0, le=100)
+    # просмотренные с прошлого heartbeat'а отрезки [start, end) в секундах
+    segments: list[tuple[Annotated[int, Field(ge=0)], Annotated[int, Field(ge=0)]]] = Field(
+        default_factory=list, max_length=256
+    )
+
+
+class VideoProgressOut(BaseModel):
+    lesson_id: int
+    position_sec: int
+    watched_percent: int
+
+
+class BulkAssignIn(BaseModel):
+    course_id: int
+    # фильтры пересекаются: например, все MENTOR из отделов 1 и 2
+    user_ids: list[int] | None = None
+    department_ids: list[int] | None = None
+    roles: list[Role] | None = None
+    only_active: bool = True
+
+
+class BulkAssignOut(BaseModel):
+    targeted: int
+    created: int
+    skipped: int
+    job_id: str | None = None
+
+
+class AutoEnrollOut(BaseModel):
+    created: int
+
+
+class JobOut(BaseModel):
+    id: str
+    kind: str
+    status: str
+    created_at: datetime
+    finished_at: datetime | None
+    progress: dict
+    result: dict | None
+    error: str | None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+
+
+class DeadlineItem(BaseModel):
+    course_id: int
+    deadline_at: datetime
+    overdue: bool
+
+
+class DeadlineDigestOut(BaseModel):
+    user_id: int
+    full_name: str
+    email: str
+    department_id: int | None
+    digest_date: date
+    overdue_count: int
+    due_soon_count: int
+    items: list[DeadlineItem]
+    updated_at: datetime
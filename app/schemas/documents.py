@@ -7,6 +7,21 @@ class DocumentOut(BaseModel):
     file_url: str
     category: str
     access_level: str
+    file_name: str | None = None  # есть загруженный файл: ссылка — GET /documents/{id}/file/url
 
     class Config:
         from_attributes = True
+
+
+class DocumentHit(DocumentOut):
+    score: float  # similarity названия и запроса, 0..1
+
+
+class DocumentSearchOut(BaseModel):
+    items: list[DocumentHit]
+    facets: dict[str, dict[str, int]]  # category / access_level -> значение -> число совпадений
+
+
+class DocumentTextHit(DocumentOut):
+    rank: float
+    snippet: str  # HTML: текст экранирован, совпадения в <mark>
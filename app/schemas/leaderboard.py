@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    full_name: str
+    current_streak: int
+    max_streak: int
+
+    class Config:
+        from_attributes = True
+
+
+class LeaderboardOut(BaseModel):
+    scope: str
+    department_id: int | None = None
+    refreshed_at: datetime | None = None  # None — топ ещё не собирался
+    items: list[LeaderboardEntry]
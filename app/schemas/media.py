@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class MediaUrlOut(BaseModel):
+    url: str
+    expires_in: int
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from typing import Literal, Optional
+from datetime import date, datetime
 
 
 class ReportCreate(BaseModel):
@@ -21,6 +21,28 @@ class MentorDecisionIn(BaseModel):
     mentor_comment: Optional[str] = None
 
 
+class MentorDecisionItem(BaseModel):
+    report_id: int
+    action: Literal["ACCEPTED", "REVISION"]
+    mentor_comment: Optional[str] = None
+
+
+class BulkDecisionIn(BaseModel):
+    items: list[MentorDecisionItem] = Field(min_length=1, max_length=500)
+
+
+class BulkDecisionResult(BaseModel):
+    report_id: int
+    ok: bool
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkDecisionOut(BaseModel):
+    applied: int
+    results: list[BulkDecisionResult]  # в порядке items
+
+
 class ReportOut(BaseModel):
     id: int
     user_id: int
@@ -34,3 +56,96 @@ class ReportOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ReportSummaryOut(BaseModel):
+    """Отчёт без текстов: для списков, тексты — через GET /standups/{id}."""
+    id: int
+    user_id: int
+    day_number: int
+    status: str
+    mentor_comment: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class MentorReportItem(BaseModel):
+    id: int
+    user_id: int
+    user_full_name: str
+    user_email: str
+    day_number: int
+    status: str
+    mentor_comment: Optional[str] = None
+    created_at: datetime
+
+
+class MentorInboxOut(BaseModel):
+    counts: dict[str, int]  # статус -> число отчётов
+    items: list[MentorReportItem]
+
+
+class ReportSearchHit(BaseModel):
+    id: int
+    user_id: int
+    user_full_name: str
+    day_number: int
+    status: str
+    created_at: datetime
+    rank: float
+    snippet: str  # HTML: текст экранирован, совпадения в <mark>
+
+
+class RevisionOut(BaseModel):
+    id: int
+    created_at: datetime
+    status: str
+    mentor_comment: Optional[str] = None
+    text_done: str
+    text_plan: str
+    text_blockers: str
+
+    class Config:
+        from_attributes = True
+
+
+class RevisionSummaryOut(BaseModel):
+    id: int
+    created_at: datetime
+    status: str
+    mentor_comment: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class StandupStatsCounters(BaseModel):
+    reports_created: int
+    with_blockers: int
+    resubmitted: int
+    decisions_accepted: int
+    decisions_returned: int
+    decisions_timed: int
+    decision_seconds: int
+    # текущие статусы отчётов, созданных в этот день (период)
+    status_pending: int
+    status_accepted: int
+    status_revision: int
+
+    acceptance_rate: Optional[float] = None  # принято / все решения
+    blocker_rate: Optional[float] = None  # отчёты с блокерами / созданные
+    avg_decision_hours: Optional[float] = None
+
+
+class StandupStatsRow(StandupStatsCounters):
+    department_id: Optional[int] = None
+    day: date
+
+
+class StandupStatsOut(BaseModel):
+    date_from: date
+    date_to: date
+    rows: list[StandupStatsRow]
+    totals: StandupStatsCounters
@@ -15,3 +15,31 @@ def create_access_token(*, sub: str, minutes: int | None = None) -> str:
 
 def decode_token(token: str) -> dict:
     return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_alg])
+
+
+def create_media_token(*, user_id: int, lesson_id: int, path: str) -> str:
+    """
+    Подписанная ссылка на медиафайл урока для <video src>, куда нельзя
+    передать Authorization. Без "sub", поэтому как access-токен не подходит.
+    """
+    now = datetime.now(timezone.utc)
+    exp = now + timedelta(minutes=settings.media_token_minutes)
+    payload = {"typ": "media", "uid": user_id, "lesson": lesson_id, "path": path, "exp": int(exp.timestamp())}
+    return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_alg)
+
+
+
+def create_document_token(*, user_id: int, document_id: int, file_hash: str, name: str, content_type: str) -> str:
+    """Подписанная ссылка на загруженный файл документа (как create_media_token)."""
+    now = datetime.now(timezone.utc)
+    exp = now + timedelta(minutes=settings.media_token_minutes)
+    payload = {
+        "typ": "document",
+        "uid": user_id,
+        "doc": document_id,
+        "hash": file_hash,
+        "name": name,
+        "ctype": content_type,
+        "exp": int(exp.timestamp()),
+    }
+    return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_alg)
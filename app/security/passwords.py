@@ -1,5 +1,15 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from app.settings import settings
+
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
 
@@ -9,3 +19,91 @@ def hash_password(password: str) -> str:
 
 def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
+
+
+class PasswordService:
+    """
+    argon2 в пуле процессов, чтобы хэширование не блокировало event loop.
+
+    Одновременно принимается не больше workers + queue_size операций,
+    остальные сразу получают 503 (вместо того чтобы копиться в очереди).
+    """
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + queue_size
+        self._executor: ProcessPoolExecutor | None = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        # клиент отключился, не дождавшись результата
+        self.cancelled = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервер перегружен, попробуйте позже",
+                headers={"Retry-After": "1"},
+            )
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), fn, *args)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(verify_password, password, password_hash)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+        }
+
+
+password_service = PasswordService(
+    workers=settings.password_workers,
+    queue_size=settings.password_queue_size,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_service.hash(password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await password_service.verify(password, password_hash)
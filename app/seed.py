@@ -16,6 +16,9 @@ from app.models.core import (
 )
 from app.models.enums import Role, EnrollmentStatus
 from app.security.passwords import hash_password
+from app.services.enrollments import lessons_completed_expr, lessons_total_expr, refresh_course_totals
+from app.services.auto_enroll import reconcile_mandatory
+from app.services.catalog_cache import bump_catalog_version
 
 
 async def get_or_create_department(name: str) -> Department:
@@ -71,12 +74,14 @@ async def get_or_create_course(title: str, description: str, is_mandatory: bool,
             c.description = description
             c.is_mandatory = is_mandatory
             c.deadline_days = deadline_days
+            await bump_catalog_version(session)
             await session.commit()
             await session.refresh(c)
             return c
 
         c = Course(title=title, description=description, is_mandatory=is_mandatory, deadline_days=deadline_days)
         session.add(c)
+        await bump_catalog_version(session)
         await session.commit()
         await session.refresh(c)
         return c
@@ -88,6 +93,7 @@ async def ensure_lessons(course_id: int, lessons: list[dict]) -> None:
             order = int(item["order"])
             title = str(item["title"])
             video_url = item.get("video_url")
+            duration_sec = item.get("duration_sec")
             content = item.get("content")
 
             exists = (
@@ -99,6 +105,7 @@ async def ensure_lessons(course_id: int, lessons: list[dict]) -> None:
             if exists:
                 exists.title = title
                 exists.video_url = video_url
+                exists.duration_sec = duration_sec
                 exists.content = content
             else:
                 session.add(
@@ -107,10 +114,14 @@ async def ensure_lessons(course_id: int, lessons: list[dict]) -> None:
                         order=order,
                         title=title,
                         video_url=video_url,
+                        duration_sec=duration_sec,
                         content=content,
                     )
                 )
 
+        await session.flush()
+        await refresh_course_totals(session, course_id)
+        await bump_catalog_version(session)
         await session.commit()
 
 
@@ -138,6 +149,8 @@ async def ensure_enrollment(user_id: int, course_id: int, deadline_days: int) ->
             status=EnrollmentStatus.ASSIGNED.value,
             progress_percent=0,
             deadline_at=deadline_at,
+            lessons_total=lessons_total_expr(course_id),
+            lessons_completed=lessons_completed_expr(user_id, course_id),
         )
         session.add(e)
         await session.commit()
@@ -168,37 +181,8 @@ async def ensure_documents(docs: list[dict]) -> None:
         await session.commit()
 
 async def seed_enrollments(session):
-    users = (await session.execute(select(User))).scalars().all()
-    courses = (await session.execute(select(Course).where(Course.is_mandatory == True))).scalars().all()
-
-    for u in users:
-        for c in courses:
-            exists = (
-                await session.execute(
-                    select(Enrollment).where(
-                        Enrollment.user_id == u.id,
-                        Enrollment.course_id == c.id,
-                    )
-                )
-            ).scalar_one_or_none()
-
-            if exists:
-                continue
-
-            deadline = None
-            if c.deadline_days:
-                deadline = datetime.now(timezone.utc) + timedelta(days=c.deadline_days)
-
-            session.add(
-                Enrollment(
-                    user_id=u.id,
-                    course_id=c.id,
-                    status=EnrollmentStatus.ASSIGNED.value,
-                    progress_percent=0,
-                    deadline_at=deadline,
-                )
-            )
-
+    # все активные × все обязательные, одним запросом
+    await reconcile_mandatory(session)
     await session.commit()
 
 
@@ -212,6 +196,7 @@ async def seed_public_courses(session):
         exists = (await session.execute(select(Course).where(Course.title == c["title"]))).scalar_one_or_none()
         if not exists:
             session.add(Course(**c))
+    await bump_catalog_version(session)
     await session.commit()
     
 
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from sqlalchemy import and_, exists, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.core import AccessLevel, Course, Enrollment
+from app.models.enums import Role
+from app.services.catalog_cache import VersionWatcher
+from app.services.principal_cache import Principal
+from app.settings import settings
+
+# версию увеличивает триггер на access_levels (миграция 2d8c4a6f1e93)
+access_version = VersionWatcher("access", settings.catalog_version_check_seconds)
+
+
+class AccessPolicy:
+    """
+    Уровни доступа (access_levels) в памяти процесса и готовые списки
+    разрешённых уровней по ключу (role, department_id). Проверка видимости —
+    условие access_level IN (...) в запросе самого списка, без лишних
+    обращений к БД: таблица перечитывается только при смене версии "access".
+    """
+
+    def __init__(self) -> None:
+        self._version: int | None = None
+        self._levels: list[tuple[str, frozenset[str] | None, frozenset[int] | None]] = []
+        self._allowed: dict[tuple[str, int | None], tuple[str, ...]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _load(self, session: AsyncSession) -> None:
+        version = await access_version.current(session)
+        if version == self._version:
+            return
+        rows = (await session.execute(select(AccessLevel.name, AccessLevel.roles, AccessLevel.department_ids))).all()
+        self._levels = [
+            (r.name, frozenset(r.roles) if r.roles is not None else None,
+             frozenset(r.department_ids) if r.department_ids is not None else None)
+            for r in rows
+        ]
+        self._allowed = {}
+        self._version = version
+
+    async def allowed(self, session: AsyncSession, user: Principal) -> tuple[str, ...] | None:
+        """Уровни, открытые пользователю; None — без ограничений (ADMIN)."""
+        if user.role == Role.ADMIN.value:
+            return None
+        await self._load(session)
+        key = (user.role, user.department_id)
+        levels = self._allowed.get(key)
+        if levels is not None:
+            self.hits += 1
+            return levels
+
+        self.misses += 1
+        levels = tuple(sorted(
+            name for name, roles, departments in self._levels
+            if (roles is None or user.role in roles)
+            and (departments is None or user.department_id in departments)
+        ))
+        self._allowed[key] = levels
+        return levels
+
+    async def where(self, session: AsyncSession, user: Principal, column) -> ColumnElement[bool]:
+        """Условие «запись с уровнем доступа column видна пользователю»."""
+        levels = await self.allowed(session, user)
+        return true() if levels is None else column.in_(levels)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "version": self._version,
+            "levels": len(self._levels),
+            "principals": len(self._allowed),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+access_policy = AccessPolicy()
+
+
+async def visible_courses(session: AsyncSession, user: Principal) -> ColumnElement[bool]:
+    """Курсы, видимые пользователю: назначенные ему и публичные с открытым уровнем; ADMIN — все."""
+    levels = await access_policy.allowed(session, user)
+    if levels is None:
+        return true()
+    assigned = exists().where(Enrollment.course_id == Course.id, Enrollment.user_id == user.id)
+    return or_(assigned, and_(Course.is_public, Course.access_level.in_(levels)))
+
+
+async def course_visible(session: AsyncSession, user: Principal, course_id: int) -> bool:
+    """Виден ли пользователю курс course_id (несуществующий — не виден); ADMIN — без запроса."""
+    if user.role == Role.ADMIN.value:
+        return True
+    found = (
+        await session.execute(select(Course.id).where(Course.id == course_id, await visible_courses(session, user)))
+    ).scalar_one_or_none()
+    return found is not None
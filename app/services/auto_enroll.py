@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from sqlalchemy import select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import Course, User
+from app.services.enrollments import enroll_count
+
+
+# --- автоназначение обязательных курсов -----------------------------------------------------
+#
+# Все активные пользователи × все обязательные курсы. Недостающие записи
+# создаются одним INSERT ... SELECT ... ON CONFLICT DO NOTHING, поэтому
+# сверку можно запускать сколько угодно раз (API, CLI, seed).
+
+
+def mandatory_pairs(user_id: int | None = None, course_id: int | None = None):
+    """select (user_id, course_id, deadline_days); user_id/course_id сужают сверку."""
+    stmt = (
+        select(User.id.label("user_id"), Course.id.label("course_id"), Course.deadline_days)
+        .join(Course, true())
+        .where(User.is_active.is_(True), Course.is_mandatory.is_(True))
+    )
+    if user_id is not None:
+        stmt = stmt.where(User.id == user_id)
+    if course_id is not None:
+        stmt = stmt.where(Course.id == course_id)
+    return stmt
+
+
+async def reconcile_mandatory(
+    session: AsyncSession,
+    user_id: int | None = None,
+    course_id: int | None = None,
+) -> int:
+    """
+    Назначить недостающие обязательные курсы. Без аргументов — полная сверка,
+    с user_id — для нового сотрудника, с course_id — для курса, ставшего
+    обязательным. Коммит — на вызывающем. Возвращает число созданных записей.
+    """
+    return await enroll_count(session, mandatory_pairs(user_id, course_id))
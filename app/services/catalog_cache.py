@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import CacheVersion
+from app.settings import settings
+
+
+class VersionWatcher:
+    """
+    Глобальная версия из cache_versions. Значение запоминается на check_seconds,
+    поэтому горячий путь в большинстве запросов не ходит в БД. Изменения
+    из других процессов (воркеры, seed) становятся видны не позже чем через
+    check_seconds.
+    """
+
+    def __init__(self, name: str, check_seconds: float) -> None:
+        self.name = name
+        self.check_seconds = check_seconds
+        self._version: int | None = None
+        self._checked_at = 0.0
+
+    async def current(self, session: AsyncSession) -> int:
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.check_seconds:
+            version = (
+                await session.execute(select(CacheVersion.version).where(CacheVersion.name == self.name))
+            ).scalar_one_or_none()
+            self._version = version or 0
+            self._checked_at = now
+        return self._version
+
+    def expire(self) -> None:
+        self._version = None
+
+    async def bump(self, session: AsyncSession) -> None:
+        """Увеличить версию в транзакции вызывающего (видно другим после его commit)."""
+        stmt = pg_insert(CacheVersion).values(name=self.name, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.name],
+            set_={"version": CacheVersion.version + 1},
+        )
+        await session.execute(stmt)
+        self.expire()
+
+
+catalog_version = VersionWatcher("catalog", settings.catalog_version_check_seconds)
+
+
+async def bump_catalog_version(session: AsyncSession) -> None:
+    """Вызывать при любом изменении курсов или уроков."""
+    await catalog_version.bump(session)
+
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import Course, Lesson
+from app.services.catalog_cache import catalog_version
+from app.settings import settings
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _dumps(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+@dataclass(frozen=True, slots=True)
+class CourseBundle:
+    """Готовые к отдаче JSON-байты курса и его уроков с ETag'ами."""
+
+    version: int
+    bundle: bytes
+    bundle_etag: str
+    lessons: bytes
+    lessons_etag: str
+
+
+class CourseBundleCache:
+    """
+    LRU course_id -> CourseBundle. Актуальность сверяется с версией каталога
+    (cache_versions 'catalog'), которую увеличивает любое изменение курсов
+    и уроков. ETag — хэш содержимого, поэтому после чужих изменений он
+    у неизменившихся курсов остаётся прежним и клиенты по-прежнему получают 304.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: OrderedDict[int, CourseBundle] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, session: AsyncSession, course_id: int) -> CourseBundle | None:
+        version = await catalog_version.current(session)
+        item = self._items.get(course_id)
+        if item is not None and item.version == version:
+            self._items.move_to_end(course_id)
+            self.hits += 1
+            return item
+
+        self.misses += 1
+        course = (await session.execute(select(Course).where(Course.id == course_id))).scalar_one_or_none()
+        if course is None:
+            self._items.pop(course_id, None)
+            return None
+        rows = (
+            await session.execute(
+                select(Lesson.id, Lesson.order, Lesson.title, Lesson.video_url, Lesson.media_path, Lesson.content)
+                .where(Lesson.course_id == course_id)
+                .order_by(Lesson.order)
+            )
+        ).all()
+
+        lessons = [{"id": r.id, "order": r.order, "title": r.title, "video_url": r.video_url} for r in rows]
+        bundle = {
+            "id": course.id,
+            "title": course.title,
+            "description": course.description,
+            "is_mandatory": course.is_mandatory,
+            "deadline_days": course.deadline_days,
+            "is_public": course.is_public,
+            # видео из локального хранилища — по ссылке из GET /media/lessons/{id}/url
+            "lessons": [
+                dict(l, has_media=r.media_path is not None, content=r.content) for l, r in zip(lessons, rows)
+            ],
+        }
+        bundle_bytes = _dumps(bundle)
+        lessons_bytes = _dumps(lessons)
+        item = CourseBundle(
+            version=version,
+            bundle=bundle_bytes,
+            bundle_etag=_etag(bundle_bytes),
+            lessons=lessons_bytes,
+            lessons_etag=_etag(lessons_bytes),
+        )
+        if self.max_size > 0:
+            self._items[course_id] = item
+            self._items.move_to_end(course_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return item
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+course_bundles = CourseBundleCache(settings.course_bundle_cache_size)
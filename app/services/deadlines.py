@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Date, DateTime, delete, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db import async_session
+from app.models.core import DeadlineDigest, Enrollment
+from app.models.enums import EnrollmentStatus
+from app.settings import settings
+
+# незавершённые записи; фильтры ниже начинаются со status IN (...) AND deadline_at ...,
+# чтобы работал индекс ix_enrollments_status_deadline
+ACTIVE = (EnrollmentStatus.ASSIGNED.value, EnrollmentStatus.IN_PROGRESS.value)
+
+
+async def _count(session, stmt) -> int:
+    cte = stmt.returning(Enrollment.id).cte()
+    return (await session.execute(select(func.count()).select_from(cte))).scalar_one()
+
+
+async def mark_overdue(now: datetime) -> tuple[int, int]:
+    """Проставить overdue_at просроченным и снять его, если дедлайн продлили."""
+    async with async_session() as session:
+        marked = await _count(
+            session,
+            update(Enrollment)
+            .where(Enrollment.status.in_(ACTIVE), Enrollment.deadline_at < now, Enrollment.overdue_at.is_(None))
+            .values(overdue_at=now),
+        )
+        cleared = await _count(
+            session,
+            update(Enrollment)
+            .where(
+                Enrollment.status.in_(ACTIVE),
+                or_(Enrollment.deadline_at.is_(None), Enrollment.deadline_at >= now),
+                Enrollment.overdue_at.is_not(None),
+            )
+            .values(overdue_at=None),
+        )
+        await session.commit()
+    return marked, cleared
+
+
+def _due(horizon: datetime):
+    return (Enrollment.status.in_(ACTIVE), Enrollment.deadline_at < horizon)
+
+
+def _digest_upsert(now: datetime, horizon: datetime, after_user: int, upto_user: int):
+    """Сводки для пользователей с id в (after_user, upto_user] одним INSERT ... SELECT ... GROUP BY."""
+    overdue = Enrollment.deadline_at < now
+    item = func.jsonb_build_object(
+        "course_id", Enrollment.course_id,
+        "deadline_at", Enrollment.deadline_at,
+        "overdue", overdue,
+    )
+    rows = (
+        select(
+            Enrollment.user_id,
+            literal(now.date(), Date),
+            func.count().filter(overdue),
+            func.count().filter(~overdue),
+            func.jsonb_agg(aggregate_order_by(item, Enrollment.deadline_at)),
+            literal(now, DateTime(timezone=True)),
+        )
+        .where(*_due(horizon), Enrollment.user_id > after_user, Enrollment.user_id <= upto_user)
+        .group_by(Enrollment.user_id)
+    )
+    stmt = pg_insert(DeadlineDigest).from_select(
+        ["user_id", "digest_date", "overdue_count", "due_soon_count", "items", "updated_at"], rows
+    )
+    return stmt.on_conflict_do_update(
+        constraint="uq_deadline_digest_user_date",
+        set_={
+            "overdue_count": stmt.excluded.overdue_count,
+            "due_soon_count": stmt.excluded.due_soon_count,
+            "items": stmt.excluded["items"],
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+
+
+async def write_digests(now: datetime) -> tuple[int, int]:
+    """
+    Пересобрать сегодняшние сводки пачками по batch_size пользователей,
+    каждая пачка — своя короткая транзакция. Сводки пользователей, у которых
+    за день всё закрылось, удаляются. Возвращает (пользователей, пачек).
+    """
+    horizon = now + timedelta(days=settings.deadline_due_soon_days)
+    users = batches = 0
+    last_user = 0
+    while True:
+        async with async_session() as session:
+            ids = (
+                select(Enrollment.user_id)
+                .where(*_due(horizon), Enrollment.user_id > last_user)
+                .distinct()
+                .order_by(Enrollment.user_id)
+                .limit(settings.deadline_digest_batch_size)
+                .subquery()
+            )
+            count, upto = (await session.execute(select(func.count(), func.max(ids.c.user_id)))).one()
+            if not count:
+                await session.execute(
+                    delete(DeadlineDigest).where(
+                        DeadlineDigest.digest_date == now.date(), DeadlineDigest.updated_at < now
+                    )
+                )
+                await session.commit()
+                break
+            await session.execute(_digest_upsert(now, horizon, last_user, upto))
+            await session.commit()
+
+        users += count
+        batches += 1
+        last_user = upto
+    return users, batches
+
+
+async def sweep_deadlines() -> dict:
+    """Задача планировщика: отметить просрочки и обновить сводки."""
+    now = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    marked, cleared = await mark_overdue(now)
+    t1 = time.perf_counter()
+    users, batches = await write_digests(now)
+    return {
+        "marked_overdue": marked,
+        "cleared_overdue": cleared,
+        "digest_users": users,
+        "digest_batches": batches,
+        "mark_ms": round((t1 - t0) * 1000, 2),
+        "digest_ms": round((time.perf_counter() - t1) * 1000, 2),
+    }
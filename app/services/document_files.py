@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import async_session
+from app.models.core import Document, DocumentFile
+from app.settings import settings
+
+
+def storage_root() -> Path:
+    return Path(settings.media_root).resolve() / settings.documents_dir
+
+
+def _lock_key(digest: bytes) -> int:
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def blob_path(digest: bytes) -> Path:
+    """Файл с содержимым sha256 = digest: <root>/ab/abcdef..."""
+    name = digest.hex()
+    return storage_root() / name[:2] / name
+
+
+@dataclass(frozen=True, slots=True)
+class StoredFile:
+    hash: bytes
+    size: int
+    content_type: str
+    deduplicated: bool  # такое содержимое в хранилище уже было
+
+
+class DocumentStorage:
+    """
+    Файлы документов с адресацией по содержимому. Тело запроса пишется во
+    временный файл блоками по media_chunk_size (целиком в памяти не держится),
+    sha256 считается по ходу; затем файл переименовывается в blob_path(hash)
+    или удаляется, если такое содержимое уже лежит в хранилище.
+
+    Удаление — в два шага: release() удаляет строку в транзакции вызывающего,
+    remove_blob() после его коммита удаляет сам файл (при откате строка
+    и ссылки на файл вернутся, а файл останется на месте). Гонку с загрузкой
+    того же содержимого разводит advisory lock по хэшу: save() держит его
+    до своего коммита, remove_blob() под ним проверяет, что строку не завели
+    заново. Файл, оставшийся после отката загрузки или падения между шагами,
+    только занимает место и переиспользуется следующей загрузкой того же содержимого.
+    """
+
+    def __init__(self) -> None:
+        self.uploads = 0
+        self.deduplicated = 0
+        self.bytes_received = 0
+        self.bytes_stored = 0
+        self.removed = 0
+
+    async def _receive(self, chunks: AsyncIterator[bytes], tmp: Path) -> tuple[bytes, int]:
+        digest = hashlib.sha256()
+        size = 0
+        buf = bytearray()
+        async with aiofiles.open(tmp, "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > settings.document_max_upload_bytes:
+                    raise HTTPException(status_code=413, detail="File too large")
+                buf += chunk
+                # мелкие куски от сервера копятся до media_chunk_size: меньше переходов в пул потоков
+                if len(buf) >= settings.media_chunk_size:
+                    digest.update(buf)
+                    await f.write(buf)
+                    buf.clear()
+            if buf:
+                digest.update(buf)
+                await f.write(buf)
+        return digest.digest(), size
+
+    async def save(self, session: AsyncSession, chunks: AsyncIterator[bytes], content_type: str) -> StoredFile:
+        """Принять файл и завести (или найти) его строку в document_files; коммит — за вызывающим."""
+        tmp_dir = storage_root() / "tmp"
+        await aiofiles.os.makedirs(tmp_dir, exist_ok=True)
+        tmp = tmp_dir / uuid.uuid4().hex
+        try:
+            digest, size = await self._receive(chunks, tmp)
+            self.bytes_received += size
+            if size == 0:
+                raise HTTPException(status_code=400, detail="Empty file")
+
+            await session.execute(select(func.pg_advisory_xact_lock(_lock_key(digest))))
+            stmt = pg_insert(DocumentFile).values(hash=digest, size=size, content_type=content_type)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DocumentFile.hash], set_={"size": stmt.excluded.size}
+            ).returning(DocumentFile.content_type)
+            stored_type = (await session.execute(stmt)).scalar_one()
+
+            path = blob_path(digest)
+            deduplicated = await aiofiles.os.path.exists(path)
+            if not deduplicated:
+                await aiofiles.os.makedirs(path.parent, exist_ok=True)
+                await aiofiles.os.replace(tmp, path)
+                self.bytes_stored += size
+        finally:
+            try:
+                await aiofiles.os.remove(tmp)
+            except FileNotFoundError:
+                pass
+
+        self.uploads += 1
+        self.deduplicated += deduplicated
+        return StoredFile(hash=digest, size=size, content_type=stored_type, deduplicated=deduplicated)
+
+    async def release(self, session: AsyncSession, digest: bytes | None) -> bool:
+        """
+        Удалить строку файла, если на него больше не ссылается ни один документ;
+        коммит — за вызывающим, сам файл после коммита удаляет remove_blob().
+        """
+        if digest is None:
+            return False
+        deleted = (
+            await session.execute(
+                delete(DocumentFile)
+                .where(DocumentFile.hash == digest, ~exists().where(Document.file_hash == digest))
+                .returning(DocumentFile.hash)
+            )
+        ).scalar_one_or_none()
+        return deleted is not None
+
+    async def remove_blob(self, digest: bytes) -> bool:
+        """Удалить файл после коммита release(), если строку не завела заново параллельная загрузка."""
+        async with async_session() as session:
+            await session.execute(select(func.pg_advisory_xact_lock(_lock_key(digest))))
+            if await session.get(DocumentFile, digest) is not None:
+                return False
+            try:
+                await aiofiles.os.remove(blob_path(digest))
+            except FileNotFoundError:
+                pass
+            await session.commit()
+        self.removed += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "uploads": self.uploads,
+            "deduplicated": self.deduplicated,
+            "bytes_received": self.bytes_received,
+            "bytes_stored": self.bytes_stored,
+            "removed": self.removed,
+        }
+
+
+document_storage = DocumentStorage()
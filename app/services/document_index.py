@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, cast, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db import async_session
+from app.models.core import Document, DocumentChunk, DocumentFile
+from app.services.document_files import blob_path
+from app.services.report_search import HEADLINE_OPTIONS, snippet_html, tsquery
+from app.services.text_extract import extract_chunks
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_PENDING = DocumentFile.indexed_at.is_(None)
+_CRASHED = "extractor process crashed"
+_TIMED_OUT = "text extraction timed out"
+
+
+class DocumentIndexer:
+    """
+    Фоновое извлечение текста из файлов документов. Очередь — строки
+    document_files с indexed_at IS NULL: новый файл попадает в неё при
+    загрузке, а файл, который уже встречался (дедупликация по sha256),
+    повторно не разбирается. Куски текста привязаны к файлу, поэтому
+    при замене файла документа переиндексируется только новый файл,
+    а куски старого удаляются вместе с ним (ON DELETE CASCADE).
+
+    Разбор PDF/DOCX идёт в пуле процессов (как argon2 в PasswordService),
+    event loop только пишет результат в БД. Ошибка разбора сохраняется
+    в index_error и из очереди файл убирает: вернуть его можно через
+    POST /documents/{id}/reindex. Если упал сам процесс-обработчик, ошибку
+    получают все файлы пачки, поэтому они остаются в очереди и разбираются
+    заново по одному на свежем пуле; ошибкой помечается только тот, на
+    котором процесс падает и в одиночку. Так же с зависшим разбором: через
+    document_text_timeout_seconds процессы пула убиваются (время в пачке
+    включает ожидание свободного процесса, поэтому ошибкой помечается только
+    файл, не уложившийся в таймаут в одиночку).
+    """
+
+    def __init__(self, workers: int, batch_size: int) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = max(batch_size, 1)
+        self._executor: ProcessPoolExecutor | None = None
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.indexed = 0
+        self.failed = 0
+        self.chunks = 0
+        self.extract_ms_total = 0.0
+        self.extract_ms_max = 0.0
+        # последние файлы: время извлечения по каждому
+        self.recent: deque[dict] = deque(maxlen=20)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _extract(self, digest: bytes, content_type: str) -> tuple[list[str], float, str | None]:
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            chunks, ms = await asyncio.wait_for(
+                loop.run_in_executor(
+                    self._get_executor(),
+                    extract_chunks,
+                    str(blob_path(digest)),
+                    content_type,
+                    settings.document_text_chunk_chars,
+                    settings.document_text_max_chars,
+                ),
+                timeout=settings.document_text_timeout_seconds,
+            )
+            return chunks, ms, None
+        except asyncio.TimeoutError:
+            # отмена future процесс не останавливает: зависший обработчик занимал бы пул навсегда
+            self._kill()
+            return [], 0.0, _TIMED_OUT
+        except BrokenProcessPool:
+            # обработчик упал (например, на испорченном PDF или по OOM) — пул пересоздаётся
+            self.shutdown()
+            return [], 0.0, _CRASHED
+        except Exception as e:
+            return [], 0.0, f"{type(e).__name__}: {e}"[:500]
+        finally:
+            self.in_flight -= 1
+
+    async def _store(self, digest: bytes, chunks: list[str], error: str | None) -> bool:
+        async with async_session() as session:
+            # строка блокируется до коммита; если файл успели удалить — результат не нужен
+            found = (
+                await session.execute(
+                    update(DocumentFile)
+                    .where(DocumentFile.hash == digest)
+                    .values(indexed_at=datetime.now(timezone.utc), index_error=error)
+                    .returning(DocumentFile.hash)
+                )
+            ).scalar_one_or_none()
+            if found is None:
+                return False
+            await session.execute(delete(DocumentChunk).where(DocumentChunk.file_hash == digest))
+            if chunks:
+                await session.execute(
+                    insert(DocumentChunk),
+                    [{"file_hash": digest, "chunk_no": i, "content": c} for i, c in enumerate(chunks)],
+                )
+            await session.commit()
+        return True
+
+    async def _index(self, digest: bytes, content_type: str, size: int, alone: bool = False) -> bool:
+        """False — пул упал или разбор не уложился в таймаут в пачке: файл остался в очереди, его надо повторить одного."""
+        chunks, ms, error = await self._extract(digest, content_type)
+        if error in (_CRASHED, _TIMED_OUT) and not alone:
+            return False
+        if not await self._store(digest, chunks, error):
+            return True
+        if error is None:
+            self.indexed += 1
+            self.chunks += len(chunks)
+            self.extract_ms_total += ms
+            self.extract_ms_max = max(self.extract_ms_max, ms)
+        else:
+            self.failed += 1
+            logger.warning("document file %s: text extraction failed: %s", digest.hex(), error)
+        self.recent.append({
+            "file_hash": digest.hex(),
+            "content_type": content_type,
+            "size": size,
+            "chunks": len(chunks),
+            "extract_ms": round(ms, 2),
+            "error": error,
+        })
+        return True
+
+    async def run(self) -> dict:
+        """Задача планировщика: разобрать очередь пачками по batch_size файлов."""
+        indexed = failed = batches = 0
+        while True:
+            async with async_session() as session:
+                self.queue_depth = (
+                    await session.execute(select(func.count()).select_from(DocumentFile).where(_PENDING))
+                ).scalar_one()
+                rows = (
+                    await session.execute(
+                        select(DocumentFile.hash, DocumentFile.content_type, DocumentFile.size)
+                        .where(_PENDING)
+                        .order_by(DocumentFile.created_at)
+                        .limit(self.batch_size)
+                    )
+                ).all()
+            if not rows:
+                break
+
+            before = self.indexed, self.failed
+            done = await asyncio.gather(*(self._index(r.hash, r.content_type, r.size) for r in rows))
+            # чей разбор уронил пул, неизвестно: такие файлы — по одному, каждый на свежем пуле
+            for r, ok in zip(rows, done):
+                if not ok:
+                    await self._index(r.hash, r.content_type, r.size, alone=True)
+            indexed += self.indexed - before[0]
+            failed += self.failed - before[1]
+            batches += 1
+            self.queue_depth = max(self.queue_depth - len(rows), 0)
+        return {"indexed": indexed, "failed": failed, "batches": batches}
+
+    def _kill(self) -> None:
+        executor = self._executor
+        if executor is None:
+            return
+        # у ProcessPoolExecutor нет публичного способа остановить занятый процесс (до 3.14)
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "extract_ms_avg": round(self.extract_ms_total / self.indexed, 2) if self.indexed else 0.0,
+            "extract_ms_max": round(self.extract_ms_max, 2),
+            "recent": list(self.recent),
+        }
+
+
+document_indexer = DocumentIndexer(
+    workers=settings.document_text_workers,
+    batch_size=settings.document_text_batch_size,
+)
+
+
+async def index_documents() -> dict:
+    return await document_indexer.run()
+
+
+async def requeue(session: AsyncSession, document_id: int) -> bool:
+    """Поставить файл документа в очередь заново (коммит — за вызывающим)."""
+    file_hash = select(Document.file_hash).where(Document.id == document_id).scalar_subquery()
+    found = (
+        await session.execute(
+            update(DocumentFile)
+            .where(DocumentFile.hash == file_hash)
+            .values(indexed_at=None, index_error=None)
+            .returning(DocumentFile.hash)
+        )
+    ).scalar_one_or_none()
+    return found is not None
+
+
+async def search_document_text(
+    session: AsyncSession, q: str, visible: ColumnElement[bool], limit: int = 20
+) -> list[dict]:
+    """
+    Документы, в тексте файлов которых есть q: по GIN-индексу кусков, лучший
+    кусок на документ (DISTINCT ON), ранжирование ts_rank_cd, сниппет
+    ts_headline только для итоговых строк. visible — условие доступа.
+    """
+    query = tsquery(q)
+    rank = func.ts_rank_cd(DocumentChunk.search_vector, query)
+    best = (
+        select(
+            Document.id.label("document_id"),
+            DocumentChunk.file_hash,
+            DocumentChunk.chunk_no,
+            rank.label("rank"),
+        )
+        .join(Document, Document.file_hash == DocumentChunk.file_hash)
+        .where(DocumentChunk.search_vector.op("@@")(query), visible)
+        .distinct(Document.id)
+        .order_by(Document.id, rank.desc())
+        .subquery()
+    )
+    top = select(best).order_by(best.c.rank.desc(), best.c.document_id.desc()).limit(limit).subquery()
+    rows = (
+        await session.execute(
+            select(
+                Document.id,
+                Document.title,
+                Document.file_url,
+                Document.category,
+                Document.access_level,
+                Document.file_name,
+                top.c.rank,
+                func.ts_headline(cast("russian", REGCONFIG), DocumentChunk.content, query, HEADLINE_OPTIONS).label("snippet"),
+            )
+            .join(top, top.c.document_id == Document.id)
+            .join(
+                DocumentChunk,
+                and_(DocumentChunk.file_hash == top.c.file_hash, DocumentChunk.chunk_no == top.c.chunk_no),
+            )
+            .order_by(top.c.rank.desc(), Document.id.desc())
+        )
+    ).all()
+    return [{**r._mapping, "snippet": snippet_html(r.snippet)} for r in rows]
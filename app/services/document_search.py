@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from sqlalchemy import Float, Integer, String, case, func, literal, or_, select, true, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.core import Document
+from app.pagination import PageParams, keyset
+
+
+def like_pattern(q: str) -> str:
+    """Подстрока для ILIKE с экранированными %, _ и \\."""
+    return "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+async def search_documents(
+    session: AsyncSession,
+    q: str,
+    page: PageParams,
+    category: str | None = None,
+    access_level: str | None = None,
+    visible: ColumnElement[bool] = true(),
+) -> tuple[list, dict[str, dict[str, int]]]:
+    """
+    Поиск по названию одним запросом: подстрока (ILIKE) или похожее написание
+    (оператор % из pg_trgm) — оба условия идут через ix_documents_title_trgm.
+    Страница — по убыванию similarity, keyset по (score, id). Фасеты
+    category/access_level считаются по всем совпадениям с q (без фильтров
+    category/access_level, чтобы было видно, куда ещё можно сузить) через
+    GROUPING SETS в том же запросе (UNION ALL со страницей). visible —
+    условие доступа (access_policy.where), действует и на фасеты.
+    Возвращает (limit + 1 строк страницы для finish_page, фасеты).
+    """
+    matched = (
+        select(
+            Document.id,
+            Document.title,
+            Document.file_url,
+            Document.category,
+            Document.access_level,
+            Document.file_name,
+            func.similarity(Document.title, q, type_=Float).label("score"),
+        )
+        .where(or_(Document.title.ilike(like_pattern(q), escape="\\"), Document.title.op("%")(q)), visible)
+        .cte("matched")
+    )
+
+    hits = select(matched)
+    if category:
+        hits = hits.where(matched.c.category == category)
+    if access_level:
+        hits = hits.where(matched.c.access_level == access_level)
+    hits = keyset(hits, page, (matched.c.score, True), (matched.c.id, True)).subquery("hits")
+
+    facets = select(
+        case((func.grouping(matched.c.category) == 0, "category"), else_="access_level").label("kind"),
+        literal(None, Integer).label("id"),
+        literal(None, String).label("title"),
+        literal(None, String).label("file_url"),
+        matched.c.category,
+        matched.c.access_level,
+        literal(None, String).label("file_name"),
+        literal(None, Float).label("score"),
+        func.count().label("n"),
+    ).group_by(func.grouping_sets(matched.c.category, matched.c.access_level))
+
+    rows = (
+        await session.execute(
+            union_all(
+                select(literal("hit").label("kind"), *hits.c, literal(None, Integer).label("n")),
+                facets,
+            )
+        )
+    ).all()
+
+    items = sorted((r for r in rows if r.kind == "hit"), key=lambda r: (-r.score, -r.id))
+    out: dict[str, dict[str, int]] = {"category": {}, "access_level": {}}
+    for r in rows:
+        if r.kind != "hit":
+            out[r.kind][getattr(r, r.kind)] = r.n
+    return items, out
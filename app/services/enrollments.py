@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from sqlalchemy import Integer, and_, case, column, delete, func, literal, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import Enrollment, Lesson, LessonCompletion
+from app.models.enums import EnrollmentStatus
+
+
+# --- счётчики прогресса, хранящиеся на enrollment -------------------------------------------
+#
+# enrollments.lessons_total / lessons_completed обновляются в момент записи
+# (complete_lesson, сброс прогресса видео, изменение уроков курса), поэтому
+# GET /my-courses и /courses/my_full только читают готовые значения.
+
+
+def lessons_total_expr(course_id):
+    """Скалярный подзапрос: число уроков курса (course_id — значение или колонка)."""
+    return (
+        select(func.count(Lesson.id))
+        .where(Lesson.course_id == course_id)
+        .scalar_subquery()
+    )
+
+
+def lessons_completed_expr(user_id, course_id):
+    """Скалярный подзапрос: число уроков курса, отмеченных пользователем как пройденные."""
+    return (
+        select(func.count(LessonCompletion.id))
+        .join(Lesson, Lesson.id == LessonCompletion.lesson_id)
+        .where(LessonCompletion.user_id == user_id, Lesson.course_id == course_id)
+        .scalar_subquery()
+    )
+
+
+def progress_values(done, total) -> dict:
+    """
+    SET-часть UPDATE enrollments для новых значений счётчиков.
+    Статус только продвигается вперёд: завершённый курс не «откатывается»,
+    даже если в него добавили уроки.
+    """
+    completed = and_(total > 0, done >= total)
+    return {
+        "lessons_completed": done,
+        "lessons_total": total,
+        "progress_percent": case(
+            (total > 0, func.least(100, done * 100 / total)),
+            else_=0,
+        ),
+        "status": case(
+            (completed, EnrollmentStatus.COMPLETED.value),
+            (and_(done > 0, Enrollment.status == EnrollmentStatus.ASSIGNED.value), EnrollmentStatus.IN_PROGRESS.value),
+            else_=Enrollment.status,
+        ),
+        "completed_at": case(
+            (completed, func.coalesce(Enrollment.completed_at, func.now())),
+            else_=Enrollment.completed_at,
+        ),
+    }
+
+
+def _apply_delta_stmt(changed, sign: int):
+    """UPDATE enrollments по CTE изменённых (user_id, lesson_id)."""
+    delta = (
+        select(changed.c.user_id, Lesson.course_id, func.count().label("cnt"))
+        .join(Lesson, Lesson.id == changed.c.lesson_id)
+        .group_by(changed.c.user_id, Lesson.course_id)
+        .subquery("delta")
+    )
+    done = func.greatest(0, Enrollment.lessons_completed + sign * delta.c.cnt)
+    return (
+        update(Enrollment)
+        .where(Enrollment.user_id == delta.c.user_id, Enrollment.course_id == delta.c.course_id)
+        .values(**progress_values(done, Enrollment.lessons_total))
+    )
+
+
+async def mark_lessons_completed(session: AsyncSession, pairs: list[tuple[int, int]]) -> None:
+    """
+    Отмечает уроки пройденными и одним запросом обновляет счётчики enrollments.
+    Уже отмеченные пары (ON CONFLICT DO NOTHING) и уроки курсов, на которые
+    пользователь не записан, пропускаются.
+    """
+    if not pairs:
+        return
+    src = values(column("user_id", Integer), column("lesson_id", Integer), name="src").data(pairs)
+    inserted = (
+        pg_insert(LessonCompletion)
+        .from_select(
+            ["user_id", "lesson_id"],
+            select(src.c.user_id, src.c.lesson_id)
+            .join(Lesson, Lesson.id == src.c.lesson_id)
+            .join(Enrollment, (Enrollment.user_id == src.c.user_id) & (Enrollment.course_id == Lesson.course_id)),
+        )
+        .on_conflict_do_nothing(constraint="uq_user_lesson_completion")
+        .returning(LessonCompletion.user_id, LessonCompletion.lesson_id)
+        .cte("inserted")
+    )
+    await session.execute(_apply_delta_stmt(inserted, +1).add_cte(inserted))
+
+
+async def unmark_lesson_completed(session: AsyncSession, user_id: int, lesson_id: int) -> None:
+    deleted = (
+        delete(LessonCompletion)
+        .where(LessonCompletion.user_id == user_id, LessonCompletion.lesson_id == lesson_id)
+        .returning(LessonCompletion.user_id, LessonCompletion.lesson_id)
+        .cte("deleted")
+    )
+    await session.execute(_apply_delta_stmt(deleted, -1).add_cte(deleted))
+
+
+async def refresh_course_totals(session: AsyncSession, course_id: int) -> None:
+    """Пересчитать lessons_total у всех записей на курс (после изменения набора уроков)."""
+    await session.execute(
+        update(Enrollment)
+        .where(Enrollment.course_id == course_id)
+        .values(**progress_values(Enrollment.lessons_completed, lessons_total_expr(course_id)))
+    )
+
+
+# --- массовое назначение --------------------------------------------------------------------
+
+
+def enroll_from_select(pairs):
+    """
+    INSERT INTO enrollments ... SELECT ... ON CONFLICT DO NOTHING RETURNING id.
+
+    pairs — select с колонками user_id, course_id, deadline_days; дедлайн
+    и счётчики прогресса вычисляются на стороне БД.
+    """
+    src = pairs.subquery("src")
+    deadline_at = case(
+        (src.c.deadline_days > 0, func.now() + func.make_interval(0, 0, 0, src.c.deadline_days)),
+        else_=None,
+    )
+    rows = select(
+        src.c.user_id,
+        src.c.course_id,
+        literal(EnrollmentStatus.ASSIGNED.value),
+        literal(0),
+        deadline_at,
+        lessons_total_expr(src.c.course_id),
+        lessons_completed_expr(src.c.user_id, src.c.course_id),
+    )
+    return (
+        pg_insert(Enrollment)
+        .from_select(
+            ["user_id", "course_id", "status", "progress_percent", "deadline_at", "lessons_total", "lessons_completed"],
+            rows,
+        )
+        .on_conflict_do_nothing(constraint="uq_enrollments_user_course")
+        .returning(Enrollment.id)
+    )
+
+
+async def enroll_count(session: AsyncSession, pairs) -> int:
+    """Выполнить enroll_from_select одним запросом и вернуть число созданных записей."""
+    inserted = enroll_from_select(pairs).cte("inserted")
+    return (await session.execute(select(func.count()).select_from(inserted))).scalar_one()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+
+import asyncpg
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.enums import Role
+from app.services.principal_cache import Principal
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "bplus_events"
+
+# кто получает события отдела (те же роли, что у входящих ментора)
+MENTOR_ROLES = (Role.MENTOR.value, Role.TEAM_LEAD.value, Role.ADMIN.value)
+
+
+def _payload(event_type: str, data: dict) -> str:
+    return json.dumps({"type": event_type, **data}, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+# eq=False: подписчики различаются по identity и хранятся в set
+@dataclass(slots=True, eq=False)
+class Subscriber:
+    user_id: int
+    department_id: int | None
+    is_mentor: bool
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(settings.events_queue_size))
+    dropped: int = 0
+
+    def wants(self, event: dict) -> bool:
+        if event.get("user_id") == self.user_id:
+            return True
+        return self.is_mentor and self.department_id is not None and event.get("department_id") == self.department_id
+
+    def offer(self, frame: bytes) -> bool:
+        """Положить кадр в очередь; медленный клиент теряет самые старые события."""
+        dropped = False
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            dropped = True
+        self.queue.put_nowait(frame)
+        return not dropped
+
+
+class EventHub:
+    """
+    Внутренний pub/sub для push-уведомлений.
+
+    publish() делает pg_notify в транзакции изменения: событие уходит только
+    после commit и приходит всем воркерам, которые слушают канал (включая
+    текущий). Каждый воркер держит одно выделенное asyncpg-соединение с LISTEN
+    и раздаёт события своим подписчикам (SSE-соединениям) в ограниченные
+    очереди. Пока соединение переподключается, события теряются — клиент
+    после переподключения потока перечитывает списки сам.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: set[Subscriber] = set()
+        self._task: asyncio.Task | None = None
+        self.listening = False
+        self.published = 0
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.connections_total = 0
+        self.peak_connections = 0
+        self.rejected = 0
+        self.reconnects = 0
+
+    async def publish(self, session: AsyncSession, event_type: str, **data) -> None:
+        await session.execute(select(func.pg_notify(CHANNEL, _payload(event_type, data))))
+        self.published += 1
+
+    async def publish_many(self, session: AsyncSession, event_type: str, items: list[dict]) -> None:
+        """Пачка событий одного типа одним запросом (pg_notify по unnest)."""
+        if not items:
+            return
+        payloads = [_payload(event_type, data) for data in items]
+        await session.execute(
+            text("SELECT pg_notify(:channel, p) FROM unnest(CAST(:payloads AS text[])) AS p"),
+            {"channel": CHANNEL, "payloads": payloads},
+        )
+        self.published += len(payloads)
+
+    def subscribe(self, user: Principal) -> Subscriber | None:
+        """None — превышен events_max_connections."""
+        if len(self._subscribers) >= settings.events_max_connections:
+            self.rejected += 1
+            return None
+        sub = Subscriber(user_id=user.id, department_id=user.department_id, is_mentor=user.role in MENTOR_ROLES)
+        self._subscribers.add(sub)
+        self.connections_total += 1
+        self.peak_connections = max(self.peak_connections, len(self._subscribers))
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subscribers.discard(sub)
+
+    def dispatch(self, payload: str) -> None:
+        self.received += 1
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("bad event payload: %r", payload[:200])
+            return
+        # кадр SSE собираем один раз на всех получателей
+        frame = f"event: {event.get('type', 'message')}\ndata: {payload}\n\n".encode()
+        for sub in self._subscribers:
+            if sub.wants(event):
+                self.delivered += 1
+                if not sub.offer(frame):
+                    self.dropped += 1
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        self.dispatch(payload)
+
+    async def _listen(self) -> None:
+        dsn = make_url(settings.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(CHANNEL, self._on_notify)
+                self.listening = True
+                # периодический запрос — чтобы заметить молча оборвавшееся соединение
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), settings.events_keepalive_seconds)
+                    except TimeoutError:
+                        await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("event listener connection failed")
+            finally:
+                self.listening = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            self.reconnects += 1
+            await asyncio.sleep(settings.events_reconnect_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.listening,
+            "connections": len(self._subscribers),
+            "peak_connections": self.peak_connections,
+            "connections_total": self.connections_total,
+            "rejected": self.rejected,
+            "published": self.published,
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "reconnects": self.reconnects,
+        }
+
+
+events = EventHub()
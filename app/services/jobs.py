@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Job:
+    id: str
+    kind: str
+    status: str = "PENDING"  # PENDING | RUNNING | DONE | FAILED
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = None
+    progress: dict[str, Any] = field(default_factory=dict)
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class JobRegistry:
+    """
+    Фоновые задачи внутри процесса (asyncio.Task) со статусом для опроса по id.
+    Хранится ограниченная история; статус виден только в том воркере,
+    который запустил задачу.
+    """
+
+    def __init__(self, keep: int = 200) -> None:
+        self.keep = keep
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def start(self, kind: str, fn: Callable[[Job], Awaitable[dict[str, Any]]]) -> Job:
+        job = Job(id=secrets.token_hex(8), kind=kind)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.keep:
+            self._jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job, fn))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job, fn: Callable[[Job], Awaitable[dict[str, Any]]]) -> None:
+        job.status = "RUNNING"
+        try:
+            job.result = await fn(job)
+            job.status = "DONE"
+        except Exception as e:
+            logger.exception("job %s (%s) failed", job.id, job.kind)
+            job.status = "FAILED"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+
+jobs = JobRegistry()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+import anyio
+from fastapi import HTTPException, Request, Response
+from starlette.types import Receive, Scope, Send
+
+from app.settings import settings
+
+# ASGI-расширение для отдачи файла через sendfile (без копирования в Python)
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+def resolve_media_path(relative: str) -> Path:
+    """Путь внутри media_root; выход за его пределы (../, абсолютные пути) — 404."""
+    root = Path(settings.media_root).resolve()
+    path = (root / relative).resolve()
+    if not path.is_relative_to(root):
+        raise HTTPException(status_code=404, detail="Media not found")
+    return path
+
+
+def _etag(st: os.stat_result) -> str:
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _not_modified(request: Request, etag: str, st: os.stat_result) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(st.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+_RANGE_SPEC = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Один диапазон bytes=a-b / a- / -n -> [start, end). None — заголовок
+    игнорируется (синтаксически неверный или несколько диапазонов: отдаём
+    весь файл, RFC 9110 это допускает). ValueError — диапазон вне файла (416).
+    """
+    unit, _, spec = header.partition("=")
+    m = _RANGE_SPEC.match(spec)
+    if unit.strip().lower() != "bytes" or m is None or not any(m.groups()):
+        return None
+    first, last = m.groups()
+
+    if not first:
+        # суффикс: последние N байт
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - suffix), size
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("range starts after end of file")
+    return start, min(int(last) + 1, size) if last else size
+
+
+class _FileBody(Response):
+    def __init__(self, path: Path, start: int, end: int, status_code: int, headers: dict[str, str]) -> None:
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.start = start
+        self.count = end - start
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+            try:
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            finally:
+                file.close()
+            return
+
+        # запасной путь: крупные блоки из пула потоков
+        remaining = self.count
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(settings.media_chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # файл укоротился во время отдачи
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def ranged_file_response(
+    request: Request,
+    path: Path,
+    headers: dict[str, str] | None = None,
+    *,
+    etag: str | None = None,
+    media_type: str | None = None,
+) -> Response:
+    """
+    Ответ-файл: Range/206 (один диапазон), If-Range, ETag/Last-Modified,
+    If-None-Match/If-Modified-Since -> 304, HEAD. etag — свой (например, хэш
+    содержимого), по умолчанию размер+mtime; media_type — если по имени файла
+    тип не угадать.
+    """
+    try:
+        st = await anyio.to_thread.run_sync(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Media not found")
+    if not stat.S_ISREG(st.st_mode):
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    etag = etag or _etag(st)
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    out = {
+        **(headers or {}),
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+    }
+    if _not_modified(request, etag, st):
+        return Response(status_code=304, headers=out)
+
+    size = st.st_size
+    start, end, status_code = 0, size, 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() in (etag, last_modified)):
+        try:
+            parsed = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**out, "Content-Range": f"bytes */{size}"})
+        if parsed is not None:
+            start, end = parsed
+            status_code = 206
+            out["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+    out["Content-Length"] = str(end - start)
+    out["Content-Type"] = media_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    return _FileBody(path, start, end, status_code, out)
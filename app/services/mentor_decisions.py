@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Integer, String, Text, column, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import DailyReport, DailyReportRevision, ReportBody, User
+from app.models.enums import ReportStatus
+from app.services.events import events
+from app.services.report_bodies import body_hash_sql
+from app.services.standup_stats import StatsDelta, add_decision, submitted_at_query
+
+
+def _validate(items) -> tuple[dict[int, tuple[str, str | None]], dict[int, str]]:
+    """Разбор пачки: report_id -> (status, comment) и ошибки по позициям."""
+    decisions: dict[int, tuple[str, str | None]] = {}
+    errors: dict[int, str] = {}
+    for i, item in enumerate(items):
+        comment = item.mentor_comment.strip() if item.mentor_comment else None
+        if item.report_id in decisions:
+            errors[i] = "Duplicate report_id"
+        elif item.action == ReportStatus.REVISION.value and not comment:
+            errors[i] = "Комментарий обязателен при возврате на доработку"
+        else:
+            decisions[item.report_id] = (item.action, comment)
+    return decisions, errors
+
+
+async def apply_decisions(session: AsyncSession, items) -> list[dict]:
+    """
+    Решения ментора по многим отчётам в одной транзакции (коммитит вызывающий):
+    блокировка и чтение отчётов, UPDATE отчётов, тела и ревизии, сводка
+    standup_stats и уведомления — по одному set-based запросу на шаг,
+    независимо от размера пачки. Тексты отчётов в Python не читаются.
+    Результат — по элементу на каждую позицию items.
+    """
+    decisions, errors = _validate(items)
+
+    found = {}
+    if decisions:
+        rows = (
+            await session.execute(
+                select(
+                    DailyReport.id,
+                    DailyReport.user_id,
+                    DailyReport.day_number,
+                    DailyReport.status,
+                    DailyReport.created_at,
+                    User.department_id,
+                )
+                .join(User, User.id == DailyReport.user_id)
+                .where(DailyReport.id.in_(decisions))
+                .order_by(DailyReport.id)  # один порядок блокировок у параллельных пачек
+                .with_for_update(of=DailyReport)
+            )
+        ).all()
+        found = {r.id: r for r in rows}
+
+    if found:
+        v = values(
+            column("id", Integer), column("status", String), column("comment", Text), name="v"
+        ).data([(rid, *decisions[rid]) for rid in found])
+
+        await session.execute(
+            update(DailyReport)
+            .where(DailyReport.id == v.c.id)
+            .values(status=v.c.status, mentor_comment=v.c.comment)
+            .execution_options(synchronize_session=False)
+        )
+
+        # тексты не менялись: тело обычно уже есть, кроме отчётов без ревизий
+        body_hash = body_hash_sql(DailyReport.text_done, DailyReport.text_plan, DailyReport.text_blockers)
+        await session.execute(
+            pg_insert(ReportBody)
+            .from_select(
+                ["hash", "text_done", "text_plan", "text_blockers"],
+                select(body_hash, DailyReport.text_done, DailyReport.text_plan, DailyReport.text_blockers)
+                .where(DailyReport.id.in_(found)),
+            )
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+        await session.execute(
+            pg_insert(DailyReportRevision).from_select(
+                ["report_id", "body_hash", "status", "mentor_comment"],
+                select(DailyReport.id, body_hash, DailyReport.status, DailyReport.mentor_comment)
+                .where(DailyReport.id.in_(found)),
+            )
+        )
+
+        pending = [r.id for r in found.values() if r.status == ReportStatus.PENDING.value]
+        submitted = dict((await session.execute(submitted_at_query(pending))).all()) if pending else {}
+        now = datetime.now(timezone.utc)
+        delta = StatsDelta()
+        decided = []
+        for rid, r in found.items():
+            status, _ = decisions[rid]
+            add_decision(delta, r.department_id, r.created_at, r.status, status, submitted.get(rid), now)
+            decided.append({
+                "report_id": rid,
+                "user_id": r.user_id,
+                "department_id": r.department_id,
+                "status": status,
+                "day_number": r.day_number,
+            })
+        await delta.apply(session)
+        await events.publish_many(session, "report.decided", decided)
+
+    results = []
+    for i, item in enumerate(items):
+        if i in errors:
+            results.append({"report_id": item.report_id, "ok": False, "error": errors[i]})
+        elif item.report_id not in found:
+            results.append({"report_id": item.report_id, "ok": False, "error": "Report not found"})
+        else:
+            results.append({"report_id": item.report_id, "ok": True, "status": decisions[item.report_id][0]})
+    return results
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.models.core import User
+from app.settings import settings
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Лёгкий снимок пользователя для авторизации (без ORM-сессии)."""
+
+    id: int
+    email: str
+    full_name: str
+    role: str
+    department_id: int | None
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> Principal:
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            department_id=user.department_id,
+            is_active=user.is_active,
+        )
+
+
+class PrincipalCache:
+    """
+    Ограниченный LRU-кэш с TTL: user_id -> Principal.
+
+    Кэш локален для процесса: изменения из других воркеров видны
+    не позже чем через ttl_seconds.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Principal | None:
+        item = self._items.get(user_id)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, principal = item
+        if expires_at <= time.monotonic():
+            del self._items[user_id]
+            self.misses += 1
+            return None
+
+        self._items.move_to_end(user_id)
+        self.hits += 1
+        return principal
+
+    def put(self, principal: Principal) -> None:
+        if self.max_size <= 0:
+            return
+        self._items[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+        self._items.move_to_end(principal.id)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        if self._items.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.principal_cache_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Integer, LargeBinary, cast, column, func, select, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db import async_session
+from app.models.core import Lesson, VideoProgress
+from app.services.enrollments import mark_lessons_completed
+from app.services.watch_bitmap import bitmap_or
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# asyncpg ограничивает число параметров в одном запросе (32767)
+_FLUSH_CHUNK = 1000
+# присланный клиентом процент только для отображения: урок засчитывает
+# лишь покрытие битовой карты относительно Lesson.duration_sec
+CLIENT_PERCENT_MAX = 99
+
+
+@dataclass(slots=True)
+class PendingProgress:
+    position_sec: int
+    # None — клиент не прислал процент: его посчитает БД по битовой карте
+    watched_percent: int | None
+    updated_at: datetime
+    heartbeats: int = 1
+    # OR всех отрезков, пришедших с момента последнего сброса
+    bitmap: bytes | None = None
+
+    def merge(self, other: PendingProgress) -> None:
+        """Дополнить более старой записью: позиция и время — свои, карта — объединение."""
+        self.bitmap = bitmap_or(self.bitmap, other.bitmap)
+        if self.watched_percent is None:
+            self.watched_percent = other.watched_percent
+        self.heartbeats += other.heartbeats
+
+
+class ProgressBuffer:
+    """
+    Write-behind буфер для heartbeat'ов плеера.
+
+    Хранит последнюю позицию по (user_id, lesson_id) и периодически
+    сбрасывает её пачкой INSERT ... ON CONFLICT DO UPDATE; досмотренные
+    до 100% уроки при этом засчитываются в прогресс курса. Чтения должны
+    накладывать overlay() поверх данных из БД.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int) -> None:
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        # user_id -> lesson_id -> PendingProgress
+        self._pending: dict[int, dict[int, PendingProgress]] = {}
+        self._pending_size = 0
+        # пачка, которая сейчас пишется в БД: видна чтениям до коммита
+        self._flushing: dict[int, dict[int, PendingProgress]] = {}
+
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+        self.heartbeats = 0
+        self.flushed_heartbeats = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = 0.0
+
+    def put(
+        self,
+        user_id: int,
+        lesson_id: int,
+        position_sec: int,
+        watched_percent: int | None = None,
+        bitmap: bytes | None = None,
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        if watched_percent is not None:
+            watched_percent = min(watched_percent, CLIENT_PERCENT_MAX)
+        by_lesson = self._pending.setdefault(user_id, {})
+        item = by_lesson.get(lesson_id)
+        if item is None:
+            by_lesson[lesson_id] = PendingProgress(position_sec, watched_percent, now, bitmap=bitmap or None)
+            self._pending_size += 1
+        else:
+            item.position_sec = position_sec
+            if watched_percent is not None:
+                item.watched_percent = watched_percent
+            item.bitmap = bitmap_or(item.bitmap, bitmap or None)
+            item.updated_at = now
+            item.heartbeats += 1
+
+        self.heartbeats += 1
+        if self._pending_size >= self.max_pending:
+            self._wakeup.set()
+
+    def get(self, user_id: int, lesson_id: int) -> PendingProgress | None:
+        item = self._pending.get(user_id, {}).get(lesson_id)
+        if item is None:
+            item = self._flushing.get(user_id, {}).get(lesson_id)
+        return item
+
+    def overlay(self, user_id: int) -> dict[int, PendingProgress]:
+        """Несброшенный прогресс пользователя: lesson_id -> PendingProgress."""
+        out = dict(self._flushing.get(user_id, {}))
+        out.update(self._pending.get(user_id, {}))
+        return out
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending, self._pending_size = self._pending, {}, 0
+            self._flushing = batch
+            rows = [
+                {
+                    "user_id": user_id,
+                    "lesson_id": lesson_id,
+                    "position_sec": item.position_sec,
+                    "watched_percent": item.watched_percent,
+                    "updated_at": item.updated_at,
+                    "bitmap": item.bitmap,
+                }
+                for user_id, by_lesson in batch.items()
+                for lesson_id, item in by_lesson.items()
+            ]
+
+            t0 = time.perf_counter()
+            written = 0
+            try:
+                async with async_session() as session:
+                    for i in range(0, len(rows), _FLUSH_CHUNK):
+                        res = (await session.execute(_upsert_stmt(rows[i:i + _FLUSH_CHUNK]))).all()
+                        written += len(res)
+                        # досмотренные уроки засчитываем в той же транзакции
+                        await mark_lessons_completed(
+                            session, [(r.user_id, r.lesson_id) for r in res if r.watched_percent >= 100]
+                        )
+                    await session.commit()
+            except Exception:
+                self.failed_flushes += 1
+                logger.exception("progress flush failed, %s rows returned to buffer", len(rows))
+                self._restore(batch)
+                return 0
+            finally:
+                self._flushing = {}
+                self.last_flush_ms = (time.perf_counter() - t0) * 1000
+
+            self.flushes += 1
+            self.rows_written += written
+            self.flushed_heartbeats += sum(item.heartbeats for by_lesson in batch.values() for item in by_lesson.values())
+            return written
+
+    def _restore(self, batch: dict[int, dict[int, PendingProgress]]) -> None:
+        # свежие heartbeat'ы, пришедшие во время сброса, важнее старых
+        for user_id, by_lesson in batch.items():
+            current = self._pending.setdefault(user_id, {})
+            for lesson_id, item in by_lesson.items():
+                if lesson_id in current:
+                    current[lesson_id].merge(item)
+                else:
+                    current[lesson_id] = item
+                    self._pending_size += 1
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # без cancel(): отмена посреди flush() потеряла бы уже снятую с _pending пачку
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._pending_size,
+            "heartbeats": self.heartbeats,
+            "rows_written": self.rows_written,
+            # сколько heartbeat'ов в среднем схлопывается в одну запись
+            "coalescing_ratio": round(self.flushed_heartbeats / self.rows_written, 2) if self.rows_written else 0.0,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+        }
+
+
+def _percent(bitmap, duration):
+    return func.watched_bitmap_percent(bitmap, duration, settings.progress_bitmap_seconds_per_bit)
+
+
+def _upsert_stmt(rows: list[dict]):
+    buf = values(
+        column("user_id", Integer),
+        column("lesson_id", Integer),
+        column("position_sec", Integer),
+        column("watched_percent", Integer),
+        column("updated_at", DateTime(timezone=True)),
+        column("bitmap", LargeBinary),
+        name="buf",
+    ).data([
+        (r["user_id"], r["lesson_id"], r["position_sec"], r["watched_percent"], r["updated_at"], r["bitmap"])
+        for r in rows
+    ])
+
+    # NULL в VALUES без типа Postgres считает text — приводим явно
+    bitmap = cast(buf.c.bitmap, LargeBinary)
+    client_percent = cast(buf.c.watched_percent, Integer)
+    # только длительность урока: присланной клиентом верить нельзя; пока она
+    # неизвестна, процент — клиентский (не выше CLIENT_PERCENT_MAX) и урок не засчитывается
+    duration = Lesson.duration_sec
+
+    # join с lessons отбрасывает heartbeat'ы по несуществующим урокам,
+    # чтобы один битый lesson_id не валил всю пачку на FK
+    src = select(
+        buf.c.user_id,
+        buf.c.lesson_id,
+        buf.c.position_sec,
+        func.coalesce(_percent(bitmap, duration), client_percent, 0),
+        buf.c.updated_at,
+        bitmap,
+        duration,
+    ).join(Lesson, Lesson.id == buf.c.lesson_id)
+
+    stmt = pg_insert(VideoProgress).from_select(
+        ["user_id", "lesson_id", "position_sec", "watched_percent", "updated_at", "watched_bitmap", "duration_sec"],
+        src,
+    )
+    merged = func.bytea_or(VideoProgress.watched_bitmap, stmt.excluded.watched_bitmap)
+    return stmt.on_conflict_do_update(
+        constraint="uq_video_user_lesson",
+        set_={
+            "position_sec": stmt.excluded.position_sec,
+            # процент по объединённой карте; без карты или длительности — присланный клиентом
+            "watched_percent": func.coalesce(
+                _percent(merged, stmt.excluded.duration_sec),
+                func.nullif(stmt.excluded.watched_percent, 0),
+                VideoProgress.watched_percent,
+            ),
+            "updated_at": stmt.excluded.updated_at,
+            "watched_bitmap": merged,
+            "duration_sec": stmt.excluded.duration_sec,
+        },
+    ).returning(VideoProgress.user_id, VideoProgress.lesson_id, VideoProgress.watched_percent)
+
+
+progress_buffer = ProgressBuffer(
+    flush_interval=settings.progress_flush_interval_seconds,
+    max_pending=settings.progress_flush_max_pending,
+)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import RefreshToken, User
+from app.settings import settings
+
+
+def hash_token(token: str) -> str:
+    # токен случайный (256 бит), поэтому достаточно быстрого sha256 — argon2 не нужен
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(session: AsyncSession, user_id: int, family_id: str | None = None) -> str:
+    token = secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    session.add(RefreshToken(
+        user_id=user_id,
+        family_id=family_id or secrets.token_hex(16),
+        token_hash=hash_token(token),
+        created_at=now,
+        expires_at=now + timedelta(days=settings.refresh_token_days),
+    ))
+    return token
+
+
+async def revoke_family(session: AsyncSession, family_id: str, now: datetime | None = None) -> None:
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now or datetime.now(timezone.utc))
+    )
+
+
+async def revoke_user_tokens(session: AsyncSession, user_id: int, now: datetime | None = None) -> None:
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now or datetime.now(timezone.utc))
+    )
+
+
+async def rotate_refresh_token(session: AsyncSession, token: str) -> tuple[int, str]:
+    """
+    Обменивает refresh-токен на новый из той же цепочки.
+    Повторное предъявление уже использованного токена считается утечкой:
+    отзываем всю цепочку. Коммит — на вызывающей стороне.
+    """
+    now = datetime.now(timezone.utc)
+
+    row = (
+        await session.execute(
+            select(RefreshToken, User.is_active)
+            .join(User, User.id == RefreshToken.user_id)
+            .where(RefreshToken.token_hash == hash_token(token))
+            .with_for_update(of=RefreshToken)
+        )
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    rt, is_active = row
+
+    if rt.revoked_at is not None:
+        await revoke_family(session, rt.family_id, now=now)
+        await session.commit()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token reuse detected")
+
+    if rt.expires_at <= now or not is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    rt.revoked_at = now
+    new_token = issue_refresh_token(session, rt.user_id, family_id=rt.family_id)
+    return rt.user_id, new_token
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import hashlib
+
+from sqlalchemy import LargeBinary, func, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import DailyReport, DailyReportRevision, ReportBody
+
+# Тексты ревизий хранятся один раз на уникальное содержимое: ревизия ссылается
+# на report_bodies по sha256. Решение ментора меняет только статус/комментарий,
+# поэтому его ревизия переиспользует тело предыдущей.
+#
+# Хэш — sha256(text_done \0 text_plan \0 text_blockers) в UTF-8; text в Postgres
+# не может содержать \0, так что разделитель однозначен. Та же формула — в SQL
+# миграции e7a1c9f04b2d (сжатие старых ревизий).
+
+
+def body_hash(text_done: str, text_plan: str, text_blockers: str) -> bytes:
+    return hashlib.sha256("\0".join((text_done, text_plan, text_blockers)).encode()).digest()
+
+
+def body_hash_sql(text_done, text_plan, text_blockers):
+    """То же, что body_hash, выражением SQL — для INSERT ... SELECT без чтения текстов в Python."""
+    sep = literal(b"\0", LargeBinary)
+    parts = [func.convert_to(col, "UTF8") for col in (text_done, text_plan, text_blockers)]
+    return func.sha256(parts[0].op("||")(sep).op("||")(parts[1]).op("||")(sep).op("||")(parts[2]))
+
+
+async def add_revision(session: AsyncSession, report: DailyReport) -> DailyReportRevision:
+    """Снимок текущего состояния отчёта; тело пишется, только если такого ещё нет."""
+    digest = body_hash(report.text_done, report.text_plan, report.text_blockers)
+    await session.execute(
+        pg_insert(ReportBody)
+        .values(
+            hash=digest,
+            text_done=report.text_done,
+            text_plan=report.text_plan,
+            text_blockers=report.text_blockers,
+        )
+        .on_conflict_do_nothing(index_elements=["hash"])
+    )
+    rev = DailyReportRevision(
+        report_id=report.id,
+        body_hash=digest,
+        status=report.status,
+        mentor_comment=report.mentor_comment,
+    )
+    session.add(rev)
+    return rev
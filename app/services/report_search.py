@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import html
+
+from sqlalchemy import cast, func, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import DailyReport, User
+
+# ts_headline не экранирует текст: размечаем управляющими символами,
+# экранируем в Python и только потом подставляем <mark>
+_START, _STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = f"StartSel={_START}, StopSel={_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+
+
+def tsquery(q: str):
+    # websearch-синтаксис: "фраза", -исключение, or; запрос разбирается обеими морфологиями
+    return func.websearch_to_tsquery(cast("russian", REGCONFIG), q).op("||")(
+        func.websearch_to_tsquery(cast("english", REGCONFIG), q)
+    )
+
+
+def snippet_html(headline: str) -> str:
+    return html.escape(headline).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+async def search_reports(
+    session: AsyncSession,
+    q: str,
+    department_id: int,
+    exclude_user_id: int | None = None,
+    user_id: int | None = None,
+    statuses: list[str] | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    """
+    Лучшие limit отчётов отдела по запросу q: фильтр по GIN-индексу
+    search_vector, ранжирование ts_rank_cd (блокеры весят больше), сниппеты
+    ts_headline только для строк итоговой страницы.
+    """
+    query = tsquery(q)
+    rank = func.ts_rank_cd(DailyReport.search_vector, query)
+    stmt = (
+        select(
+            DailyReport.id,
+            DailyReport.user_id,
+            DailyReport.day_number,
+            DailyReport.status,
+            DailyReport.created_at,
+            User.full_name.label("user_full_name"),
+            rank.label("rank"),
+        )
+        .join(User, User.id == DailyReport.user_id)
+        .where(User.department_id == department_id, DailyReport.search_vector.op("@@")(query))
+    )
+    if exclude_user_id is not None:
+        stmt = stmt.where(User.id != exclude_user_id)
+    if user_id is not None:
+        stmt = stmt.where(DailyReport.user_id == user_id)
+    if statuses:
+        stmt = stmt.where(DailyReport.status.in_(statuses))
+    top = stmt.order_by(rank.desc(), DailyReport.id.desc()).limit(limit).subquery()
+
+    # по полю отдельно: склейка текстов сбивает парсер, если в одном из них
+    # встречается что-то похожее на HTML-тег (<script> «съедает» всё до конца)
+    headlines = [
+        func.ts_headline(cast("russian", REGCONFIG), col, query, HEADLINE_OPTIONS).label(col.key)
+        for col in (DailyReport.text_blockers, DailyReport.text_done, DailyReport.text_plan)
+    ]
+    rows = (
+        await session.execute(
+            select(top, *headlines)
+            .join(DailyReport, DailyReport.id == top.c.id)
+            .order_by(top.c.rank.desc(), top.c.id.desc())
+        )
+    ).all()
+
+    out = []
+    for r in rows:
+        item = dict(r._mapping)
+        parts = [item.pop(h.key) for h in headlines]
+        matched = [p for p in parts if _START in p]
+        item["snippet"] = " … ".join(snippet_html(p) for p in matched or parts[:1])
+        out.append(item)
+    return out
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db import engine
+from app.models.core import SchedulerRun
+
+logger = logging.getLogger(__name__)
+
+
+def advisory_key(name: str) -> int:
+    """Стабильный bigint-ключ advisory lock по имени задачи."""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+
+
+@dataclass(slots=True)
+class PeriodicTask:
+    name: str
+    interval: float
+    fn: Callable[[], Awaitable[dict[str, Any]]]
+
+    runs: int = 0
+    # запуск пропущен: задачу выполняет или недавно выполнил другой воркер
+    skipped: int = 0
+    failures: int = 0
+    last_started_at: datetime | None = None
+    last_duration_ms: float = 0.0
+    last_result: dict[str, Any] = field(default_factory=dict)
+    last_error: str | None = None
+
+
+class Scheduler:
+    """
+    Периодические задачи внутри процесса. Каждый запуск берёт
+    pg_try_advisory_lock по имени задачи на отдельном соединении, так что
+    одновременно задачу выполняет только один воркер uvicorn. Под блокировкой
+    плановый запуск отмечается в scheduler_runs и выполняется, только если
+    с прошлого (в любом воркере) прошло не меньше interval: иначе N воркеров
+    выполняли бы задачу по очереди N раз за интервал. Сама задача открывает
+    свои сессии и может коммитить пачками.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, PeriodicTask] = {}
+        self._running: list[asyncio.Task] = []
+
+    def add(self, name: str, interval: float, fn: Callable[[], Awaitable[dict[str, Any]]]) -> PeriodicTask:
+        task = PeriodicTask(name=name, interval=interval, fn=fn)
+        self._tasks[name] = task
+        return task
+
+    async def run_once(self, name: str, due_only: bool = False) -> dict[str, Any] | None:
+        """
+        Один запуск задачи; None — если её сейчас выполняет другой воркер.
+        due_only (плановый запуск) — ещё и если с прошлого запуска не прошёл interval.
+        """
+        task = self._tasks[name]
+        key = advisory_key(name)
+        async with engine.connect() as lock_conn:
+            locked = (await lock_conn.execute(select(func.pg_try_advisory_lock(key)))).scalar_one()
+            await lock_conn.commit()
+            if not locked:
+                task.skipped += 1
+                return None
+            try:
+                stmt = pg_insert(SchedulerRun).values(name=name, last_run_at=func.now())
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[SchedulerRun.name],
+                    set_={"last_run_at": stmt.excluded.last_run_at},
+                    where=(SchedulerRun.last_run_at <= func.now() - timedelta(seconds=task.interval)) if due_only else None,
+                ).returning(SchedulerRun.name)
+                due = (await lock_conn.execute(stmt)).scalar_one_or_none() is not None
+                await lock_conn.commit()
+                if not due:
+                    task.skipped += 1
+                    return None
+
+                task.last_started_at = datetime.now(timezone.utc)
+                t0 = time.perf_counter()
+                try:
+                    task.last_result = await task.fn()
+                    task.last_error = None
+                except Exception as e:
+                    task.failures += 1
+                    task.last_error = str(e)
+                    logger.exception("scheduled task %s failed", name)
+                    return None
+                finally:
+                    task.runs += 1
+                    task.last_duration_ms = (time.perf_counter() - t0) * 1000
+                return task.last_result
+            finally:
+                await lock_conn.execute(select(func.pg_advisory_unlock(key)))
+                await lock_conn.commit()
+
+    async def _loop(self, task: PeriodicTask) -> None:
+        while True:
+            try:
+                await self.run_once(task.name, due_only=True)
+            except Exception:
+                # например, БД недоступна при взятии блокировки — попробуем в следующий раз
+                logger.exception("scheduler loop for %s failed", task.name)
+            await asyncio.sleep(task.interval)
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = [asyncio.create_task(self._loop(t)) for t in self._tasks.values()]
+
+    async def stop(self) -> None:
+        for t in self._running:
+            t.cancel()
+        for t in self._running:
+            try:
+                await t
+            except asyncio.CancelledError:
+                pass
+        self._running = []
+
+    def stats(self) -> dict:
+        return {
+            t.name: {
+                "interval_s": t.interval,
+                "runs": t.runs,
+                "skipped": t.skipped,
+                "failures": t.failures,
+                "last_started_at": t.last_started_at.isoformat() if t.last_started_at else None,
+                "last_duration_ms": round(t.last_duration_ms, 2),
+                "last_result": t.last_result,
+                "last_error": t.last_error,
+            }
+            for t in self._tasks.values()
+        }
+
+
+scheduler = Scheduler()
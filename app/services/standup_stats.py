@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.core import DailyReport, DailyReportRevision, StandupDailyStat
+from app.models.enums import ReportStatus
+
+COUNTERS = (
+    "reports_created",
+    "with_blockers",
+    "resubmitted",
+    "decisions_accepted",
+    "decisions_returned",
+    "decisions_timed",
+    "decision_seconds",
+    "status_pending",
+    "status_accepted",
+    "status_revision",
+)
+
+# «блокеров нет» — такие ответы не считаются блокером (та же таблица в миграции d5b7e2f19a60)
+NO_BLOCKERS = frozenset({"", "-", "—", "нет", "нету", "нет блокеров", "отсутствуют", "none", "no", "n/a", "nope"})
+
+_STATUS_COUNTER = {
+    ReportStatus.PENDING.value: "status_pending",
+    ReportStatus.ACCEPTED.value: "status_accepted",
+    ReportStatus.REVISION.value: "status_revision",
+}
+
+
+def has_blockers(text_blockers: str) -> bool:
+    return text_blockers.strip().lower().rstrip(".!") not in NO_BLOCKERS
+
+
+def _day(ts: datetime) -> date:
+    # created_at отчёта до перечитывания из БД — наивный UTC (default=datetime.utcnow)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.date()
+
+
+class StatsDelta:
+    """Приращения счётчиков по (отдел, день); применяются одним upsert'ом."""
+
+    def __init__(self) -> None:
+        self._rows: dict[tuple[int | None, date], Counter] = defaultdict(Counter)
+
+    def add(self, department_id: int | None, day: date, **deltas: int) -> None:
+        self._rows[(department_id, day)].update(deltas)
+
+    def status_change(self, department_id: int | None, created_at: datetime, old: str | None, new: str) -> None:
+        """Отчёт, созданный в created_at, сменил статус old -> new (old=None — новый отчёт)."""
+        if old == new:
+            return
+        day = _day(created_at)
+        if old is not None:
+            self.add(department_id, day, **{_STATUS_COUNTER[old]: -1})
+        self.add(department_id, day, **{_STATUS_COUNTER[new]: 1})
+
+    async def apply(self, session: AsyncSession) -> None:
+        if not self._rows:
+            return
+        rows = [
+            {"department_id": dep, "day": day, **{c: deltas.get(c, 0) for c in COUNTERS}}
+            for (dep, day), deltas in self._rows.items()
+        ]
+        stmt = pg_insert(StandupDailyStat).values(rows)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_standup_stats_department_day",
+                set_={c: getattr(StandupDailyStat, c) + stmt.excluded[c] for c in COUNTERS},
+            )
+        )
+
+
+async def record_created(session: AsyncSession, report: DailyReport, department_id: int | None) -> None:
+    delta = StatsDelta()
+    delta.add(
+        department_id,
+        _day(report.created_at),
+        reports_created=1,
+        with_blockers=int(has_blockers(report.text_blockers)),
+    )
+    delta.status_change(department_id, report.created_at, None, report.status)
+    await delta.apply(session)
+
+
+async def record_resubmitted(
+    session: AsyncSession, report: DailyReport, department_id: int | None, old_status: str, old_blockers: str
+) -> None:
+    delta = StatsDelta()
+    delta.add(department_id, datetime.now(timezone.utc).date(), resubmitted=1)
+    # with_blockers — по текущему тексту отчёта, как и status_*
+    blockers = int(has_blockers(report.text_blockers)) - int(has_blockers(old_blockers))
+    if blockers:
+        delta.add(department_id, _day(report.created_at), with_blockers=blockers)
+    delta.status_change(department_id, report.created_at, old_status, report.status)
+    await delta.apply(session)
+
+
+def add_decision(
+    delta: StatsDelta,
+    department_id: int | None,
+    created_at: datetime,
+    old_status: str,
+    new_status: str,
+    submitted_at: datetime | None,
+    now: datetime,
+) -> None:
+    accepted = new_status == ReportStatus.ACCEPTED.value
+    delta.add(department_id, now.date(), decisions_accepted=int(accepted), decisions_returned=int(not accepted))
+    # ожидание — с последней отправки на проверку (создание или правка)
+    if old_status == ReportStatus.PENDING.value and submitted_at is not None:
+        waited = max(0, int((now - submitted_at).total_seconds()))
+        delta.add(department_id, now.date(), decisions_timed=1, decision_seconds=waited)
+    delta.status_change(department_id, created_at, old_status, new_status)
+
+
+def submitted_at_query(report_ids):
+    """Время последней отправки на проверку: (report_id, max created_at PENDING-ревизий)."""
+    return (
+        select(DailyReportRevision.report_id, func.max(DailyReportRevision.created_at))
+        .where(
+            DailyReportRevision.report_id.in_(report_ids),
+            DailyReportRevision.status == ReportStatus.PENDING.value,
+        )
+        .group_by(DailyReportRevision.report_id)
+    )
+
+
+async def record_decision(
+    session: AsyncSession, report: DailyReport, department_id: int | None, old_status: str
+) -> None:
+    submitted_at = None
+    if old_status == ReportStatus.PENDING.value:
+        row = (await session.execute(submitted_at_query([report.id]))).first()
+        submitted_at = row[1] if row else None
+
+    delta = StatsDelta()
+    add_decision(
+        delta, department_id, report.created_at, old_status, report.status, submitted_at, datetime.now(timezone.utc)
+    )
+    await delta.apply(session)
+
+
+def with_rates(counters: dict) -> dict:
+    decided = counters["decisions_accepted"] + counters["decisions_returned"]
+    return {
+        **counters,
+        "acceptance_rate": round(counters["decisions_accepted"] / decided, 4) if decided else None,
+        "blocker_rate": (
+            round(counters["with_blockers"] / counters["reports_created"], 4) if counters["reports_created"] else None
+        ),
+        "avg_decision_hours": (
+            round(counters["decision_seconds"] / counters["decisions_timed"] / 3600, 2)
+            if counters["decisions_timed"]
+            else None
+        ),
+    }
+
+
+async def load_stats(
+    session: AsyncSession, date_from: date, date_to: date, department_ids: list[int] | None
+) -> tuple[list[dict], dict]:
+    """Строки сводки за [date_from, date_to] (None — все отделы) и итоги по ним."""
+    stmt = select(StandupDailyStat).where(StandupDailyStat.day >= date_from, StandupDailyStat.day <= date_to)
+    if department_ids is not None:
+        stmt = stmt.where(StandupDailyStat.department_id.in_(department_ids))
+    stats = (
+        await session.execute(stmt.order_by(StandupDailyStat.day, StandupDailyStat.department_id))
+    ).scalars().all()
+
+    rows = []
+    totals = Counter({c: 0 for c in COUNTERS})
+    for st in stats:
+        counters = {c: getattr(st, c) for c in COUNTERS}
+        totals.update(counters)
+        rows.append({"department_id": st.department_id, "day": st.day, **with_rates(counters)})
+    return rows, with_rates(dict(totals))
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime, timezone, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import case, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.core import Streak
+from app.db import async_session
+from app.models.core import Streak, StreakLeaderboard, User
+from app.services.scheduler import advisory_key
+from app.settings import settings
+
+GLOBAL = "global"
+DEPARTMENT = "department"
 
 
 def _day(dt: datetime) -> datetime:
@@ -13,34 +21,117 @@ def _day(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
 
 
-async def update_streak(session: AsyncSession, user_id: int, now: datetime | None = None) -> Streak:
-    now = now or datetime.now(timezone.utc)
-    today = _day(now)
+async def update_streak(session: AsyncSession, user_id: int, now: datetime | None = None) -> None:
+    """
+    Учесть вход одним upsert'ом: вчера был вход — +1, раньше или никогда — 1.
+    Повторный вход в тот же день ничего не пишет (WHERE в ON CONFLICT).
+    """
+    today = _day(now or datetime.now(timezone.utc))
+    yesterday = today - timedelta(days=1)
+
+    stmt = pg_insert(Streak).values(user_id=user_id, current_streak=1, max_streak=1, last_streak_date=today)
+    current = case(
+        (Streak.last_streak_date >= yesterday, Streak.current_streak + 1),
+        else_=1,
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[Streak.user_id],
+            set_={
+                "current_streak": current,
+                "max_streak": func.greatest(Streak.max_streak, current),
+                "last_streak_date": today,
+            },
+            where=Streak.last_streak_date.is_(None) | (Streak.last_streak_date < today),
+        )
+    )
+
+
+async def reset_broken_streaks(now: datetime) -> int:
+    """Обнулить серии без входа вчера и сегодня — одним UPDATE, а не при следующем входе."""
+    yesterday = _day(now) - timedelta(days=1)
+    async with async_session() as session:
+        cte = (
+            update(Streak)
+            .where(Streak.current_streak > 0, Streak.last_streak_date < yesterday)
+            .values(current_streak=0)
+            .returning(Streak.user_id)
+            .cte()
+        )
+        reset = (await session.execute(select(func.count()).select_from(cte))).scalar_one()
+        await session.commit()
+    return reset
+
+
+def _leaderboard_rows(now: datetime, size: int):
+    """
+    Топ-size глобально и по каждому отделу одним запросом с оконными функциями.
+    rank — место с учётом равенства, row_number — только для отсечения.
+    Серии без входа вчера не учитываются, даже если reset_broken_streaks ещё не прошёл.
+    """
+    yesterday = _day(now) - timedelta(days=1)
+    order = (Streak.current_streak.desc(), Streak.max_streak.desc(), Streak.user_id)
+    ranked = (
+        select(
+            Streak.user_id,
+            User.full_name,
+            User.department_id,
+            Streak.current_streak,
+            Streak.max_streak,
+            func.rank().over(order_by=order[:2]).label("global_rank"),
+            func.row_number().over(order_by=order).label("global_pos"),
+            func.rank().over(partition_by=User.department_id, order_by=order[:2]).label("dept_rank"),
+            func.row_number().over(partition_by=User.department_id, order_by=order).label("dept_pos"),
+        )
+        .join(User, User.id == Streak.user_id)
+        .where(User.is_active.is_(True), Streak.current_streak > 0, Streak.last_streak_date >= yesterday)
+        .subquery()
+    )
+    refreshed = literal(now)
+    return select(
+        literal(GLOBAL), literal(None).label("department_id"), ranked.c.global_rank, ranked.c.user_id,
+        ranked.c.full_name, ranked.c.current_streak, ranked.c.max_streak, refreshed,
+    ).where(ranked.c.global_pos <= size).union_all(
+        select(
+            literal(DEPARTMENT), ranked.c.department_id, ranked.c.dept_rank, ranked.c.user_id,
+            ranked.c.full_name, ranked.c.current_streak, ranked.c.max_streak, refreshed,
+        ).where(ranked.c.dept_pos <= size, ranked.c.department_id.is_not(None))
+    )
 
-    streak = (await session.execute(select(Streak).where(Streak.user_id == user_id))).scalar_one_or_none()
-    if not streak:
-        streak = Streak(user_id=user_id, current_streak=1, max_streak=1, last_streak_date=today)
-        session.add(streak)
-        return streak
 
-    last = streak.last_streak_date
-    if last is None:
-        streak.current_streak = 1
-        streak.max_streak = max(streak.max_streak, 1)
-        streak.last_streak_date = today
-        return streak
+async def refresh_leaderboard(now: datetime) -> int:
+    """Пересобрать streak_leaderboard в одной транзакции: читатели видят старый или новый топ целиком."""
+    async with async_session() as session:
+        # пересобирают две задачи планировщика (у них разные advisory lock'и) и POST /leaderboard/refresh;
+        # без блокировки параллельные DELETE не видят чужих INSERT'ов, и в таблице остаются оба топа
+        await session.execute(select(func.pg_advisory_xact_lock(advisory_key("streak_leaderboard"))))
+        await session.execute(delete(StreakLeaderboard))
+        cte = (
+            pg_insert(StreakLeaderboard)
+            .from_select(
+                ["scope", "department_id", "rank", "user_id", "full_name", "current_streak", "max_streak",
+                 "refreshed_at"],
+                _leaderboard_rows(now, settings.streak_leaderboard_size),
+            )
+            .returning(StreakLeaderboard.id)
+            .cte()
+        )
+        rows = (await session.execute(select(func.count()).select_from(cte))).scalar_one()
+        await session.commit()
+    return rows
 
-    last_day = _day(last)
 
-    if last_day == today:
-        # already counted today
-        return streak
+async def nightly_streaks() -> dict:
+    """Задача планировщика: сброс прерванных серий (раз в сутки по факту) и пересборка топа."""
+    now = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    reset = await reset_broken_streaks(now)
+    rows = await refresh_leaderboard(now)
+    return {"reset": reset, "leaderboard_rows": rows, "ms": round((time.perf_counter() - t0) * 1000, 2)}
 
-    if last_day == today - timedelta(days=1):
-        streak.current_streak += 1
-    else:
-        streak.current_streak = 1
 
-    streak.max_streak = max(streak.max_streak, streak.current_streak)
-    streak.last_streak_date = today
-    return streak
+async def leaderboard_refresh() -> dict:
+    now = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    rows = await refresh_leaderboard(now)
+    return {"leaderboard_rows": rows, "ms": round((time.perf_counter() - t0) * 1000, 2)}
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import codecs
+import time
+import zipfile
+from html.parser import HTMLParser
+from xml.etree import ElementTree
+
+# Выполняется в процессах-обработчиках (services/document_index.py): модуль
+# не тянет ни БД, ни настроек, чтобы процессы стартовали быстро.
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# распакованный word/document.xml больше этого — скорее zip-бомба, чем регламент
+_DOCX_MAX_XML_BYTES = 64 * 1024 * 1024
+
+
+def _pdf_text(path: str, max_chars: int) -> str:
+    from pypdf import PdfReader  # тяжёлый импорт — только в процессе-обработчике
+
+    parts: list[str] = []
+    size = 0
+    for page in PdfReader(path).pages:
+        text = page.extract_text() or ""
+        parts.append(text)
+        size += len(text)
+        if size >= max_chars:
+            break
+    return "\n".join(parts)
+
+
+def _docx_text(path: str) -> str:
+    with zipfile.ZipFile(path) as z:
+        if z.getinfo("word/document.xml").file_size > _DOCX_MAX_XML_BYTES:
+            raise ValueError("word/document.xml is too large")
+        root = ElementTree.fromstring(z.read("word/document.xml"))
+
+    paragraphs = []
+    for p in root.iter(_W + "p"):
+        parts = []
+        for el in p.iter():
+            if el.tag == _W + "t":
+                parts.append(el.text or "")
+            elif el.tag == _W + "tab":
+                parts.append("\t")
+            elif el.tag in (_W + "br", _W + "cr"):
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+class _HTMLText(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs) -> None:
+        if tag in ("script", "style"):
+            self._skip += 1
+
+    def handle_endtag(self, tag) -> None:
+        if tag in ("script", "style") and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data) -> None:
+        if not self._skip:
+            self.parts.append(data)
+
+
+def _decode(data: bytes, final: bool) -> str:
+    # final=False: файл прочитан не целиком, и обрезанный в конце многобайтовый
+    # символ UTF-8 — не повод считать весь текст cp1251
+    try:
+        return codecs.getincrementaldecoder("utf-8-sig")().decode(data, final=final)
+    except UnicodeDecodeError:
+        return data.decode("cp1251", errors="replace")
+
+
+def _read_text(path: str, max_chars: int) -> str:
+    limit = max_chars * 4
+    with open(path, "rb") as f:
+        data = f.read(limit)
+    return _decode(data, final=len(data) < limit)
+
+
+def extract_text(path: str, content_type: str, max_chars: int) -> str:
+    """
+    Текст файла по типу содержимого (сигнатура важнее заявленного Content-Type):
+    PDF, DOCX, HTML, прочий text/*. Неизвестные форматы — пустая строка.
+    """
+    with open(path, "rb") as f:
+        head = f.read(8)
+    content_type = content_type.split(";", 1)[0].strip().lower()
+
+    if head.startswith(b"%PDF"):
+        text = _pdf_text(path, max_chars)
+    elif head.startswith(b"PK\x03\x04"):
+        # zip: из офисных форматов понимаем только DOCX
+        try:
+            text = _docx_text(path)
+        except KeyError:
+            text = ""
+    elif content_type == "text/html":
+        parser = _HTMLText()
+        parser.feed(_read_text(path, max_chars))
+        parser.close()
+        text = " ".join(parser.parts)
+    elif content_type.startswith("text/") or content_type in ("application/json", "application/xml"):
+        text = _read_text(path, max_chars)
+    else:
+        text = ""
+    return text[:max_chars]
+
+
+def chunk_text(text: str, size: int) -> list[str]:
+    """Куски до size символов, разрезанные по пробелам; пробельные серии схлопываются."""
+    text = " ".join(text.replace("\x00", " ").split())
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + size
+        if end < len(text):
+            cut = text.rfind(" ", start + size // 2, end)
+            if cut > 0:
+                end = cut
+        chunks.append(text[start:end].strip())
+        start = end
+    return [c for c in chunks if c]
+
+
+def extract_chunks(path: str, content_type: str, chunk_chars: int, max_chars: int) -> tuple[list[str], float]:
+    """Задача для пула процессов: (куски текста, время извлечения в мс)."""
+    t0 = time.perf_counter()
+    chunks = chunk_text(extract_text(path, content_type, max_chars), chunk_chars)
+    return chunks, (time.perf_counter() - t0) * 1000
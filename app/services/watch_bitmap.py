@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from app.settings import settings
+
+# --- битовая карта просмотренных отрезков видео ---------------------------------------------
+#
+# Бит i — отрезок [i * N, (i + 1) * N) секунд, N = progress_bitmap_seconds_per_bit;
+# старший бит байта — первый (как в bit varying у Postgres). Карты из разных
+# heartbeat'ов объединяются OR'ом (в буфере — здесь, в БД — функцией bytea_or
+# из миграции), процент просмотра = bit_count / число битов в длительности.
+
+
+def segments_to_bitmap(segments: list[tuple[int, int]]) -> bytes:
+    """Отрезки [start, end) в секундах -> битовая карта (обрезается до progress_bitmap_max_bytes)."""
+    step = settings.progress_bitmap_seconds_per_bit
+    max_bits = settings.progress_bitmap_max_bytes * 8
+    bits: set[int] = set()
+    for start, end in segments:
+        # отрицательный start дал бы отрицательные номера битов (индексы с конца карты)
+        start = max(start, 0)
+        if end <= start:
+            continue
+        first = start // step
+        last = min((end - 1) // step, max_bits - 1)
+        bits.update(range(first, last + 1))
+    if not bits:
+        return b""
+
+    out = bytearray(max(bits) // 8 + 1)
+    for i in bits:
+        out[i >> 3] |= 0x80 >> (i & 7)
+    return bytes(out)
+
+
+def bitmap_or(a: bytes | None, b: bytes | None) -> bytes | None:
+    if not a:
+        return b
+    if not b:
+        return a
+    if len(a) < len(b):
+        a, b = b, a
+    out = bytearray(a)
+    for i, byte in enumerate(b):
+        out[i] |= byte
+    return bytes(out)
+
+
+def bitmap_percent(bitmap: bytes | None, duration_sec: int | None) -> int | None:
+    """Процент просмотра по карте (как watched_bitmap_percent в БД); None, если длительность неизвестна."""
+    if bitmap is None or not duration_sec:
+        return None
+    step = settings.progress_bitmap_seconds_per_bit
+    total = -(-duration_sec // step)
+    watched = sum(byte.bit_count() for byte in bitmap)
+    return min(100, watched * 100 // total)
@@ -15,5 +15,63 @@ class Settings(BaseSettings):
     login_max_attempts: int = 5
     login_lock_minutes: int = 15
 
+    # кэш принципалов (get_current_user)
+    principal_cache_size: int = 10_000
+    principal_cache_ttl_seconds: float = 30.0
+
+    # argon2 в пуле процессов (0 = по числу ядер)
+    password_workers: int = 0
+    password_queue_size: int = 64
+
+    # write-behind буфер прогресса видео
+    progress_flush_interval_seconds: float = 2.0
+    progress_flush_max_pending: int = 5000
+    # битовая карта просмотра: секунд на бит (менять нельзя — сохранённые карты
+    # перестанут совпадать) и предельный размер (2048 байт = ~22 ч при 5 с/бит)
+    progress_bitmap_seconds_per_bit: int = 5
+    progress_bitmap_max_bytes: int = 2048
+
+    # как часто перечитывать версию каталога из cache_versions
+    catalog_version_check_seconds: float = 2.0
+    # сериализованные курсы с уроками (GET /courses/{id}/bundle)
+    course_bundle_cache_size: int = 1000
+
+    # массовое назначение: больше стольких пользователей — фоновой задачей, пачками
+    bulk_assign_sync_limit: int = 1000
+    bulk_assign_batch_size: int = 1000
+
+    # локальное хранилище видео уроков (GET /media/lessons/{id})
+    media_root: str = "media"
+    media_token_minutes: int = 120
+    media_chunk_size: int = 1024 * 1024
+    # загруженные файлы документов: <media_root>/<documents_dir>/<sha256[:2]>/<sha256>
+    documents_dir: str = "documents"
+    document_max_upload_bytes: int = 100 * 1024 * 1024
+    # извлечение текста из файлов документов в пуле процессов (0 = по числу ядер)
+    document_text_workers: int = 2
+    document_text_batch_size: int = 8
+    document_text_interval_seconds: float = 10.0
+    document_text_chunk_chars: int = 2000
+    document_text_max_chars: int = 2_000_000
+    # дольше — разбор считается зависшим, процессы пула убиваются
+    document_text_timeout_seconds: float = 120.0
+
+    # фоновые задачи (services/scheduler.py)
+    scheduler_enabled: bool = True
+    deadline_sweep_interval_seconds: float = 300.0
+    deadline_due_soon_days: int = 3
+    deadline_digest_batch_size: int = 1000
+    # серии входов: пересборка топа и ежечасная проверка (сброс — раз в сутки после полуночи UTC)
+    streak_leaderboard_size: int = 100
+    streak_leaderboard_refresh_seconds: float = 300.0
+    streak_reset_interval_seconds: float = 3600.0
+
+    # push-уведомления (GET /events/stream, SSE); между воркерами — LISTEN/NOTIFY
+    events_enabled: bool = True
+    events_queue_size: int = 100
+    events_max_connections: int = 1000
+    events_keepalive_seconds: float = 15.0
+    events_reconnect_seconds: float = 2.0
+
 
 settings = Settings()
@@ -2,6 +2,7 @@
 
 const API = ""; // same origin
 const tokenKey = "lms_token";
+const refreshKey = "lms_refresh_token";
 
 const $ = (id) => document.getElementById(id);
 
@@ -17,7 +18,36 @@ function setToken(token) { localStorage.setItem(tokenKey, token); }
 
 function getToken() { return localStorage.getItem(tokenKey); }
 
-function clearToken() { localStorage.removeItem(tokenKey); }
+function clearToken() {
+    localStorage.removeItem(tokenKey);
+    localStorage.removeItem(refreshKey);
+}
+
+function setTokens(data) {
+    setToken(data.access_token);
+    if (data.refresh_token) localStorage.setItem(refreshKey, data.refresh_token);
+}
+
+// один общий запрос обновления на все параллельные 401
+let refreshing = null;
+
+async function refreshTokens() {
+    const refresh_token = localStorage.getItem(refreshKey);
+    if (!refresh_token) return false;
+
+    if (!refreshing) {
+        refreshing = fetch(API + "/auth/refresh", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ refresh_token }),
+        }).then(async (res) => {
+            if (!res.ok) { clearToken(); return false; }
+            setTokens(await res.json());
+            return true;
+        }).finally(() => { refreshing = null; });
+    }
+    return await refreshing;
+}
 
 function escapeHtml(s) {
     return (s ?? "")
@@ -28,6 +58,43 @@ function escapeHtml(s) {
 }
 
 async function apiFetch(path, opts = {}) {
+    return (await apiRequest(path, opts)).data;
+}
+
+// все страницы списка: сервер отдаёт не больше limit строк, курсор следующей — в X-Next-Cursor
+async function apiFetchAll(path) {
+    const sep = path.includes("?") ? "&" : "?";
+    const out = [];
+    let cursor = null;
+    do {
+        const q = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+        const { data, headers } = await apiRequest(`${path}${sep}limit=500${q}`);
+        out.push(...data);
+        cursor = headers.get("X-Next-Cursor");
+    } while (cursor);
+    return out;
+}
+
+// кнопка «Показать ещё» в конце списка: fetchPage(cursor) -> { items, cursor }
+function appendMore(box, cursor, fetchPage, renderItem) {
+    if (!box || !cursor) return;
+    const btn = document.createElement("button");
+    btn.className = "btn secondary";
+    btn.textContent = "Показать ещё";
+    btn.addEventListener("click", async () => {
+        btn.disabled = true;
+        try {
+            const page = await fetchPage(cursor);
+            for (const it of page.items) btn.before(renderItem(it));
+            cursor = page.cursor;
+            if (!cursor) btn.remove();
+        } catch (e) { toast(e.message); }
+        btn.disabled = false;
+    });
+    box.appendChild(btn);
+}
+
+async function apiRequest(path, opts = {}, retried = false) {
     const headers = new Headers(opts.headers || {});
     const token = getToken();
     if (token) headers.set("Authorization", `Bearer ${token}`);
@@ -43,6 +110,10 @@ async function apiFetch(path, opts = {}) {
         body: opts.body,
     });
 
+    if (res.status === 401 && !retried && !path.startsWith("/auth/") && await refreshTokens()) {
+        return await apiRequest(path, opts, true);
+    }
+
     const text = await res.text();
     let data = null;
     try { data = text ? JSON.parse(text) : null; } catch { data = text; }
@@ -56,13 +127,81 @@ async function apiFetch(path, opts = {}) {
         }
         throw new Error(err);
     }
-    return data;
+    return { data, headers: res.headers };
 }
 
 function showLogin(isLogin) {
     $("loginView") ?.classList.toggle("hidden", !isLogin);
     $("appView") ?.classList.toggle("hidden", isLogin);
     $("logoutBtn") ?.classList.toggle("hidden", isLogin);
+    if (isLogin) stopEvents(); else startEvents();
+}
+
+// ---------- EVENTS (SSE) ----------
+// EventSource не умеет слать Authorization, поэтому поток читаем через fetch
+let eventsAbort = null;
+let eventsRefreshTimer = null;
+
+function onServerEvent(ev) {
+    if (ev.type === "report.decided" && meCache && ev.user_id === meCache.id) {
+        toast(`Отчёт за день ${ev.day_number}: ${reportStatusRu(ev.status)}`);
+    }
+    // события приходят пачками — перечитываем списки не чаще раза в полсекунды
+    clearTimeout(eventsRefreshTimer);
+    eventsRefreshTimer = setTimeout(() => {
+        if ($("tab-standups")?.classList.contains("hidden")) return;
+        loadMyReports().catch(() => {});
+        loadMentorReports().catch(() => {});
+    }, 500);
+}
+
+async function readEventStream(body, onEvent) {
+    const reader = body.pipeThrough(new TextDecoderStream()).getReader();
+    let buf = "";
+    for (;;) {
+        const { value, done } = await reader.read();
+        if (done) return;
+        buf += value;
+        let i;
+        while ((i = buf.indexOf("\n\n")) >= 0) {
+            const block = buf.slice(0, i);
+            buf = buf.slice(i + 2);
+            const data = block.split("\n").filter(l => l.startsWith("data:")).map(l => l.slice(5).trim()).join("\n");
+            if (data) onEvent(JSON.parse(data));
+        }
+    }
+}
+
+async function startEvents() {
+    if (eventsAbort || !getToken()) return;
+    const ctrl = new AbortController();
+    eventsAbort = ctrl;
+    while (eventsAbort === ctrl) {
+        try {
+            const res = await fetch(API + "/events/stream", {
+                headers: { Authorization: `Bearer ${getToken()}` },
+                signal: ctrl.signal,
+            });
+            if (res.status === 401) {
+                if (await refreshTokens()) continue;
+                break;
+            }
+            if (res.ok) {
+                // пока потока не было, события могли потеряться — перечитываем
+                onServerEvent({ type: "resync" });
+                await readEventStream(res.body, onServerEvent);
+            }
+        } catch (e) {
+            if (ctrl.signal.aborted) break;
+        }
+        await new Promise(r => setTimeout(r, 5000));
+    }
+    if (eventsAbort === ctrl) eventsAbort = null;
+}
+
+function stopEvents() {
+    eventsAbort?.abort();
+    eventsAbort = null;
 }
 
 function renderList(el, items, renderItem) {
@@ -130,7 +269,7 @@ function isOverdue(deadlineIso, status) {
 
 // ---------- COURSES: start + API ----------
 async function loadCatalogCourses() {
-    return await apiFetch("/courses/catalog");
+    return await apiFetchAll("/courses/catalog");
 }
 
 async function startCourse(courseId) {
@@ -477,20 +616,27 @@ async function loadMentorReports() {
     return;
   }
 
-  const list = await apiFetch("/standups/mentor");
+  // список без текстов, ждущие проверки — первыми; текст подгружается по кнопке
+  const inboxPage = async (cursor) => {
+    const q = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+    const { data, headers } = await apiRequest(`/standups/mentor/inbox?limit=50${q}`);
+    return { ...data, cursor: headers.get("X-Next-Cursor") };
+  };
+  const inbox = await inboxPage(null);
   title.style.display = "block";
   box.style.display = "block";
+  const counts = inbox.counts || {};
+  title.dataset.base = title.dataset.base || title.textContent;
+  title.textContent = `${title.dataset.base} (на проверке: ${counts.PENDING || 0}, на доработке: ${counts.REVISION || 0})`;
 
-  renderList(box, list, (r) => {
+  const renderReport = (r) => {
     const el = document.createElement("div");
     el.className = "item";
 
     el.innerHTML = `
       <div class="title">${escapeHtml(r.user_full_name)} <span class="badge">${escapeHtml(r.user_email)}</span></div>
       <div class="muted">День ${r.day_number} • <b>${reportStatusRu(r.status)}</b></div>
-      <div class="muted">Сделал: ${escapeHtml(r.text_done)}</div>
-      <div class="muted">План: ${escapeHtml(r.text_plan)}</div>
-      <div class="muted">Блокеры: ${escapeHtml(r.text_blockers)}</div>
+      <div class="reportBody"><button class="btn secondary showBodyBtn">Показать отчёт</button></div>
 
       <div class="row" style="margin-top:10px; gap:10px; align-items:flex-start;">
         <input class="mentorComment" placeholder="Комментарий ментора..." value="${escapeHtml(r.mentor_comment || "")}" style="flex:1;" />
@@ -502,6 +648,18 @@ async function loadMentorReports() {
     const commentInp = el.querySelector(".mentorComment");
     const acceptBtn = el.querySelector(".acceptBtn");
     const revisionBtn = el.querySelector(".revisionBtn");
+    const bodyBox = el.querySelector(".reportBody");
+
+    el.querySelector(".showBodyBtn").addEventListener("click", async () => {
+      try {
+        const full = await apiFetch(`/standups/${r.id}`);
+        bodyBox.innerHTML = `
+          <div class="muted">Сделал: ${escapeHtml(full.text_done)}</div>
+          <div class="muted">План: ${escapeHtml(full.text_plan)}</div>
+          <div class="muted">Блокеры: ${escapeHtml(full.text_blockers)}</div>
+        `;
+      } catch (e) { toast(e.message); }
+    });
 
     acceptBtn.addEventListener("click", async () => {
       try {
@@ -529,24 +687,75 @@ async function loadMentorReports() {
     });
 
     return el;
-  });
+  };
+
+  renderList(box, inbox.items, renderReport);
+  appendMore(box, inbox.cursor, inboxPage, renderReport);
 }
 
 // ---------- DOCUMENTS ----------
 async function loadDocs(q = "") {
-  const qs = q ? `?q=${encodeURIComponent(q)}` : "";
-  const list = await apiFetch("/documents" + qs);
+  // с запросом — поиск по релевантности с фасетами, без — последние документы
+  const searchPage = async (cursor) => {
+    const c = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+    const { data, headers } = await apiRequest(`/documents/search?q=${encodeURIComponent(q)}${c}`);
+    return { ...data, cursor: headers.get("X-Next-Cursor") };
+  };
+  let list, facets = "", cursor = null;
+  if (q) {
+    const res = await searchPage(null);
+    list = res.items;
+    cursor = res.cursor;
+    facets = Object.entries(res.facets.category || {}).map(([k, n]) => `${escapeHtml(k)} (${n})`).join(", ");
+  } else {
+    list = await apiFetchAll("/documents");
+  }
 
-  renderList($("docsList"), list, (doc) => {
+  const renderDoc = (doc) => {
     const d = document.createElement("div");
     d.className = "item";
     d.innerHTML = `
       <div class="title">${escapeHtml(doc.title)}</div>
       <div class="muted">Категория: ${escapeHtml(doc.category)} • Доступ: ${escapeHtml(doc.access_level)}</div>
-      <div class="muted"><a href="${doc.file_url}" target="_blank">Открыть</a></div>
+      <div class="muted"><a href="${escapeHtml(doc.file_url)}" target="_blank">Открыть</a></div>
     `;
+    if (doc.file_name) {
+      // загруженный файл — по подписанной ссылке (Authorization в <a href> не передать)
+      d.querySelector("a").addEventListener("click", async (e) => {
+        e.preventDefault();
+        try {
+          const { url } = await apiFetch(`/documents/${doc.id}/file/url`);
+          window.open(API + url, "_blank");
+        } catch (err) { toast(err.message); }
+      });
+    }
     return d;
-  });
+  };
+
+  renderList($("docsList"), list, renderDoc);
+  // следующие страницы поиска — по курсору, перед совпадениями в тексте файлов
+  appendMore($("docsList"), cursor, searchPage, renderDoc);
+
+  if (facets) {
+    const f = document.createElement("div");
+    f.className = "muted";
+    f.innerHTML = `Найдено по категориям: ${facets}`;
+    $("docsList")?.prepend(f);
+  }
+
+  // совпадения в тексте файлов; snippet уже экранирован сервером, совпадения в <mark>
+  if (q.length >= 2) {
+    const hits = await apiFetch(`/documents/fulltext?q=${encodeURIComponent(q)}`);
+    for (const h of hits) {
+      const d = document.createElement("div");
+      d.className = "item";
+      d.innerHTML = `
+        <div class="title">${escapeHtml(h.title)}</div>
+        <div class="muted">В тексте: ${h.snippet}</div>
+      `;
+      $("docsList")?.append(d);
+    }
+  }
 }
 
 // ---------- ADMIN ----------
@@ -587,7 +796,7 @@ async function createDepartmentFromForm() {
 }
 
 async function loadUsers() {
-  const list = await apiFetch("/users");
+  const list = await apiFetchAll("/users");
   renderList($("usersList"), list, (u) => {
     const d = document.createElement("div");
     d.className = "item";
@@ -618,8 +827,8 @@ async function createUserFromForm() {
 }
 
 async function loadAssignDropdowns() {
-  const users = await apiFetch("/users");
-  const courses = await apiFetch("/courses");
+  const users = await apiFetchAll("/users");
+  const courses = await apiFetchAll("/courses");
 
   const uSel = $("assignUser");
   const cSel = $("assignCourse");
@@ -661,7 +870,7 @@ $("loginBtn")?.addEventListener("click", async () => {
     const password = $("password")?.value || "";
     const data = await apiFetch("/auth/login", { method: "POST", jsonBody: { email, password } });
 
-    setToken(data.access_token);
+    setTokens(data);
     toast("Вход выполнен");
     showLogin(false);
 
@@ -686,6 +895,8 @@ $("myCoursesBtn")?.addEventListener("click", async (e) => {
 
 
 $("logoutBtn")?.addEventListener("click", () => {
+  const refresh_token = localStorage.getItem(refreshKey);
+  if (refresh_token) apiFetch("/auth/logout", { method: "POST", jsonBody: { refresh_token } }).catch(() => {});
   clearToken();
   meCache = null;
   $("meBadge")?.classList.add("hidden");
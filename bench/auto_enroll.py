@@ -0,0 +1,137 @@
+"""
+Бенчмарк: автоназначение обязательных курсов.
+
+Сравниваются:
+  loop  — как старый seed_enrollments: SELECT на каждую пару пользователь × курс
+          (меряется на выборке --loop-users пользователей и экстраполируется);
+  set   — reconcile_mandatory: один INSERT ... SELECT ... ON CONFLICT DO NOTHING;
+  again — повторная сверка, когда всё уже назначено;
+  user  — инкрементальная сверка для одного нового сотрудника.
+
+Данные создаются в одной транзакции, которая в конце откатывается; остальные
+пользователи и курсы на время замера выключаются (is_active / is_mandatory).
+
+Запуск:
+    python -m bench.auto_enroll --users 50000 --courses 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+
+from app.db import async_session
+from app.models.core import Course, Enrollment, User
+from app.services.auto_enroll import reconcile_mandatory
+from app.services.enrollments import lessons_completed_expr, lessons_total_expr
+from app.models.enums import EnrollmentStatus
+
+
+async def make_fixture(session, users: int, courses: int) -> None:
+    await session.execute(text("UPDATE users SET is_active = false"))
+    await session.execute(text("UPDATE courses SET is_mandatory = false"))
+    await session.execute(
+        text(
+            "INSERT INTO users (email, full_name, role, password_hash, is_active, failed_login_count) "
+            "SELECT 'bench-' || g || '@bench.local', 'Bench ' || g, 'EMPLOYEE', '-', true, 0 "
+            "FROM generate_series(1, :n) g"
+        ),
+        {"n": users},
+    )
+    await session.execute(
+        text(
+            "INSERT INTO courses (title, is_mandatory, deadline_days, is_public) "
+            "SELECT 'bench-' || g, true, 7 * (g % 3), false FROM generate_series(1, :n) g"
+        ),
+        {"n": courses},
+    )
+    await session.execute(text("ANALYZE users"))
+    await session.execute(text("ANALYZE courses"))
+
+
+async def loop_enroll(session, limit: int) -> int:
+    users = (
+        await session.execute(select(User).where(User.is_active.is_(True)).order_by(User.id).limit(limit))
+    ).scalars().all()
+    courses = (await session.execute(select(Course).where(Course.is_mandatory.is_(True)))).scalars().all()
+
+    created = 0
+    for u in users:
+        for c in courses:
+            exists = (
+                await session.execute(
+                    select(Enrollment).where(Enrollment.user_id == u.id, Enrollment.course_id == c.id)
+                )
+            ).scalar_one_or_none()
+            if exists:
+                continue
+            session.add(
+                Enrollment(
+                    user_id=u.id,
+                    course_id=c.id,
+                    status=EnrollmentStatus.ASSIGNED.value,
+                    progress_percent=0,
+                    lessons_total=lessons_total_expr(c.id),
+                    lessons_completed=lessons_completed_expr(u.id, c.id),
+                )
+            )
+            created += 1
+    await session.flush()
+    return created
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--loop-users", type=int, default=250)
+    args = parser.parse_args()
+
+    pairs = args.users * args.courses
+    rows = []
+    async with async_session() as session:
+        await make_fixture(session, args.users, args.courses)
+
+        # loop — на отдельной точке сохранения, чтобы не мешать set-based замеру
+        sp = await session.begin_nested()
+        t0 = time.perf_counter()
+        created = await loop_enroll(session, args.loop_users)
+        elapsed = time.perf_counter() - t0
+        await sp.rollback()
+        rows.append(("loop*", created, elapsed * pairs / max(created, 1)))
+
+        t0 = time.perf_counter()
+        created = await reconcile_mandatory(session)
+        rows.append(("set", created, time.perf_counter() - t0))
+
+        t0 = time.perf_counter()
+        created = await reconcile_mandatory(session)
+        rows.append(("again", created, time.perf_counter() - t0))
+
+        new_user = (
+            await session.execute(
+                text(
+                    "INSERT INTO users (email, full_name, role, password_hash, is_active, failed_login_count) "
+                    "VALUES ('bench-new@bench.local', 'Bench new', 'EMPLOYEE', '-', true, 0) RETURNING id"
+                )
+            )
+        ).scalar_one()
+        t0 = time.perf_counter()
+        created = await reconcile_mandatory(session, user_id=new_user)
+        rows.append(("user", created, time.perf_counter() - t0))
+
+        await session.rollback()
+
+    print(f"users={args.users} courses={args.courses} pairs={pairs}")
+    print(f"{'mode':<8}{'created':>10}{'seconds':>10}{'pairs/s':>12}")
+    for mode, created, seconds in rows:
+        rate = (pairs if mode in ("loop*", "set", "again") else args.courses) / seconds if seconds else 0.0
+        print(f"{mode:<8}{created:>10}{seconds:>10.2f}{rate:>12.0f}")
+    print(f"* loop: {args.loop_users} users measured, time extrapolated to all pairs")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
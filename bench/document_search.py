@@ -0,0 +1,141 @@
+"""
+Бенчмарк: поиск документов по названию на --docs документах.
+
+Сравниваются:
+  ilike     — старый list_documents: title ILIKE '%q%' без индекса
+              (enable_bitmapscan/indexscan = off — как до миграции);
+  ilike+trgm — тот же запрос через ix_documents_title_trgm;
+  search    — services.document_search: ILIKE или %, similarity, keyset
+              и фасеты в одном запросе (первая страница).
+
+Данные создаются в одной транзакции, которая в конце откатывается.
+Нужен pg_trgm и миграция a9d3f1b6c470.
+
+Запуск:
+    python -m bench.document_search --docs 200000 --repeat 20
+
+Результат на 200k документов, p50/p95 мс (PostgreSQL 18.6 с pg_trgm 1.6,
+БД с lc_ctype C.utf8, настройки по умолчанию; 1 vCPU):
+
+    query                   ilike            ilike+trgm       search        matched
+    отпуск                  308.5 / 343.9    308.2 / 394.3    278.6 / 308.2   25780
+    командир                302.2 / 319.2    286.8 / 386.6    326.0 / 421.9   25780
+    securty                 268.4 / 433.0    270.9 / 315.7    195.9 / 213.9     889
+    handbook 12             263.9 / 301.1    267.5 / 304.8    383.0 / 471.6   24353
+    политика безопасности   353.0 / 426.6    368.9 / 452.7    753.9 / 825.0    6528
+    19999                   253.8 / 296.7    267.5 / 287.9     98.6 / 105.5      12
+    zzzz                    232.2 / 286.6    233.6 / 268.9      3.0 /   3.7       0
+
+Для ilike планировщик и с индексом выбирает обратный проход по PK (ORDER BY
+id DESC LIMIT), поэтому ilike+trgm от ilike не отличается. search
+выигрывает на избирательных запросах и опечатках (securty ILIKE не находит
+вовсе); если совпадает десятая часть таблицы (словарь фикстуры — 15 слов),
+он считает similarity и фасеты по всем совпадениям и не быстрее полного
+просмотра, а на двух частых словах (похожих заголовков много) — вдвое медленнее.
+В локали C pg_trgm не выделяет триграммы из кириллицы: русские запросы
+там не используют индекс и не находят похожих написаний.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+
+from app.db import async_session
+from app.models.core import Document
+from app.pagination import PageParams
+from app.services.document_search import like_pattern, search_documents
+
+WORDS = (
+    "регламент", "политика", "инструкция", "положение", "отпуск", "командировка", "безопасность",
+    "policy", "security", "onboarding", "expense", "travel", "vacation", "handbook", "guide",
+)
+QUERIES = ("отпуск", "командир", "securty", "handbook 12", "политика безопасности", "19999", "zzzz")
+
+
+async def make_fixture(session, docs: int) -> None:
+    words = "ARRAY[" + ", ".join(f"'{w}'" for w in WORDS) + "]"
+    await session.execute(
+        text(
+            "INSERT INTO documents (title, file_url, category, access_level) "
+            f"SELECT initcap(({words})[1 + g % {len(WORDS)}]) || ' ' || "
+            f"({words})[1 + (g / {len(WORDS)}) % {len(WORDS)}] || ' ' || g, "
+            "'/bench/' || g, (ARRAY['HR', 'IT', 'Finance', 'Legal'])[1 + g % 4], "
+            "(ARRAY['All', 'All', 'Admins Only'])[1 + g % 3] "
+            "FROM generate_series(1, :n) g"
+        ),
+        {"n": docs},
+    )
+    # строки вставлены одной транзакцией и лежат в pending list GIN-индекса (fastupdate),
+    # который индексный поиск просматривает целиком; в рабочей базе его разбирает autovacuum
+    await session.execute(text("SELECT gin_clean_pending_list('ix_documents_title_trgm'::regclass)"))
+    await session.execute(text("ANALYZE documents"))
+
+
+def pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+async def measure(fn, repeat: int) -> tuple[float, float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        times.append(time.perf_counter() - t0)
+    return pct(times, 50) * 1000, pct(times, 95) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    page = PageParams(cursor=None, limit=args.limit)
+    rows = []
+    async with async_session() as session:
+        await make_fixture(session, args.docs)
+
+        for q in QUERIES:
+            ilike = (
+                select(Document)
+                .where(Document.title.ilike(like_pattern(q), escape="\\"))
+                .order_by(Document.id.desc())
+                .limit(args.limit + 1)
+            )
+
+            async def old():
+                await session.execute(text("SET LOCAL enable_bitmapscan = off"))
+                await session.execute(text("SET LOCAL enable_indexscan = off"))
+                try:
+                    (await session.execute(ilike)).scalars().all()
+                finally:
+                    await session.execute(text("RESET enable_bitmapscan"))
+                    await session.execute(text("RESET enable_indexscan"))
+
+            async def indexed():
+                (await session.execute(ilike)).scalars().all()
+
+            async def new():
+                await search_documents(session, q, page)
+
+            items, facets = await search_documents(session, q, page)
+            for mode, fn in (("ilike", old), ("ilike+trgm", indexed), ("search", new)):
+                p50, p95 = await measure(fn, args.repeat)
+                rows.append((q, mode, p50, p95, min(len(items), args.limit), sum(facets["category"].values())))
+
+        await session.rollback()
+
+    print(f"docs={args.docs} repeat={args.repeat} limit={args.limit}")
+    print(f"{'query':<24}{'mode':<12}{'p50 ms':>10}{'p95 ms':>10}{'hits':>8}{'matched':>10}")
+    for q, mode, p50, p95, hits, matched in rows:
+        print(f"{q:<24}{mode:<12}{p50:>10.2f}{p95:>10.2f}{hits:>8}{matched:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
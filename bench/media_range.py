@@ -0,0 +1,166 @@
+"""
+Бенчмарк: параллельные Range-запросы к локальным видео.
+
+Сравниваются:
+  starlette — starlette.responses.FileResponse (блоки по 64 КБ);
+  ranged    — services.media.ranged_file_response (sendfile через
+              http.response.zerocopysend, если сервер его поддерживает,
+              иначе блоки по settings.media_chunk_size).
+
+Сервер — отдельный процесс uvicorn с минимальным приложением поверх тех же
+функций, клиент — простые HTTP/1.1-запросы на asyncio (без зависимостей).
+
+Запуск:
+    python -m bench.media_range --size-mb 256 --range-kb 1024 --requests 400 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from starlette.responses import FileResponse
+
+from app.services.media import ranged_file_response
+
+MEDIA_DIR = Path(os.environ.get("BENCH_MEDIA_DIR", tempfile.gettempdir()))
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/starlette/{name}")
+async def starlette_file(name: str):
+    return FileResponse(MEDIA_DIR / name)
+
+
+@bench_app.get("/ranged/{name}")
+async def ranged_file(name: str, request: Request):
+    return await ranged_file_response(request, MEDIA_DIR / name)
+
+
+def pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+async def fetch(port: int, path: str, start: int, length: int) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: bench\r\nRange: bytes={start}-{start + length - 1}\r\n"
+        f"Connection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    received = 0
+    head = b""
+    while True:
+        chunk = await reader.read(1 << 20)
+        if not chunk:
+            break
+        if head is not None:
+            head += chunk
+            if b"\r\n\r\n" in head:
+                status = head.split(b" ", 2)[1]
+                assert status == b"206", head[:200]
+                received += len(head.split(b"\r\n\r\n", 1)[1])
+                head = None
+            continue
+        received += len(chunk)
+    writer.close()
+    return received
+
+
+async def run(port: int, mode: str, name: str, size: int, length: int, requests: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    total = 0
+
+    async def one() -> None:
+        nonlocal total
+        start = random.randrange(0, size - length)
+        async with sem:
+            t0 = time.perf_counter()
+            total += await fetch(port, f"/{mode}/{name}", start, length)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "mode": mode,
+        "mb_s": total / elapsed / (1 << 20),
+        "p50_ms": pct(latencies, 50) * 1000,
+        "p99_ms": pct(latencies, 99) * 1000,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_port(port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--range-kb", type=int, default=1024)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    size = args.size_mb << 20
+    length = args.range_kb << 10
+    with tempfile.TemporaryDirectory() as tmp:
+        name = "video.bin"
+        with open(Path(tmp) / name, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1 << 20))
+
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "bench.media_range:bench_app",
+             "--port", str(port), "--log-level", "warning"],
+            env={**os.environ, "BENCH_MEDIA_DIR": tmp},
+        )
+        try:
+            await wait_port(port)
+            rows = [
+                await run(port, mode, name, size, length, args.requests, args.concurrency)
+                for mode in ("starlette", "ranged")
+            ]
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"file={args.size_mb} MB range={args.range_kb} KB requests={args.requests} concurrency={args.concurrency}")
+    print(f"{'mode':<12}{'MB/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in rows:
+        print(f"{r['mode']:<12}{r['mb_s']:>10.1f}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""
+Бенчмарк: шторм логинов (argon2 verify) и задержка «соседних» запросов.
+
+Сравниваются два режима:
+  inline   — verify_password прямо в корутине (как было раньше);
+  executor — verify_password_async через пул процессов.
+
+«Соседний» запрос моделируется корутиной, которая каждые 10 мс
+замеряет, насколько позже положенного её разбудил event loop.
+
+Запуск:
+    python -m bench.password_service --logins 64 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.security.passwords import (
+    hash_password,
+    password_service,
+    verify_password,
+    verify_password_async,
+)
+
+
+def pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+async def ticker(stop: asyncio.Event, lags: list[float], interval: float = 0.01) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - t0 - interval)
+
+
+async def run(mode: str, logins: int, concurrency: int, password: str, password_hash: str) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    lags: list[float] = []
+    rejected = 0
+
+    async def login() -> None:
+        nonlocal rejected
+        t0 = time.perf_counter()
+        async with sem:
+            if mode == "inline":
+                verify_password(password, password_hash)
+            else:
+                try:
+                    await verify_password_async(password, password_hash)
+                except Exception:
+                    rejected += 1
+                    return
+            latencies.append(time.perf_counter() - t0)
+
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop, lags))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await tick
+
+    return {
+        "mode": mode,
+        "logins": len(latencies),
+        "rejected": rejected,
+        "elapsed_s": elapsed,
+        "login_p50_ms": pct(latencies, 50) * 1000,
+        "login_p99_ms": pct(latencies, 99) * 1000,
+        "other_p50_ms": pct(lags, 50) * 1000,
+        "other_p99_ms": pct(lags, 99) * 1000,
+        "other_max_ms": max(lags, default=0.0) * 1000,
+        "other_mean_ms": statistics.fmean(lags) * 1000 if lags else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    password = "employee12345"
+    password_hash = hash_password(password)
+
+    # прогрев пула, чтобы не мерить запуск процессов
+    await asyncio.gather(*(verify_password_async(password, password_hash) for _ in range(password_service.workers)))
+
+    rows = [
+        await run("inline", args.logins, args.concurrency, password, password_hash),
+        await run("executor", args.logins, args.concurrency, password, password_hash),
+    ]
+    password_service.shutdown()
+
+    print(f"workers={password_service.workers} capacity={password_service.capacity}")
+    header = (
+        f"{'mode':<10}{'ok':>6}{'rej':>6}{'total s':>10}"
+        f"{'login p50':>12}{'login p99':>12}{'other p50':>12}{'other p99':>12}{'other max':>12}"
+    )
+    print(header)
+    for r in rows:
+        print(
+            f"{r['mode']:<10}{r['logins']:>6}{r['rejected']:>6}{r['elapsed_s']:>10.2f}"
+            f"{r['login_p50_ms']:>12.1f}{r['login_p99_ms']:>12.1f}"
+            f"{r['other_p50_ms']:>12.1f}{r['other_p99_ms']:>12.1f}{r['other_max_ms']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())